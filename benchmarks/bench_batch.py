@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Compare per-card capture latency with and without batching.
+
+Renders N copies of ``examples/social_card.html`` into a temporary output
+directory, then captures them once per navigation and again in batches of
+K cards per document.
+
+Usage:
+    python benchmarks/bench_batch.py
+    python benchmarks/bench_batch.py --cards 200 --batch-size 10 25
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+from jinja2 import Environment, FileSystemLoader
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from pelican_social_share.capture import (  # noqa: E402
+    PLAYWRIGHT_AVAILABLE,
+    CaptureOptions,
+    CardJob,
+    run_serial,
+)
+from pelican_social_share.server import serve_directory  # noqa: E402
+
+EXAMPLES = os.path.join(os.path.dirname(__file__), "..", "examples")
+
+
+def make_cards(output_path, count):
+    """Render ``count`` cards into ``output_path`` and return their jobs."""
+    env = Environment(loader=FileSystemLoader(EXAMPLES))
+    template = env.get_template("social_card.html")
+    social_dir = os.path.join(output_path, "social")
+    image_dir = os.path.join(output_path, "images")
+    os.makedirs(social_dir)
+    os.makedirs(image_dir)
+
+    jobs = []
+    for i in range(count):
+        slug = f"card-{i:05d}"
+        with open(os.path.join(social_dir, f"{slug}.html"), "w", encoding="utf-8") as f:
+            f.write(template.render(
+                tagline=f"Benchmark card number {i} with a reasonably long tagline",
+                SITENAME="Benchmark",
+                portrait_url="",
+            ))
+        jobs.append(CardJob(slug, f"/social/{slug}.html", os.path.join(image_dir, f"{slug}.png")))
+    return jobs
+
+
+def run(jobs, output_path, batch_size):
+    """Capture all jobs and return (seconds, errors)."""
+    options = CaptureOptions(wait_selector=None, batch_size=batch_size)
+    with serve_directory(output_path) as port:
+        started = time.perf_counter()
+        results = run_serial(jobs, f"http://127.0.0.1:{port}", options)
+        elapsed = time.perf_counter() - started
+    return elapsed, sum(not r.ok for r in results)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--cards", type=int, default=50, help="Cards to capture (default: 50)")
+    parser.add_argument(
+        "--batch-size", type=int, nargs="+", default=[5, 10, 20],
+        help="Batch sizes to compare against one card per navigation",
+    )
+    args = parser.parse_args()
+
+    if not PLAYWRIGHT_AVAILABLE:
+        print("ERROR: Playwright not installed.", file=sys.stderr)
+        return 1
+
+    with tempfile.TemporaryDirectory() as output_path:
+        jobs = make_cards(output_path, args.cards)
+
+        print(f"{'mode':<16}{'total s':>10}{'ms/card':>10}{'speedup':>10}{'errors':>8}")
+        baseline = None
+        for batch_size in [1] + args.batch_size:
+            elapsed, errors = run(jobs, output_path, batch_size)
+            baseline = baseline or elapsed
+            mode = "per-card" if batch_size == 1 else f"batch of {batch_size}"
+            print(
+                f"{mode:<16}{elapsed:>10.2f}{elapsed * 1000 / len(jobs):>10.1f}"
+                f"{baseline / elapsed:>9.2f}x{errors:>8}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
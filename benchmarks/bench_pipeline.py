@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Benchmark the card pipeline end to end on synthetic sites.
+
+Builds a site of N articles against the theme in ``benchmarks/fixtures``,
+runs ``build_social_pages`` and the screenshot phase twice (a cold build,
+then an unchanged rebuild from freshly read articles, which should skip
+every capture through the manifest) and reports cards/sec, cards
+captured, peak RSS and the time spent in each phase. Every size runs in a fresh process so peak RSS is
+per size.
+
+Modes:
+    hash        Render card HTML and hash inputs only, recording placeholder
+                PNGs in the manifest; needs no browser
+    pillow      Draw cards with the Pillow backend
+    playwright  Capture cards with Chromium
+
+Usage:
+    python benchmarks/bench_pipeline.py
+    python benchmarks/bench_pipeline.py --mode playwright --cards 100 1000
+    python benchmarks/bench_pipeline.py --output before.json
+    python benchmarks/bench_pipeline.py --output after.json --baseline before.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from jinja2 import Environment, FileSystemLoader
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import pelican_social_share  # noqa: E402
+from pelican_social_share import plugin  # noqa: E402
+from pelican_social_share.capture import PLAYWRIGHT_AVAILABLE, CaptureOptions  # noqa: E402
+from pelican_social_share.manifest import MANIFEST_NAME, CardManifest  # noqa: E402
+from pelican_social_share.timing import current_timings, take_timings  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+REPORT = "bench-timings.json"
+# Stands in for a captured card in --mode hash
+PLACEHOLDER_PNG = b"\x89PNG\r\n\x1a\n"
+WORDS = (
+    "fast static sites need social cards that render quickly and stay "
+    "sharp on every network without slowing down the build"
+).split()
+
+
+class BenchArticle:
+    """Just enough of a Pelican Article for the plugin and the fixture theme."""
+
+    def __init__(self, i):
+        self.slug = f"post-{i:05d}"
+        self.title = f"Post {i}"
+        self.category = ("notes", "essays", "links")[i % 3]
+        words = WORDS[i % len(WORDS):] + WORDS[:i % len(WORDS)]
+        self.metadata = {"tagline": " ".join(words[:6 + i % 8]).capitalize()}
+
+
+def peak_rss_mb(who):
+    """Peak resident set size in MB, or None where unsupported."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def make_site(root, count, mode):
+    """Lay out a Pelican-like site and return (settings, generator)."""
+    output_path = os.path.join(root, "output")
+    content_path = os.path.join(root, "content")
+    shutil.copytree(os.path.join(FIXTURES, "content"), content_path)
+    # Pelican copies theme and static files before the screenshot phase
+    shutil.copytree(
+        os.path.join(FIXTURES, "theme", "static"), os.path.join(output_path, "theme")
+    )
+    shutil.copytree(os.path.join(content_path, "images"), os.path.join(output_path, "images"))
+
+    settings = {
+        "PATH": content_path,
+        "OUTPUT_PATH": output_path,
+        "SITENAME": "Benchmark",
+        "SITEURL": "",
+        "SOCIAL_CARD_HTML_DIR": os.path.join(content_path, "social"),
+        "SOCIAL_IMAGE_DIR": os.path.join(content_path, "images", "social"),
+        "SOCIAL_PORTRAIT_PATH": "images/portrait.svg",
+        "SOCIAL_WAIT_SELECTOR": None,
+        "SOCIAL_TIMING_REPORT": REPORT,
+        "SOCIAL_RENDERER": "pillow" if mode == "pillow" else "playwright",
+    }
+    env = Environment(loader=FileSystemLoader(os.path.join(FIXTURES, "theme", "templates")))
+    generator = SimpleNamespace(settings=settings, env=env)
+    return settings, generator
+
+
+def hash_only(settings):
+    """Run the screenshot phase's hashing and skip logic without rendering.
+
+    Cards that need capturing get a placeholder PNG and a manifest entry,
+    as a real capture would, so an unchanged rebuild takes the hash-skip
+    path.
+    """
+    jobs = list(plugin._jobs.values())
+    plugin._jobs.clear()
+    image_dir = settings["SOCIAL_IMAGE_DIR"]
+    os.makedirs(image_dir, exist_ok=True)
+    manifest = CardManifest.load(os.path.join(image_dir, MANIFEST_NAME), image_dir)
+    plugin.resolve_jobs(jobs, settings, CaptureOptions.from_settings(settings), manifest)
+
+    timings = current_timings()
+    with timings.phase("record"):
+        for job in jobs:
+            if job.needs_capture:
+                with open(job.png_path, "wb") as f:
+                    f.write(PLACEHOLDER_PNG)
+                manifest.record(job.manifest_key, job.input_hash, job.png_path)
+        manifest.save()
+    report = take_timings().report()
+    report["captured"] = sum(job.needs_capture for job in jobs)
+    return report
+
+
+def build(settings, generator, articles, mode):
+    """Run one build and return its timing report."""
+    plugin.build_social_pages(generator, articles)
+    if mode == "hash":
+        return hash_only(settings)
+    plugin.capture_social_cards(SimpleNamespace(settings=settings))
+    with open(os.path.join(settings["OUTPUT_PATH"], REPORT), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def run_single(count, mode, extra_settings):
+    """Benchmark one site size in this process and return the results."""
+    logging.getLogger("pelican_social_share").setLevel(logging.WARNING)
+    with tempfile.TemporaryDirectory() as root:
+        settings, generator = make_site(root, count, mode)
+        settings.update(extra_settings)
+
+        runs = {}
+        for label in ("cold", "warm"):
+            # Fresh articles, as Pelican reads them again on every build; the
+            # cold build sets metadata["image"], which would skip every card
+            articles = [BenchArticle(i) for i in range(count)]
+            started = time.perf_counter()
+            report = build(settings, generator, articles, mode)
+            elapsed = time.perf_counter() - started
+            runs[label] = {
+                "seconds": round(elapsed, 3),
+                "cards_per_s": round(count / elapsed, 1),
+                "phases_s": report["phases_s"],
+                "steps": {step: stats["p95_ms"] for step, stats in report["steps"].items()},
+                "failures": len(report["failures"]),
+                # Cards that went through capture (0 on a warm build)
+                "captured": report.get("captured", max(
+                    report["steps"].get(step, {}).get("count", 0) for step in ("screenshot", "draw")
+                )),
+            }
+
+    return {
+        "cards": count,
+        "mode": mode,
+        "runs": runs,
+        "peak_rss_mb": peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        "browser_peak_rss_mb": peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+    }
+
+
+def run_isolated(count, mode, settings_json):
+    """Run one size in a fresh interpreter so peak RSS is its own."""
+    command = [
+        sys.executable, os.path.abspath(__file__), "--single",
+        "--mode", mode, "--cards", str(count), "--settings", settings_json,
+    ]
+    completed = subprocess.run(command, check=True, capture_output=True, text=True)
+    return json.loads(completed.stdout)
+
+
+def print_table(results, baseline):
+    """Print one row per size and build, with deltas against a baseline."""
+    previous = {
+        (r["cards"], r["mode"], label): run["cards_per_s"]
+        for r in (baseline or {}).get("results", [])
+        for label, run in r["runs"].items()
+    }
+    print(
+        f"{'cards':>7} {'build':<6}{'captured':>9}{'total s':>9}{'cards/s':>10}{'vs base':>9}"
+        f"{'rss MB':>8}  phases"
+    )
+    for result in results:
+        for label, run in result["runs"].items():
+            before = previous.get((result["cards"], result["mode"], label))
+            delta = f"{(run['cards_per_s'] / before - 1) * 100:+.0f}%" if before else "-"
+            phases = ", ".join(f"{k} {v:.2f}" for k, v in run["phases_s"].items())
+            rss = result["peak_rss_mb"] if result["peak_rss_mb"] is not None else "-"
+            print(
+                f"{result['cards']:>7} {label:<6}{run.get('captured', '-'):>9}{run['seconds']:>9.2f}"
+                f"{run['cards_per_s']:>10.1f}{delta:>9}{rss:>8}  {phases}"
+            )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "--cards", type=int, nargs="+", default=[100, 1000, 10000],
+        help="Site sizes to benchmark (default: 100 1000 10000)",
+    )
+    parser.add_argument(
+        "--mode", choices=("hash", "pillow", "playwright"), default="hash",
+        help="What the screenshot phase does (default: hash, no browser needed)",
+    )
+    parser.add_argument(
+        "--settings", default="{}",
+        help="JSON object of extra plugin settings, e.g. '{\"SOCIAL_CONCURRENCY\": 4}'",
+    )
+    parser.add_argument("--output", help="Write results as JSON to this file")
+    parser.add_argument("--baseline", help="Earlier --output file to compare cards/sec against")
+    parser.add_argument("--single", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode == "playwright" and not PLAYWRIGHT_AVAILABLE:
+        print("ERROR: Playwright not installed; try --mode hash.", file=sys.stderr)
+        return 1
+
+    if args.single:
+        print(json.dumps(run_single(args.cards[0], args.mode, json.loads(args.settings))))
+        return 0
+
+    results = [run_isolated(count, args.mode, args.settings) for count in args.cards]
+    document = {
+        "version": pelican_social_share.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "mode": args.mode,
+        "settings": json.loads(args.settings),
+        "results": results,
+    }
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(document, f, indent=2)
+        print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,10 +22,13 @@ SOCIAL_VIEWPORT = (1200, 675)
 SOCIAL_DEVICE_SCALE_FACTOR = 1
 SOCIAL_WAIT_UNTIL = "networkidle"
 SOCIAL_WAIT_SELECTOR = None  # e.g., "#ready" if you add a ready indicator
+SOCIAL_READY_MODE = "signal"  # or "fixed" to sleep SOCIAL_RENDER_WAIT ms
 
 # Performance settings
 SOCIAL_HASH_SKIP = True
 SOCIAL_HASH_VERSION = "v1"
+SOCIAL_CONCURRENCY = 1  # Cards captured at once
+SOCIAL_CAPTURE_ENGINE = "sync"  # or "async" for one shared Chromium process
 
 # Development setting
 SOCIAL_DISABLE_SCREENSHOT = False  # Set to True to skip screenshot generation
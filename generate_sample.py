@@ -80,7 +80,8 @@ def generate_sample(show_debug=False):
         "tagline": "This is a very long sample tagline to test how the text wraps within the safe zone boundaries and looks good on mobile devices",
         "SITENAME": "Example Blog",
         "SITEURL": "https://example.com", 
-        "portrait_url": portrait_url
+        "portrait_url": portrait_url,
+        "portrait_src": portrait_url,
     }
     
     # Render the template
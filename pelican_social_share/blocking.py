@@ -0,0 +1,167 @@
+"""Capture-time request filtering for Pelican Social Share."""
+
+import json
+import logging
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from fnmatch import fnmatch
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import urlsplit
+
+from .server import MEMORY_ORIGIN
+
+logger = logging.getLogger(__name__)
+
+# Hosts that serve cards and theme assets during capture
+LOCAL_HOSTS = ("127.0.0.1", "localhost", "::1", urlsplit(MEMORY_ORIGIN).hostname)
+
+# Resource types aborted in hermetic mode, unless SOCIAL_BLOCK_RESOURCE_TYPES
+# says otherwise
+DEFAULT_BLOCKED_TYPES = ("media", "script", "websocket", "eventsource", "manifest")
+
+# URLs that never reach the network
+UNFILTERED_SCHEMES = ("data", "blob", "about", "file")
+
+
+def host_matches(host: str, patterns: Iterable[str]) -> bool:
+    """Whether ``host`` matches any of the glob ``patterns`` (``*.example.com``)."""
+    return any(fnmatch(host, pattern.lower()) for pattern in patterns)
+
+
+@dataclass(frozen=True)
+class RequestPolicy:
+    """Which requests a card page may make while it is captured.
+
+    ``block_hosts`` are always aborted. In hermetic mode only local hosts,
+    ``allow_hosts`` and the site's own host are reachable, and requests of
+    the ``block_types`` resource types are aborted wherever they go.
+    """
+
+    hermetic: bool = False
+    allow_hosts: Tuple[str, ...] = ()
+    block_hosts: Tuple[str, ...] = ()
+    block_types: Tuple[str, ...] = DEFAULT_BLOCKED_TYPES
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "RequestPolicy":
+        """Build the policy from Pelican settings."""
+        allow_hosts = tuple(settings.get("SOCIAL_ALLOW_HOSTS", ()))
+        site_host = urlsplit(settings.get("SITEURL", "")).hostname
+        if site_host:
+            # Never fetched: the capture's router answers it from OUTPUT_PATH
+            allow_hosts += (site_host,)
+        return cls(
+            hermetic=settings.get("SOCIAL_BLOCK_REQUESTS", False),
+            allow_hosts=allow_hosts,
+            block_hosts=tuple(settings.get("SOCIAL_BLOCK_HOSTS", ())),
+            block_types=tuple(
+                settings.get("SOCIAL_BLOCK_RESOURCE_TYPES", DEFAULT_BLOCKED_TYPES)
+            ),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether any request can be blocked."""
+        return self.hermetic or bool(self.block_hosts)
+
+    def fingerprint(self) -> str:
+        """Serialize the policy for input hashes, since blocking changes pixels."""
+        if not self.enabled:
+            return ""
+        return json.dumps(
+            {
+                "hermetic": self.hermetic,
+                "allow_hosts": sorted(self.allow_hosts),
+                "block_hosts": sorted(self.block_hosts),
+                "block_types": sorted(self.block_types) if self.hermetic else [],
+            },
+            sort_keys=True,
+        )
+
+    def blocks(self, url: str, resource_type: str) -> Optional[str]:
+        """Return why ``url`` is blocked, or None if it may load."""
+        parts = urlsplit(url)
+        if parts.scheme in UNFILTERED_SCHEMES:
+            return None
+        host = (parts.hostname or "").lower()
+        if host_matches(host, self.block_hosts):
+            return "denied host"
+        if not self.hermetic:
+            return None
+        if resource_type in self.block_types:
+            return resource_type
+        if host not in LOCAL_HOSTS and not host_matches(host, self.allow_hosts):
+            return "external host"
+        return None
+
+
+class RequestFilter:
+    """Route handler that aborts requests rejected by a :class:`RequestPolicy`.
+
+    Requests that pass go on to ``router`` (a
+    :class:`~pelican_social_share.server.MemoryRouter`) if one is given,
+    else to the network. Counts of blocked requests by host and reason are
+    kept for the build summary; handlers may run on several threads.
+    """
+
+    def __init__(self, policy: RequestPolicy, router: Any = None) -> None:
+        self.policy = policy
+        self.router = router
+        self.allowed = 0
+        self.blocked_hosts: "Counter[str]" = Counter()
+        self.blocked_reasons: "Counter[str]" = Counter()
+        self._lock = threading.Lock()
+
+    def check(self, url: str, resource_type: str) -> bool:
+        """Record the request and return whether it may load."""
+        reason = self.policy.blocks(url, resource_type)
+        with self._lock:
+            if reason is None:
+                self.allowed += 1
+                return True
+            self.blocked_hosts[urlsplit(url).hostname or url] += 1
+            self.blocked_reasons[reason] += 1
+        logger.debug(
+            f"[social_share] Blocked {resource_type} request ({reason}): {url}"
+        )
+        return False
+
+    def handle(self, route: Any) -> None:
+        """Sync Playwright route handler."""
+        request = route.request
+        if not self.check(request.url, request.resource_type):
+            route.abort("blockedbyclient")
+        elif self.router is not None:
+            self.router.handle(route)
+        else:
+            route.continue_()
+
+    async def handle_async(self, route: Any) -> None:
+        """Async Playwright route handler."""
+        request = route.request
+        if not self.check(request.url, request.resource_type):
+            await route.abort("blockedbyclient")
+        elif self.router is not None:
+            await self.router.handle_async(route)
+        else:
+            await route.continue_()
+
+    @property
+    def blocked(self) -> int:
+        return sum(self.blocked_reasons.values())
+
+    def log_summary(self) -> None:
+        """Log how many requests were blocked and where they were going."""
+        if not self.blocked:
+            return
+        hosts = ", ".join(
+            f"{host} ({count})" for host, count in self.blocked_hosts.most_common(5)
+        )
+        reasons = ", ".join(
+            f"{reason} {count}" for reason, count in self.blocked_reasons.most_common()
+        )
+        logger.info(
+            f"[social_share] Blocked {self.blocked} of {self.blocked + self.allowed} "
+            f"requests ({reasons}); top hosts: {hosts}"
+        )
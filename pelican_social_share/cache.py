@@ -0,0 +1,117 @@
+"""Shared capture cache for Pelican Social Share."""
+
+import logging
+import os
+import shutil
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional
+
+from .paths import atomic_path
+
+logger = logging.getLogger(__name__)
+
+
+class CaptureCache(ABC):
+    """Store of captured card files, keyed by the card's input hash.
+
+    The input hash covers everything that changes the pixels, so any
+    machine building the same card can reuse the files. Subclasses
+    implement :meth:`fetch` and :meth:`store`; ``SOCIAL_CACHE`` may be a
+    directory (see :class:`DirectoryCache`) or a subclass of this class.
+    """
+
+    name = ""
+
+    def __init__(self, settings: Dict[str, Any]) -> None:
+        self.settings = settings
+
+    @abstractmethod
+    def fetch(self, input_hash: str, files: Dict[str, str]) -> bool:
+        """Restore a card's files; ``files`` maps cache names to local paths.
+
+        Returns True only if every file was restored.
+        """
+
+    @abstractmethod
+    def store(self, input_hash: str, files: Dict[str, str]) -> None:
+        """Save a card's freshly captured files under ``input_hash``."""
+
+
+class DirectoryCache(CaptureCache):
+    """Cache in a local directory: a shared mount or a restored CI cache.
+
+    Each card is a ``<hash[:2]>/<hash>/`` folder holding its PNG, size
+    variants and encoded formats. Files are written to temporary names
+    and renamed, so concurrent builds never see partial entries.
+    """
+
+    name = "directory"
+
+    def __init__(self, settings: Dict[str, Any], path: str) -> None:
+        super().__init__(settings)
+        self.path = path
+
+    def entry_dir(self, input_hash: str) -> str:
+        return os.path.join(self.path, input_hash[:2], input_hash)
+
+    def fetch(self, input_hash: str, files: Dict[str, str]) -> bool:
+        entry = self.entry_dir(input_hash)
+        if not all(os.path.exists(os.path.join(entry, name)) for name in files):
+            return False
+        try:
+            for name, path in files.items():
+                copy_atomic(os.path.join(entry, name), path)
+        except OSError as e:
+            logger.debug(f"[social_share] Cannot restore {input_hash} from cache: {e}")
+            return False
+        return True
+
+    def store(self, input_hash: str, files: Dict[str, str]) -> None:
+        entry = self.entry_dir(input_hash)
+        try:
+            os.makedirs(entry, exist_ok=True)
+            for name, path in files.items():
+                copy_atomic(path, os.path.join(entry, name))
+        except OSError as e:
+            logger.debug(f"[social_share] Cannot store {input_hash} in cache: {e}")
+
+
+def copy_atomic(source: str, destination: str) -> None:
+    """Copy ``source`` to ``destination`` through a temporary file and rename.
+
+    The copy gets the umask's permissions, not the source's, so entries in
+    a cache shared between users or CI agents stay readable by all of them.
+    """
+    os.makedirs(os.path.dirname(destination) or ".", exist_ok=True)
+    with atomic_path(destination) as tmp_path:
+        shutil.copyfile(source, tmp_path)
+
+
+def cache_from_settings(settings: Dict[str, Any]) -> Optional[CaptureCache]:
+    """Create the cache configured by ``SOCIAL_CACHE``, if any.
+
+    A string is a :class:`DirectoryCache` path; a :class:`CaptureCache`
+    subclass is instantiated with the settings.
+    """
+    choice = settings.get("SOCIAL_CACHE")
+    if not choice:
+        return None
+    if isinstance(choice, type) and issubclass(choice, CaptureCache):
+        return choice(settings)
+    if isinstance(choice, str):
+        return DirectoryCache(settings, choice)
+    logger.warning(
+        f"[social_share] Unknown SOCIAL_CACHE {choice!r}; "
+        f"expected a directory or a CaptureCache subclass"
+    )
+    return None
+
+
+def cache_names(png_path: str, paths: List[str]) -> Dict[str, str]:
+    """Name each of a card's files by its suffix after the card's stem.
+
+    ``post-social-share.png`` and ``post-social-share-og.webp`` become
+    ``card.png`` and ``card-og.webp``, so entries do not depend on slugs.
+    """
+    stem = os.path.splitext(os.path.basename(png_path))[0]
+    return {"card" + os.path.basename(path)[len(stem):]: path for path in paths}
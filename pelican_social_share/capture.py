@@ -0,0 +1,625 @@
+"""Playwright capture engines for Pelican Social Share."""
+
+import asyncio
+import html
+import logging
+import queue
+import socket
+import threading
+import time
+from contextlib import ExitStack
+from dataclasses import dataclass, field
+from typing import Any, Callable, ContextManager, Dict, List, Optional, Tuple
+
+from .paths import atomic_path
+from .timing import current_timings
+from .variants import capture_scale, variants_from_settings
+
+try:
+    from playwright.async_api import async_playwright
+    from playwright.sync_api import sync_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Resolves once web fonts are loaded and every <img> is decoded, or after
+# the given timeout so a broken asset cannot stall the capture.
+READY_SCRIPT = """
+async (timeout) => {
+  const settled = Promise.all([
+    document.fonts ? document.fonts.ready : null,
+    ...Array.from(document.images).map((img) => img.decode().catch(() => null)),
+  ]);
+  await Promise.race([settled, new Promise((resolve) => setTimeout(resolve, timeout))]);
+}
+"""
+
+# Templates that need extra work before capture set window.socialCardReady
+# to false and flip it to true when done.
+READY_FLAG = "() => window.socialCardReady !== false"
+
+
+# Called with each result as soon as its card is done, possibly from a
+# capture worker thread
+ResultCallback = Callable[["CaptureResult"], None]
+
+
+@dataclass
+class CaptureOptions:
+    """Screenshot settings shared by every capture engine."""
+
+    viewport: Tuple[int, int] = (1200, 675)
+    device_scale_factor: float = 1
+    wait_until: str = "networkidle"
+    wait_selector: Optional[str] = "body.images-ready"
+    ready_mode: str = "signal"
+    ready_timeout_ms: int = 10000
+    render_wait_ms: int = 1000
+    goto_timeout_ms: int = 15000
+    selector_timeout_ms: int = 10000
+    card_timeout_ms: int = 30000
+    concurrency: int = 1
+    engine: str = "sync"
+    batch_size: int = 1
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "CaptureOptions":
+        """Build capture options from Pelican settings."""
+        viewport = tuple(settings.get("SOCIAL_VIEWPORT", (1200, 675)))
+        return cls(
+            viewport=viewport,
+            # With size variants, enough pixels to cut each without upscaling
+            device_scale_factor=capture_scale(
+                viewport,
+                variants_from_settings(settings),
+                settings.get("SOCIAL_DEVICE_SCALE_FACTOR", 1),
+            ),
+            # Cards with inlined assets have no network activity to wait out
+            wait_until=settings.get(
+                "SOCIAL_WAIT_UNTIL",
+                (
+                    "load"
+                    if settings.get("SOCIAL_INLINE_ASSETS", False)
+                    else "networkidle"
+                ),
+            ),
+            wait_selector=settings.get("SOCIAL_WAIT_SELECTOR", "body.images-ready"),
+            ready_mode=settings.get("SOCIAL_READY_MODE", "signal"),
+            render_wait_ms=settings.get("SOCIAL_RENDER_WAIT", 1000),
+            card_timeout_ms=settings.get("SOCIAL_CARD_TIMEOUT", 30000),
+            concurrency=max(1, int(settings.get("SOCIAL_CONCURRENCY", 1) or 1)),
+            engine=settings.get("SOCIAL_CAPTURE_ENGINE", "sync"),
+            batch_size=max(1, int(settings.get("SOCIAL_BATCH_SIZE", 1) or 1)),
+        )
+
+
+@dataclass
+class CardJob:
+    """A social card rendered during the generator phase.
+
+    ``input_hash`` and ``needs_capture`` are settled just before capture,
+    once the hash inputs under OUTPUT_PATH are final. With
+    ``SOCIAL_DEDUPE`` the image is named by ``image_key``, the content
+    address of the card's HTML, and ``aliases`` lists the other slugs
+    sharing it.
+    """
+
+    slug: str
+    url_path: str
+    png_path: str
+    html_path: str = ""
+    tagline: str = ""
+    html: str = ""
+    input_hash: Optional[str] = None
+    needs_capture: bool = True
+    image_key: Optional[str] = None
+    aliases: List[str] = field(default_factory=list)
+
+    @property
+    def manifest_key(self) -> str:
+        """Key of the card's manifest entry: its image key, else its slug."""
+        return self.image_key or self.slug
+
+
+@dataclass
+class CaptureResult:
+    """Outcome of capturing a single card."""
+
+    slug: str
+    ok: bool
+    error: Optional[str] = None
+    wait_ms: float = 0.0
+    # Milliseconds per step ("goto", "wait", "screenshot", ...)
+    timings: Dict[str, float] = field(default_factory=dict)
+
+
+def new_card_page(browser: Any, options: CaptureOptions, router: Any = None) -> Any:
+    """Open a page in a fresh browser context sized for social cards.
+
+    If a :class:`~pelican_social_share.server.MemoryRouter` is given, every
+    request from the context is routed through it.
+    """
+    context = browser.new_context(
+        viewport={"width": options.viewport[0], "height": options.viewport[1]},
+        device_scale_factor=options.device_scale_factor,
+    )
+    if router is not None:
+        context.route("**/*", router.handle)
+    return context.new_page()
+
+
+def wait_until_ready(target: Any, label: str, options: CaptureOptions) -> float:
+    """Wait for a loaded page or frame to be ready for its screenshot.
+
+    Returns the time in milliseconds spent in the final readiness wait.
+    """
+    # Wait for images to load (custom selector)
+    if options.wait_selector:
+        try:
+            target.wait_for_selector(
+                options.wait_selector, timeout=options.selector_timeout_ms
+            )
+        except Exception:
+            logger.warning(
+                f"[social_share] Timeout waiting for selector "
+                f"{options.wait_selector} on {label}"
+            )
+
+    started = time.perf_counter()
+    if options.ready_mode == "fixed":
+        # Legacy fixed wait for images to render
+        target.wait_for_timeout(options.render_wait_ms)
+    else:
+        target.evaluate(READY_SCRIPT, options.ready_timeout_ms)
+        target.wait_for_function(READY_FLAG, timeout=options.ready_timeout_ms)
+
+    return (time.perf_counter() - started) * 1000
+
+
+def capture_card(
+    page: Any,
+    url: str,
+    png_path: str,
+    options: CaptureOptions,
+    timings: Optional[Dict[str, float]] = None,
+) -> float:
+    """Navigate to a card URL, wait for it to settle and take the screenshot.
+
+    Returns the time in milliseconds spent in the final readiness wait.
+    Step durations are stored in ``timings`` if one is given.
+    """
+    timings = {} if timings is None else timings
+    # Navigate and wait for network idle
+    started = time.perf_counter()
+    page.goto(url, wait_until=options.wait_until, timeout=options.goto_timeout_ms)
+    timings["goto"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    wait_ms = wait_until_ready(page, url, options)
+    timings["wait"] = (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with atomic_path(png_path) as tmp_path:
+        page.screenshot(path=tmp_path, full_page=False)
+    timings["screenshot"] = (time.perf_counter() - started) * 1000
+    return wait_ms
+
+
+def batch_document(urls: List[str], viewport: Tuple[int, int]) -> str:
+    """Build a page stacking one card-sized iframe per URL.
+
+    Each frame keeps its card's own document, so layout is identical to a
+    standalone capture, while the batch shares one navigation and the
+    browser's cache of the theme assets.
+    """
+    width, height = viewport
+    frames = "".join(
+        f'<iframe id="card-{i}" name="card-{i}" src="{html.escape(url)}" '
+        f'scrolling="no"></iframe>'
+        for i, url in enumerate(urls)
+    )
+    return (
+        "<!DOCTYPE html><html><head><style>"
+        "html, body { margin: 0; padding: 0; }"
+        f"iframe {{ display: block; border: 0; width: {width}px; height: {height}px; }}"
+        f"</style></head><body>{frames}</body></html>"
+    )
+
+
+def capture_batch(
+    page: Any, jobs: List[CardJob], base_url: str, options: CaptureOptions
+) -> List[CaptureResult]:
+    """Capture several cards from one document via element screenshots.
+
+    The batch's load time is split evenly across its cards as ``goto``.
+    """
+    started = time.perf_counter()
+    try:
+        page.set_content(
+            batch_document([base_url + job.url_path for job in jobs], options.viewport),
+            wait_until=options.wait_until,
+            timeout=options.goto_timeout_ms,
+        )
+    except Exception as e:
+        logger.warning(f"[social_share] Failed to load batch of {len(jobs)} cards: {e}")
+        return [CaptureResult(job.slug, False, str(e)) for job in jobs]
+
+    goto_ms = (time.perf_counter() - started) * 1000 / len(jobs)
+
+    results = []
+    for i, job in enumerate(jobs):
+        try:
+            frame = page.frame(name=f"card-{i}")
+            if frame is None:
+                raise RuntimeError("card frame not found")
+            started = time.perf_counter()
+            wait_ms = wait_until_ready(frame, job.slug, options)
+            timings = {"goto": goto_ms, "wait": (time.perf_counter() - started) * 1000}
+            started = time.perf_counter()
+            with atomic_path(job.png_path) as tmp_path:
+                page.locator(f"#card-{i}").screenshot(path=tmp_path)
+            timings["screenshot"] = (time.perf_counter() - started) * 1000
+            results.append(
+                CaptureResult(job.slug, True, wait_ms=wait_ms, timings=timings)
+            )
+        except Exception as e:
+            logger.warning(f"[social_share] Failed to capture {job.slug}: {e}")
+            results.append(CaptureResult(job.slug, False, str(e)))
+    return results
+
+
+def _capture_job(
+    page: Any, job: CardJob, base_url: str, options: CaptureOptions
+) -> CaptureResult:
+    """Capture one job, turning any failure into an error result."""
+    timings: Dict[str, float] = {}
+    try:
+        wait_ms = capture_card(
+            page, base_url + job.url_path, job.png_path, options, timings
+        )
+        return CaptureResult(job.slug, True, wait_ms=wait_ms, timings=timings)
+    except Exception as e:
+        logger.warning(f"[social_share] Failed to capture {job.slug}: {e}")
+        return CaptureResult(job.slug, False, str(e), timings=timings)
+
+
+def _capture_chunk(
+    page: Any,
+    chunk: List[CardJob],
+    base_url: str,
+    options: CaptureOptions,
+    on_result: Optional[ResultCallback] = None,
+) -> List[CaptureResult]:
+    """Capture a chunk of jobs, batched when ``options.batch_size`` allows."""
+    if options.batch_size > 1:
+        results = capture_batch(page, chunk, base_url, options)
+        if on_result is not None:
+            for result in results:
+                on_result(result)
+        return results
+
+    results = []
+    for job in chunk:
+        results.append(_capture_job(page, job, base_url, options))
+        if on_result is not None:
+            on_result(results[-1])
+    return results
+
+
+def chunked(jobs: List[CardJob], size: int) -> List[List[CardJob]]:
+    """Split jobs into consecutive chunks of at most ``size``."""
+    return [jobs[i:i + size] for i in range(0, len(jobs), size)]
+
+
+def run_serial(
+    jobs: List[CardJob],
+    base_url: str,
+    options: CaptureOptions,
+    router: Any = None,
+    on_result: Optional[ResultCallback] = None,
+) -> List[CaptureResult]:
+    """Capture every job one after another on a single page."""
+    with sync_playwright() as p:
+        with current_timings().phase("browser_launch"):
+            browser = p.chromium.launch(headless=True)
+        try:
+            page = new_card_page(browser, options, router)
+            results = []
+            for chunk in chunked(jobs, options.batch_size):
+                results.extend(
+                    _capture_chunk(page, chunk, base_url, options, on_result)
+                )
+            return results
+        finally:
+            browser.close()
+
+
+def run_parallel(
+    jobs: List[CardJob],
+    base_url: str,
+    options: CaptureOptions,
+    router: Any = None,
+    on_result: Optional[ResultCallback] = None,
+) -> List[CaptureResult]:
+    """Capture jobs from a shared work queue across several browser workers.
+
+    Playwright's sync API is bound to the thread that started it, so every
+    worker drives its own Chromium process and pulls slugs (or batches of
+    ``options.batch_size`` slugs) until the queue is empty.
+    """
+    work: "queue.Queue[List[CardJob]]" = queue.Queue()
+    for chunk in chunked(jobs, options.batch_size):
+        work.put(chunk)
+
+    results: List[CaptureResult] = []
+    lock = threading.Lock()
+
+    def worker() -> None:
+        try:
+            with sync_playwright() as p:
+                with current_timings().phase("browser_launch"):
+                    browser = p.chromium.launch(headless=True)
+                try:
+                    page = new_card_page(browser, options, router)
+                    while True:
+                        try:
+                            chunk = work.get_nowait()
+                        except queue.Empty:
+                            return
+                        chunk_results = _capture_chunk(
+                            page, chunk, base_url, options, on_result
+                        )
+                        with lock:
+                            results.extend(chunk_results)
+                finally:
+                    browser.close()
+        except Exception as e:
+            logger.error(f"[social_share] Capture worker failed: {e}")
+
+    threads = [
+        threading.Thread(target=worker, name=f"social-share-capture-{i}", daemon=True)
+        for i in range(min(options.concurrency, work.qsize()))
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # Jobs still queued here were stranded by workers that failed to start
+    while not work.empty():
+        for job in work.get_nowait():
+            results.append(
+                CaptureResult(job.slug, False, "no capture worker available")
+            )
+
+    return results
+
+
+class CaptureSession:
+    """A browser and asset server kept warm between captures.
+
+    Used for ``pelican --autoreload`` so each rebuild skips Chromium
+    startup. ``server`` is a context manager yielding the port of the
+    local asset server; it is entered here and left open until
+    :meth:`close`. Without one, captures must be given a router.
+    """
+
+    def __init__(
+        self,
+        server: Optional[ContextManager[int]],
+        options: CaptureOptions,
+        key: Any = None,
+    ) -> None:
+        self.options = options
+        self.key = key
+        self.port: Optional[int] = None
+        self._thread = threading.get_ident()
+        self._stack = ExitStack()
+        try:
+            if server is not None:
+                self.port = self._stack.enter_context(server)
+            playwright = self._stack.enter_context(sync_playwright())
+            with current_timings().phase("browser_launch"):
+                self.browser = playwright.chromium.launch(headless=True)
+            self._stack.callback(self.browser.close)
+            self.page = new_card_page(self.browser, options)
+        except BaseException:
+            self._stack.close()
+            raise
+
+    def is_healthy(self) -> bool:
+        """Check the browser and asset server are still usable here."""
+        # The sync API only works from the thread that started it
+        if threading.get_ident() != self._thread:
+            return False
+        try:
+            if not self.browser.is_connected():
+                return False
+            if self.port is not None:
+                with socket.create_connection(("127.0.0.1", self.port), timeout=1):
+                    pass
+        except Exception:
+            return False
+        return True
+
+    def capture(
+        self,
+        jobs: List[CardJob],
+        base_url: Optional[str] = None,
+        router: Any = None,
+        on_result: Optional[ResultCallback] = None,
+    ) -> List[CaptureResult]:
+        """Capture jobs serially on the warm page.
+
+        Each run starts from a fresh browser context so cached theme
+        assets from an earlier rebuild are never reused. ``base_url``
+        defaults to the session's asset server.
+        """
+        if base_url is None:
+            base_url = f"http://127.0.0.1:{self.port}"
+        self.page.context.close()
+        self.page = new_card_page(self.browser, self.options, router)
+        results = []
+        for chunk in chunked(jobs, self.options.batch_size):
+            results.extend(
+                _capture_chunk(self.page, chunk, base_url, self.options, on_result)
+            )
+        return results
+
+    def close(self) -> None:
+        """Shut down the browser and asset server."""
+        try:
+            self._stack.close()
+        except Exception as e:
+            logger.debug(f"[social_share] Error closing capture session: {e}")
+
+
+async def new_card_page_async(
+    browser: Any, options: CaptureOptions, router: Any = None
+) -> Any:
+    """Async counterpart of :func:`new_card_page`."""
+    context = await browser.new_context(
+        viewport={"width": options.viewport[0], "height": options.viewport[1]},
+        device_scale_factor=options.device_scale_factor,
+    )
+    if router is not None:
+        await context.route("**/*", router.handle_async)
+    return await context.new_page()
+
+
+async def capture_card_async(
+    page: Any,
+    url: str,
+    png_path: str,
+    options: CaptureOptions,
+    timings: Optional[Dict[str, float]] = None,
+) -> float:
+    """Async counterpart of :func:`capture_card`."""
+    timings = {} if timings is None else timings
+    started = time.perf_counter()
+    await page.goto(url, wait_until=options.wait_until, timeout=options.goto_timeout_ms)
+    timings["goto"] = (time.perf_counter() - started) * 1000
+    waited = time.perf_counter()
+
+    if options.wait_selector:
+        try:
+            await page.wait_for_selector(
+                options.wait_selector, timeout=options.selector_timeout_ms
+            )
+        except Exception:
+            logger.warning(
+                f"[social_share] Timeout waiting for selector "
+                f"{options.wait_selector} on {url}"
+            )
+
+    started = time.perf_counter()
+    if options.ready_mode == "fixed":
+        await page.wait_for_timeout(options.render_wait_ms)
+    else:
+        await page.evaluate(READY_SCRIPT, options.ready_timeout_ms)
+        await page.wait_for_function(READY_FLAG, timeout=options.ready_timeout_ms)
+
+    wait_ms = (time.perf_counter() - started) * 1000
+    timings["wait"] = (time.perf_counter() - waited) * 1000
+
+    started = time.perf_counter()
+    with atomic_path(png_path) as tmp_path:
+        await page.screenshot(path=tmp_path, full_page=False)
+    timings["screenshot"] = (time.perf_counter() - started) * 1000
+    return wait_ms
+
+
+async def _run_async(
+    jobs: List[CardJob],
+    base_url: str,
+    options: CaptureOptions,
+    router: Any,
+    on_result: Optional[ResultCallback] = None,
+) -> List[CaptureResult]:
+    async with async_playwright() as p:
+        with current_timings().phase("browser_launch"):
+            browser = await p.chromium.launch(headless=True)
+        try:
+            semaphore = asyncio.Semaphore(options.concurrency)
+            pages: "asyncio.Queue[Any]" = asyncio.Queue()
+            for _ in range(min(options.concurrency, len(jobs))):
+                pages.put_nowait(await new_card_page_async(browser, options, router))
+
+            async def capture(job: CardJob) -> CaptureResult:
+                result = await capture_one(job)
+                if on_result is not None:
+                    on_result(result)
+                return result
+
+            async def capture_one(job: CardJob) -> CaptureResult:
+                async with semaphore:
+                    page = await pages.get()
+                    timings: Dict[str, float] = {}
+                    try:
+                        wait_ms = await asyncio.wait_for(
+                            capture_card_async(
+                                page,
+                                base_url + job.url_path,
+                                job.png_path,
+                                options,
+                                timings,
+                            ),
+                            timeout=options.card_timeout_ms / 1000,
+                        )
+                        return CaptureResult(
+                            job.slug, True, wait_ms=wait_ms, timings=timings
+                        )
+                    except Exception as e:
+                        if isinstance(e, asyncio.TimeoutError):
+                            e = TimeoutError(
+                                f"card timed out after {options.card_timeout_ms} ms"
+                            )
+                            # A cancelled navigation can leave the page wedged
+                            await page.context.close()
+                            page = await new_card_page_async(browser, options, router)
+                        logger.warning(
+                            f"[social_share] Failed to capture {job.slug}: {e}"
+                        )
+                        return CaptureResult(job.slug, False, str(e), timings=timings)
+                    finally:
+                        pages.put_nowait(page)
+
+            return list(await asyncio.gather(*(capture(job) for job in jobs)))
+        finally:
+            await browser.close()
+
+
+def run_async(
+    jobs: List[CardJob],
+    base_url: str,
+    options: CaptureOptions,
+    router: Any = None,
+    on_result: Optional[ResultCallback] = None,
+) -> List[CaptureResult]:
+    """Capture jobs concurrently from one Chromium process on an asyncio loop.
+
+    Up to ``options.concurrency`` navigations are in flight at once, each in
+    its own browser context, and every card is bounded by
+    ``options.card_timeout_ms``.
+    """
+    return asyncio.run(_run_async(jobs, base_url, options, router, on_result))
+
+
+def run_capture(
+    jobs: List[CardJob],
+    base_url: str,
+    options: CaptureOptions,
+    router: Any = None,
+    on_result: Optional[ResultCallback] = None,
+) -> List[CaptureResult]:
+    """Capture jobs with the engine selected by the capture options.
+
+    ``on_result`` is called with each result as soon as its card is done.
+    """
+    if options.engine == "async":
+        return run_async(jobs, base_url, options, router, on_result)
+    if options.concurrency > 1 and len(jobs) > 1:
+        return run_parallel(jobs, base_url, options, router, on_result)
+    return run_serial(jobs, base_url, options, router, on_result)
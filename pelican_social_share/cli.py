@@ -4,11 +4,21 @@ Standalone CLI tool for testing social card generation.
 
 Usage:
     python -m pelican_social_share.cli --html input.html --output output.png
+    python -m pelican_social_share.cli --batch 'output/social/*.html' \
+        --output-dir images/
+    python -m pelican_social_share.cli --jobs - < jobs.jsonl
+    python -m pelican_social_share.cli --html card.html --output card.png --watch
 """
 
 import argparse
+import glob
+import json
+import os
 import sys
+import threading
+import time
 from pathlib import Path
+from typing import IO, Dict, Iterable, List, Optional, Set, Tuple
 
 try:
     from playwright.sync_api import sync_playwright
@@ -16,6 +26,11 @@ try:
 except ImportError:
     PLAYWRIGHT_AVAILABLE = False
 
+from .capture import CaptureOptions, CaptureResult, CaptureSession, CardJob, run_capture
+from .hashing import HASH_VERSION, AssetDigests, capture_fingerprint, card_input_hash
+from .manifest import MANIFEST_NAME, CardManifest, image_manifest_key
+from .server import serve_directory
+
 
 def main():
     """Main CLI entry point."""
@@ -24,12 +39,10 @@ def main():
     )
     parser.add_argument(
         "--html",
-        required=True,
         help="Path to HTML file to screenshot"
     )
     parser.add_argument(
         "--output",
-        required=True,
         help="Output PNG file path"
     )
     parser.add_argument(
@@ -50,45 +63,472 @@ def main():
         choices=["networkidle", "load", "domcontentloaded"],
         help="Wait condition (default: networkidle)"
     )
-    
+
+    batch = parser.add_argument_group("batch mode (one browser session for many cards)")
+    batch.add_argument(
+        "--batch",
+        action="append",
+        metavar="GLOB_OR_DIR",
+        help=(
+            "HTML files to capture: a glob ('**' recurses) or a directory "
+            "of *.html; repeatable"
+        ),
+    )
+    batch.add_argument(
+        "--jobs",
+        metavar="FILE",
+        help='JSONL file of {"html": ..., "output": ...} jobs, or - for stdin'
+    )
+    batch.add_argument(
+        "--output-dir",
+        help="Where --batch writes <name>.png (default: next to each HTML file)"
+    )
+    batch.add_argument(
+        "--root",
+        help="Directory served to Chromium, for root-relative asset URLs "
+             "(default: the HTML files' common parent)"
+    )
+    batch.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Cards captured at once (default: 1)"
+    )
+    batch.add_argument(
+        "--engine",
+        default="sync",
+        choices=["sync", "async"],
+        help="Capture engine (default: sync)"
+    )
+    batch.add_argument(
+        "--wait-selector",
+        help="CSS selector to wait for before each screenshot"
+    )
+    batch.add_argument(
+        "--hash-version",
+        default=HASH_VERSION,
+        help=f"Cache-busting version, as SOCIAL_HASH_VERSION (default: {HASH_VERSION})"
+    )
+    batch.add_argument(
+        "--force",
+        action="store_true",
+        help="Capture every card, ignoring the manifest's input hashes"
+    )
+    batch.add_argument(
+        "--json",
+        action="store_true",
+        help="Print one JSON object per job instead of text"
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help=(
+            "Keep the browser open and recapture cards when their HTML "
+            "or assets change"
+        ),
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=0.2,
+        help="Seconds between checks for changes in --watch mode (default: 0.2)"
+    )
+
     args = parser.parse_args()
-    
+
     if not PLAYWRIGHT_AVAILABLE:
         print("ERROR: Playwright not installed.", file=sys.stderr)
         print("Install with: pip install playwright && playwright install chromium", file=sys.stderr)
         return 1
-    
+
+    if args.watch:
+        return run_watch(args)
+    if args.batch or args.jobs:
+        return run_batch(args)
+    if not args.html or not args.output:
+        parser.error(
+            "--html and --output are required unless --batch or --jobs is given"
+        )
+
     html_path = Path(args.html)
     if not html_path.exists():
         print(f"ERROR: HTML file not found: {html_path}", file=sys.stderr)
         return 1
-    
+
     output_path = Path(args.output)
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    
+
     try:
         with sync_playwright() as p:
             browser = p.chromium.launch(headless=True)
             page = browser.new_page(
                 viewport={"width": args.width, "height": args.height}
             )
-            
+
             # Load HTML file
             file_url = html_path.absolute().as_uri()
             page.goto(file_url, wait_until=args.wait_until, timeout=15000)
-            
+
             # Take screenshot
             page.screenshot(path=str(output_path), full_page=False)
-            
+
             browser.close()
-            
+
         print(f"Screenshot saved to: {output_path}")
         return 0
-        
+
     except Exception as e:
         print(f"ERROR: Failed to generate screenshot: {e}", file=sys.stderr)
         return 1
 
 
+def expand_patterns(
+    patterns: Iterable[str], output_dir: Optional[str]
+) -> List[Tuple[str, str]]:
+    """Turn globs and directories into (html, png) pairs."""
+    pairs = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "*.html"))
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for html_path in sorted(matches):
+            name = os.path.splitext(os.path.basename(html_path))[0] + ".png"
+            pairs.append(
+                (
+                    html_path,
+                    os.path.join(output_dir or os.path.dirname(html_path), name),
+                )
+            )
+    return pairs
+
+
+def duplicate_outputs(pairs: List[Tuple[str, str]]) -> Dict[str, List[str]]:
+    """Map each output written by more than one input to those inputs.
+
+    ``--batch`` names outputs after the HTML file alone, so ``a/post.html``
+    and ``b/post.html`` would overwrite one another in ``--output-dir``.
+    """
+    inputs: Dict[str, List[str]] = {}
+    for html_path, png_path in pairs:
+        inputs.setdefault(os.path.abspath(png_path), []).append(html_path)
+    return {png: htmls for png, htmls in inputs.items() if len(htmls) > 1}
+
+
+def read_job_lines(stream: IO[str]) -> List[Tuple[str, str]]:
+    """Read (html, png) pairs from JSONL lines like ``{"html": ..., "output": ...}``."""
+    pairs = []
+    for number, line in enumerate(stream, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            job = json.loads(line)
+            pairs.append((job["html"], job["output"]))
+        except (ValueError, KeyError, TypeError) as e:
+            raise ValueError(
+                f'line {number}: expected {{"html": ..., "output": ...}} ({e})'
+            )
+    return pairs
+
+
+def make_jobs(pairs: List[Tuple[str, str]], root: str) -> List[CardJob]:
+    """Create one job per pair, served from ``root``.
+
+    The slug is the output path, which is unique within a batch.
+    """
+    jobs = []
+    for html_path, png_path in pairs:
+        relative = os.path.relpath(os.path.abspath(html_path), root)
+        with open(html_path, "r", encoding="utf-8") as f:
+            html = f.read()
+        jobs.append(CardJob(
+            slug=png_path,
+            url_path="/" + Path(relative).as_posix(),
+            png_path=os.path.abspath(png_path),
+            html_path=html_path,
+            html=html,
+        ))
+    return jobs
+
+
+def manifest_key(job: CardJob) -> str:
+    """Manifest key of a batch job, as the plugin records its output.
+
+    ``post-social-share.png`` is keyed ``post`` and a shared
+    ``social-<key>.png`` by its key; other names by the name itself.
+    """
+    return image_manifest_key(job.png_path)
+
+
+def resolve_batch(
+    jobs: List[CardJob],
+    root: str,
+    options: CaptureOptions,
+    force: bool,
+    hash_version: str = HASH_VERSION,
+) -> Dict[str, CardManifest]:
+    """Hash every job and mark the unchanged ones as fresh.
+
+    Each output directory keeps its own manifest, as ``SOCIAL_IMAGE_DIR``
+    does for the plugin, and jobs are hashed as the plugin hashes cards
+    without request blocking, encoding or size variants. Returns the
+    manifests by directory.
+    """
+    manifests: Dict[str, CardManifest] = {}
+    asset_digests = AssetDigests(root)
+    fingerprint = capture_fingerprint(options)
+    for job in jobs:
+        directory = os.path.dirname(job.png_path)
+        if directory not in manifests:
+            manifests[directory] = CardManifest.load(
+                os.path.join(directory, MANIFEST_NAME), directory
+            )
+        job.input_hash = card_input_hash(
+            manifest_key(job), job, hash_version, asset_digests, fingerprint
+        )
+        job.needs_capture = force or not manifests[directory].is_fresh(
+            manifest_key(job), job.input_hash
+        )
+    return manifests
+
+
+class ResultPrinter:
+    """Thread-safe per-job output, as text or JSON lines."""
+
+    def __init__(
+        self, jobs: List[CardJob], as_json: bool, stream: Optional[IO[str]] = None
+    ) -> None:
+        self.jobs = {job.slug: job for job in jobs}
+        self.as_json = as_json
+        self.stream = stream
+        self.counts = {"captured": 0, "skipped": 0, "failed": 0}
+        self.reported: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def __call__(self, result: CaptureResult) -> None:
+        self.emit(
+            self.jobs[result.slug],
+            "captured" if result.ok else "failed",
+            sum(result.timings.values()),
+            result.error,
+        )
+
+    def emit(
+        self, job: CardJob, status: str, ms: float = 0.0, error: Optional[str] = None
+    ) -> None:
+        with self._lock:
+            self.reported.add(job.slug)
+            self.counts[status] += 1
+            if self.as_json:
+                line = json.dumps({
+                    "html": job.html_path, "output": job.slug, "status": status,
+                    "ms": round(ms, 1), "error": error,
+                })
+            else:
+                line = f"{status:<9} {job.html_path} -> {job.slug}"
+                if status == "captured":
+                    line += f" ({ms:.0f} ms)"
+                elif error:
+                    line += f": {error}"
+            print(line, file=self.stream or sys.stdout, flush=True)
+
+
+def load_jobs(args: argparse.Namespace) -> Optional[Tuple[str, List[CardJob]]]:
+    """Collect the jobs named on the command line and the root to serve.
+
+    Prints the problem and returns None if there is nothing to capture.
+    """
+    try:
+        pairs = [(args.html, args.output)] if args.html and args.output else []
+        pairs += expand_patterns(args.batch or (), args.output_dir)
+        if args.jobs == "-":
+            pairs += read_job_lines(sys.stdin)
+        elif args.jobs:
+            with open(args.jobs, "r", encoding="utf-8") as f:
+                pairs += read_job_lines(f)
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Cannot read jobs: {e}", file=sys.stderr)
+        return None
+    if not pairs:
+        print("ERROR: No HTML files matched", file=sys.stderr)
+        return None
+    duplicates = duplicate_outputs(pairs)
+    if duplicates:
+        for png_path, html_paths in duplicates.items():
+            print(
+                f"ERROR: {', '.join(html_paths)} would all be written to {png_path}",
+                file=sys.stderr,
+            )
+        print(
+            "Name each output with --jobs, or capture the directories separately",
+            file=sys.stderr,
+        )
+        return None
+
+    root = os.path.abspath(
+        args.root
+        or os.path.commonpath([os.path.dirname(os.path.abspath(h)) for h, _ in pairs])
+    )
+    try:
+        jobs = make_jobs(pairs, root)
+    except OSError as e:
+        print(f"ERROR: Cannot read HTML: {e}", file=sys.stderr)
+        return None
+    for job in jobs:
+        os.makedirs(os.path.dirname(job.png_path), exist_ok=True)
+    return root, jobs
+
+
+def batch_options(args: argparse.Namespace) -> CaptureOptions:
+    """Capture options from the command line."""
+    return CaptureOptions(
+        viewport=(args.width, args.height),
+        wait_until=args.wait_until,
+        wait_selector=args.wait_selector,
+        concurrency=max(1, args.concurrency),
+        engine=args.engine,
+    )
+
+
+def run_batch(args: argparse.Namespace) -> int:
+    """Capture many cards in one browser session, skipping unchanged ones."""
+    started = time.perf_counter()
+    loaded = load_jobs(args)
+    if loaded is None:
+        return 1
+    root, jobs = loaded
+
+    options = batch_options(args)
+    manifests = resolve_batch(jobs, root, options, args.force, args.hash_version)
+
+    printer = ResultPrinter(jobs, args.json)
+    for job in jobs:
+        if not job.needs_capture:
+            printer.emit(job, "skipped")
+
+    pending = [job for job in jobs if job.needs_capture]
+    if pending:
+        try:
+            with serve_directory(root) as port:
+                results = run_capture(
+                    pending, f"http://127.0.0.1:{port}", options, on_result=printer
+                )
+        except Exception as e:
+            print(f"ERROR: Capture failed: {e}", file=sys.stderr)
+            return 1
+
+        for result in results:
+            job = printer.jobs[result.slug]
+            if result.slug not in printer.reported:
+                printer(result)  # Jobs stranded by a failed worker
+            if result.ok and job.input_hash is not None:
+                manifests[os.path.dirname(job.png_path)].record(
+                    manifest_key(job), job.input_hash, job.png_path
+                )
+    for manifest in manifests.values():
+        manifest.save()
+
+    elapsed = time.perf_counter() - started
+    counts = printer.counts
+    print(
+        f"{len(jobs)} cards: {counts['captured']} captured, "
+        f"{counts['skipped']} skipped, {counts['failed']} failed in {elapsed:.1f}s",
+        file=sys.stderr,
+    )
+    return 1 if counts["failed"] else 0
+
+
+def watched_files(jobs: List[CardJob], root: str) -> Dict[str, Set[str]]:
+    """Map each job's slug to its HTML file and the assets it references."""
+    asset_digests = AssetDigests(root)
+    return {
+        job.slug: {os.path.abspath(job.html_path)}
+        | asset_digests.files(job.html, job.url_path)
+        for job in jobs
+    }
+
+
+def file_versions(paths: Iterable[str]) -> Dict[str, Optional[Tuple[int, int]]]:
+    """Modification time and size of each path, None if it does not exist."""
+    versions: Dict[str, Optional[Tuple[int, int]]] = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            versions[path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            versions[path] = None
+    return versions
+
+
+def run_watch(args: argparse.Namespace) -> int:
+    """Capture the cards, then recapture the affected ones on every change.
+
+    The browser and asset server stay up between captures, so an edit to
+    a card or its stylesheet costs one navigation rather than a launch.
+    """
+    loaded = load_jobs(args)
+    if loaded is None:
+        return 1
+    root, jobs = loaded
+
+    try:
+        session = CaptureSession(serve_directory(root), batch_options(args))
+    except Exception as e:
+        print(f"ERROR: Cannot start browser: {e}", file=sys.stderr)
+        return 1
+
+    printer = ResultPrinter(jobs, args.json)
+    try:
+        session.capture(jobs, on_result=printer)
+        dependencies = watched_files(jobs, root)
+        versions = file_versions(set().union(*dependencies.values()))
+        print(
+            f"Watching {len(versions)} files for {len(jobs)} cards (Ctrl+C to stop)",
+            file=sys.stderr,
+        )
+
+        while True:
+            time.sleep(args.interval)
+            current = file_versions(versions)
+            changed = {
+                path for path, version in current.items() if versions[path] != version
+            }
+            if not changed:
+                continue
+
+            affected = []
+            for job in jobs:
+                if not dependencies[job.slug] & changed:
+                    continue
+                try:
+                    with open(job.html_path, "r", encoding="utf-8") as f:
+                        job.html = f.read()
+                except OSError as e:
+                    printer.emit(job, "failed", error=f"Cannot read HTML: {e}")
+                    continue
+                affected.append(job)
+            started = time.perf_counter()
+            session.capture(affected, on_result=printer)
+            elapsed = time.perf_counter() - started
+            print(
+                f"Recaptured {len(affected)} cards in {elapsed:.2f}s", file=sys.stderr
+            )
+
+            # Edits may add or drop stylesheets, fonts and images; changes
+            # made while capturing are compared against the earlier check
+            dependencies.update(watched_files(affected, root))
+            paths = set().union(*dependencies.values())
+            versions = {
+                **file_versions(paths - current.keys()),
+                **{path: current[path] for path in paths & current.keys()},
+            }
+    except KeyboardInterrupt:
+        return 0
+    finally:
+        session.close()
+
+
 if __name__ == "__main__":
     sys.exit(main())
@@ -0,0 +1,299 @@
+"""Critical CSS: inline only the stylesheet rules a card can use."""
+
+import logging
+import posixpath
+import re
+from dataclasses import dataclass, field
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from .hashing import AssetDigests
+from .paths import StaticResolver
+
+logger = logging.getLogger(__name__)
+
+COMMENT_RE = re.compile(r"/\*.*?\*/", re.DOTALL)
+LINK_RE = re.compile(r"<link\b[^>]*>", re.IGNORECASE)
+ATTR_RE = re.compile(r"""([\w-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+))""")
+TAG_RE = re.compile(r"<([a-zA-Z][\w-]*)")
+CLASS_ATTR_RE = re.compile(r"""\bclass\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+ID_ATTR_RE = re.compile(r"""\bid\s*=\s*["']([^"']*)["']""", re.IGNORECASE)
+# Classes added by inline scripts, e.g. classList.add('images-ready')
+SCRIPT_CLASS_RE = re.compile(r"""classList\.(?:add|toggle)\(([^)]*)\)""")
+QUOTED_RE = re.compile(r"""["']([^"']+)["']""")
+
+# Pseudo-classes with arguments, attribute selectors, then bare pseudo-classes
+PSEUDO_ARGS_RE = re.compile(r"(?<!\\):{1,2}[\w-]+\([^()]*\)")
+ATTRIBUTE_RE = re.compile(r"\[[^\]]*\]")
+PSEUDO_RE = re.compile(r"(?<!\\):{1,2}[\w-]+")
+CLASS_RE = re.compile(r"\.((?:[\w-]|\\.)+)")
+ID_RE = re.compile(r"#((?:[\w-]|\\.)+)")
+TYPE_RE = re.compile(r"(?:^|[\s>+~(])([a-zA-Z][\w-]*)")
+
+CSS_URL_RE = re.compile(
+    r"""url\(\s*(["']?)([^"')]+?)\1\s*\)|(@import\s+)(["'])([^"']+)\4"""
+)
+
+# At-rules whose blocks hold further rules
+GROUPING_AT_RULES = ("@media", "@supports", "@layer", "@container", "@document")
+
+
+@dataclass
+class Rule:
+    """One parsed CSS rule.
+
+    Style rules have ``selectors``: the class/id/type tokens each selector
+    in the list needs, and the rule can only match if one of them is fully
+    present. Grouping at-rules (``@media`` ...) have ``children``; other
+    at-rules are always kept.
+    """
+
+    prelude: str
+    body: Optional[str] = None
+    selectors: Optional[List[FrozenSet[str]]] = None
+    children: Optional[List["Rule"]] = None
+
+    def render(self, tokens: FrozenSet[str]) -> str:
+        """Serialize the rule if it can apply to a page with ``tokens``, else ""."""
+        if self.children is not None:
+            inner = "".join(child.render(tokens) for child in self.children)
+            return f"{self.prelude}{{{inner}}}" if inner else ""
+        if self.selectors is not None and not any(
+            needed <= tokens for needed in self.selectors
+        ):
+            return ""
+        if self.body is None:
+            return f"{self.prelude};"
+        return f"{self.prelude}{{{self.body}}}"
+
+
+def _unescape(name: str) -> str:
+    return re.sub(r"\\(.)", r"\1", name)
+
+
+def selector_tokens(selector: str) -> FrozenSet[str]:
+    """Tokens a page must contain for ``selector`` to match: ``.cls``, ``#id``, ``tag``.
+
+    Pseudo-classes, attribute selectors and ``:not()`` arguments are
+    ignored, so the result errs on the side of keeping rules.
+    """
+    selector = PSEUDO_ARGS_RE.sub("", selector)
+    selector = ATTRIBUTE_RE.sub("", selector)
+    selector = PSEUDO_RE.sub("", selector)
+    tokens = {"." + _unescape(name) for name in CLASS_RE.findall(selector)}
+    tokens |= {"#" + _unescape(name) for name in ID_RE.findall(selector)}
+    tokens |= {name.lower() for name in TYPE_RE.findall(selector)}
+    return frozenset(tokens)
+
+
+def split_top_level(text: str, separator: str) -> List[str]:
+    """Split ``text`` on ``separator`` outside brackets and strings."""
+    parts, depth, quote, start = [], 0, "", 0
+    for i, char in enumerate(text):
+        if quote:
+            if char == quote:
+                quote = ""
+        elif char in "\"'":
+            quote = char
+        elif char in "([":
+            depth += 1
+        elif char in ")]":
+            depth -= 1
+        elif char == separator and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return parts
+
+
+def _find(text: str, chars: str, start: int) -> int:
+    """Index of the first of ``chars`` at or after ``start`` outside strings, or -1."""
+    quote = ""
+    i = start
+    while i < len(text):
+        char = text[i]
+        if quote:
+            if char == "\\":
+                i += 1  # Skip the escaped character
+            elif char == quote:
+                quote = ""
+        elif char in "\"'":
+            quote = char
+        elif char in chars:
+            return i
+        i += 1
+    return -1
+
+
+def _block_end(text: str, open_brace: int) -> int:
+    """Index of the brace closing the block opened at ``open_brace``."""
+    depth = 0
+    i = open_brace
+    while True:
+        i = _find(text, "{}", i)
+        if i < 0:
+            return len(text)
+        depth += 1 if text[i] == "{" else -1
+        if depth == 0:
+            return i
+        i += 1
+
+
+def parse_rules(css: str) -> List[Rule]:
+    """Parse a stylesheet (without comments) into :class:`Rule` objects."""
+    rules = []
+    i = 0
+    while i < len(css):
+        stop = _find(css, "{;}", i)
+        if stop < 0:
+            break
+        prelude = css[i:stop].strip()
+        if css[stop] != "{":
+            if prelude:
+                rules.append(Rule(prelude))  # @import, @charset, ...
+            i = stop + 1
+            continue
+
+        end = _block_end(css, stop)
+        body = css[stop + 1:end]
+        i = end + 1
+        if prelude.lower().startswith(GROUPING_AT_RULES):
+            rules.append(Rule(prelude, children=parse_rules(body)))
+        elif prelude.startswith("@"):
+            rules.append(Rule(prelude, body.strip()))  # @font-face, @keyframes, ...
+        else:
+            selectors = [
+                selector_tokens(s) for s in split_top_level(prelude, ",") if s.strip()
+            ]
+            rules.append(Rule(prelude, body.strip(), selectors))
+    return rules
+
+
+def page_tokens(html: str, keep: Iterable[str] = ()) -> FrozenSet[str]:
+    """Tag names, classes and ids used by ``html``, plus the ``keep`` tokens.
+
+    Classes added by ``classList.add``/``toggle`` calls in inline scripts
+    count too. ``keep`` takes bare class names, ``#ids`` or ``.classes``.
+    """
+    tokens: Set[str] = {name.lower() for name in TAG_RE.findall(html)}
+    tokens |= {"html", "head", "body"}
+    for value in CLASS_ATTR_RE.findall(html):
+        tokens |= {"." + name for name in value.split()}
+    for args in SCRIPT_CLASS_RE.findall(html):
+        tokens |= {"." + name for name in QUOTED_RE.findall(args)}
+    tokens |= {"#" + value.strip() for value in ID_ATTR_RE.findall(html)}
+    tokens |= {name if name[:1] in ".#" else "." + name for name in keep}
+    return frozenset(tokens)
+
+
+def rebase_urls(css: str, stylesheet_path: str) -> str:
+    """Make relative ``url()`` and ``@import`` references absolute site paths.
+
+    Needed once the rules move from the stylesheet into the card page.
+    """
+    def rebase(url: str) -> str:
+        if url.startswith(("data:", "#", "/")) or urlsplit(url).scheme:
+            return url
+        return posixpath.normpath(urljoin(stylesheet_path, url))
+
+    def replace(match: "re.Match[str]") -> str:
+        if match.group(2) is not None:
+            quote = match.group(1)
+            return f"url({quote}{rebase(match.group(2))}{quote})"
+        return (
+            f"{match.group(3)}{match.group(4)}{rebase(match.group(5))}{match.group(4)}"
+        )
+
+    return CSS_URL_RE.sub(replace, css)
+
+
+@dataclass
+class Stylesheet:
+    """A parsed local stylesheet and the subsets already cut from it."""
+
+    path: str
+    rules: List[Rule]
+    subsets: Dict[FrozenSet[str], str] = field(default_factory=dict)
+
+    def subset(self, tokens: FrozenSet[str]) -> str:
+        if tokens not in self.subsets:
+            self.subsets[tokens] = "".join(rule.render(tokens) for rule in self.rules)
+        return self.subsets[tokens]
+
+
+class CriticalCss:
+    """Replace a card's local stylesheet links with the rules it can use.
+
+    Each stylesheet is read and parsed once; subsets are memoized by the
+    set of tags, classes and ids on the page, so cards from the same
+    template share one subset. Stylesheets that cannot be read, or live on
+    other hosts, keep their ``<link>``.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        siteurl: str = "",
+        resolver: Optional[StaticResolver] = None,
+        keep: Iterable[str] = (),
+    ) -> None:
+        self.urls = AssetDigests(output_path, siteurl, resolver)
+        self.keep = tuple(keep)
+        self._sheets: Dict[str, Optional[Stylesheet]] = {}
+
+    def stylesheet(self, site_path: str) -> Optional[Stylesheet]:
+        """Parse the stylesheet at ``site_path``, memoized; None if unreadable."""
+        if site_path not in self._sheets:
+            path = self.urls.resolver.locate(site_path)
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    css = f.read()
+            except (OSError, UnicodeDecodeError) as e:
+                logger.debug(
+                    f"[social_share] Critical CSS: cannot read {site_path}: {e}"
+                )
+                self._sheets[site_path] = None
+            else:
+                css = rebase_urls(COMMENT_RE.sub("", css), site_path)
+                self._sheets[site_path] = Stylesheet(path, parse_rules(css))
+        return self._sheets[site_path]
+
+    def inline(self, html: str, page_url: str) -> str:
+        """Replace local stylesheet links in ``html`` with ``<style>`` subsets."""
+        tokens: Optional[FrozenSet[str]] = None
+
+        def replace(match: "re.Match[str]") -> str:
+            nonlocal tokens
+            attrs = {
+                name.lower(): next((v for v in values if v), "")
+                for name, *values in ATTR_RE.findall(match.group(0))
+            }
+            if (
+                "stylesheet" not in attrs.get("rel", "").lower().split()
+                or "href" not in attrs
+            ):
+                return match.group(0)
+            site_path = self.urls.url_path(attrs["href"], page_url)
+            sheet = self.stylesheet(site_path) if site_path else None
+            if sheet is None:
+                return match.group(0)
+
+            if tokens is None:
+                tokens = page_tokens(html, self.keep)
+            css = sheet.subset(tokens)
+            media = attrs.get("media", "all").strip()
+            if media.lower() not in ("", "all"):
+                css = f"@media {media}{{{css}}}"
+            return f'<style data-critical="{site_path}">{css}</style>'
+
+        return LINK_RE.sub(replace, html)
+
+    def __call__(self, html: str, slug: str) -> str:
+        """Post-process hook for :func:`~pelican_social_share.pages.render_cards`."""
+        return self.inline(html, f"/social/{slug}.html")
+
+
+def critical_css_stats(html: str) -> Tuple[int, int]:
+    """Number of inlined stylesheets and their total size in ``html``."""
+    blocks = re.findall(r'<style data-critical="[^"]*">(.*?)</style>', html, re.DOTALL)
+    return len(blocks), sum(len(block) for block in blocks)
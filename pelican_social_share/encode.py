@@ -0,0 +1,255 @@
+"""Post-capture image optimization and alternate formats."""
+
+import json
+import logging
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .paths import atomic_path
+from .variants import Variant, derive_variants, size_variant_path
+
+try:
+    from PIL import Image
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# File extension written for each output format
+FORMAT_EXTENSIONS = {"png": "png", "webp": "webp", "jpeg": "jpg", "avif": "avif"}
+
+DEFAULT_QUALITY = {"webp": 85, "jpeg": 85, "avif": 60}
+
+
+def normalize_format(name: str) -> str:
+    """Map user spellings such as ``"JPG"`` to a key of FORMAT_EXTENSIONS."""
+    name = name.lower()
+    return "jpeg" if name == "jpg" else name
+
+
+@dataclass
+class EncodeOptions:
+    """What to do with each captured PNG."""
+
+    formats: Tuple[str, ...] = ("png",)
+    primary: str = "png"
+    optimize_png: bool = False
+    png_colors: int = 0
+    quality: Dict[str, int] = field(default_factory=lambda: dict(DEFAULT_QUALITY))
+    workers: int = 0
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "EncodeOptions":
+        """Build encode options from Pelican settings.
+
+        PNG is always kept, since it is what the browser captures. Formats
+        Pillow cannot write are dropped with a warning.
+        """
+        primary = normalize_format(settings.get("SOCIAL_IMAGE_FORMAT", "png"))
+        formats = ["png"]
+        for name in list(settings.get("SOCIAL_IMAGE_FORMATS", ())) + [primary]:
+            name = normalize_format(name)
+            if name in formats:
+                continue
+            if name not in FORMAT_EXTENSIONS:
+                logger.warning(f"[social_share] Unknown image format {name!r} ignored")
+            elif not can_write(name):
+                logger.warning(
+                    f"[social_share] Pillow cannot write {name}; "
+                    f"install Pillow with {name} support to enable it"
+                )
+            else:
+                formats.append(name)
+
+        return cls(
+            formats=tuple(formats),
+            primary=primary if primary in formats else "png",
+            optimize_png=(
+                settings.get("SOCIAL_OPTIMIZE_PNG", False) and PILLOW_AVAILABLE
+            ),
+            png_colors=settings.get("SOCIAL_PNG_COLORS", 0) if PILLOW_AVAILABLE else 0,
+            quality={**DEFAULT_QUALITY, **settings.get("SOCIAL_IMAGE_QUALITY", {})},
+            workers=settings.get("SOCIAL_ENCODE_WORKERS", 0),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        """Whether captured PNGs need any post-processing."""
+        return len(self.formats) > 1 or self.optimize_png or bool(self.png_colors)
+
+    def fingerprint(self) -> str:
+        """Serialize the settings that change the written files, if any."""
+        if not self.enabled:
+            return ""
+        return json.dumps(
+            {
+                "formats": self.formats,
+                "optimize_png": self.optimize_png,
+                "png_colors": self.png_colors,
+                "quality": {name: self.quality.get(name) for name in self.formats},
+            },
+            sort_keys=True,
+        )
+
+
+def can_write(name: str) -> bool:
+    """Whether the installed Pillow can save ``name``."""
+    if not PILLOW_AVAILABLE:
+        return False
+    Image.init()
+    return name.upper() in Image.SAVE
+
+
+def variant_path(png_path: str, name: str) -> str:
+    """Path of the ``name`` rendition of the card captured to ``png_path``."""
+    return f"{os.path.splitext(png_path)[0]}.{FORMAT_EXTENSIONS[name]}"
+
+
+@dataclass
+class EncodeResult:
+    """File sizes in bytes before and after encoding one card."""
+
+    slug: str
+    captured: int = 0
+    sizes: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+
+def encode_card(slug: str, png_path: str, options: EncodeOptions) -> EncodeResult:
+    """Optimize ``png_path`` in place and write the other formats next to it."""
+    result = EncodeResult(slug)
+    try:
+        result.captured = os.path.getsize(png_path)
+        with Image.open(png_path) as image:
+            image.load()
+
+        if options.optimize_png or options.png_colors:
+            optimized: Image.Image = image
+            if options.png_colors:
+                optimized = image.quantize(
+                    options.png_colors, method=Image.Quantize.FASTOCTREE
+                )
+            replace_if_smaller(png_path, optimized, "PNG", optimize=True)
+        result.sizes["png"] = os.path.getsize(png_path)
+
+        rgb = image.convert("RGB")
+        for name in options.formats:
+            if name == "png":
+                continue
+            path = variant_path(png_path, name)
+            with atomic_path(path) as tmp_path:
+                rgb.save(tmp_path, name.upper(), quality=options.quality.get(name, 85))
+            result.sizes[name] = os.path.getsize(path)
+    except Exception as e:
+        result.error = str(e)
+    return result
+
+
+def replace_if_smaller(path: str, image: Any, format: str, **params: Any) -> None:
+    """Atomically replace ``path`` with ``image`` if the result is smaller."""
+    with atomic_path(path) as tmp_path:
+        image.save(tmp_path, format, **params)
+        if os.path.getsize(tmp_path) >= os.path.getsize(path):
+            os.remove(tmp_path)
+
+
+class ImageEncoder:
+    """Post-process captured cards on a thread pool while capture continues.
+
+    Each card's size ``variants`` are cut from its capture first
+    (see :func:`~pelican_social_share.variants.derive_variants`), then
+    every PNG is encoded. Pillow releases the GIL while compressing, so
+    threads work in parallel without the start-up cost of processes.
+    """
+
+    def __init__(
+        self,
+        options: EncodeOptions,
+        variants: Sequence[Variant] = (),
+        viewport: Sequence[int] = (1200, 675),
+        scale: float = 1,
+    ) -> None:
+        self.options = options
+        self.variants = tuple(variants)
+        self.viewport = tuple(viewport)
+        self.scale = scale
+        self._pool = ThreadPoolExecutor(
+            options.workers or os.cpu_count() or 1,
+            thread_name_prefix="social-share-encode",
+        )
+        self._futures: List["Future[List[EncodeResult]]"] = []
+        # Milliseconds spent post-processing each card, by slug
+        self.timings: Dict[str, float] = {}
+
+    def submit(self, slug: str, png_path: str, captured: bool = True) -> None:
+        """Queue one card; ``captured`` is False to re-encode existing files only."""
+        self._futures.append(self._pool.submit(self._process, slug, png_path, captured))
+
+    def _process(self, slug: str, png_path: str, captured: bool) -> List[EncodeResult]:
+        started = time.perf_counter()
+        try:
+            return self._encode(slug, png_path, captured)
+        finally:
+            self.timings[slug] = (time.perf_counter() - started) * 1000
+
+    def _encode(self, slug: str, png_path: str, captured: bool) -> List[EncodeResult]:
+        paths = [(slug, png_path)]
+        if self.variants:
+            try:
+                if captured:
+                    derived = derive_variants(
+                        png_path, self.viewport, self.variants, self.scale
+                    )
+                else:
+                    derived = [
+                        size_variant_path(png_path, v.name) for v in self.variants
+                    ]
+            except Exception as e:
+                return [EncodeResult(slug, error=f"cannot derive size variants: {e}")]
+            paths += [
+                (f"{slug}-{v.name}", path) for v, path in zip(self.variants, derived)
+            ]
+
+        if not self.options.enabled:
+            return []
+        return [encode_card(name, path, self.options) for name, path in paths]
+
+    def finish(self) -> List[EncodeResult]:
+        """Wait for every queued card and return the results."""
+        self._pool.shutdown(wait=True)
+        results = [result for future in self._futures for result in future.result()]
+        for result in results:
+            if result.error:
+                logger.warning(
+                    f"[social_share] Failed to encode {result.slug}: {result.error}"
+                )
+        return results
+
+
+def formats_exist(png_path: str, options: EncodeOptions) -> bool:
+    """Whether every configured format of a card is on disk."""
+    return all(os.path.exists(variant_path(png_path, name)) for name in options.formats)
+
+
+def log_sizes(results: List[EncodeResult]) -> None:
+    """Summarize encoded file sizes against the captured PNGs."""
+    done = [r for r in results if not r.error]
+    if not done:
+        return
+    captured = sum(r.captured for r in done)
+    totals: Dict[str, int] = {}
+    for result in done:
+        for name, size in result.sizes.items():
+            totals[name] = totals.get(name, 0) + size
+    formats = ", ".join(
+        f"{name} {size / 1024:.0f} KB ({size * 100 / captured:.0f}%)"
+        for name, size in totals.items()
+    )
+    logger.info(
+        f"[social_share] Image sizes for {len(done)} cards: "
+        f"captured {captured / 1024:.0f} KB -> {formats}"
+    )
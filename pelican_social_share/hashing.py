@@ -0,0 +1,205 @@
+"""Input hashing for Pelican Social Share."""
+
+import hashlib
+import json
+import posixpath
+import re
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import urljoin, urlsplit
+
+from .capture import CardJob
+from .paths import StaticResolver
+
+# src="...", href="..." and CSS url(...) references
+ASSET_URL_RE = re.compile(
+    r"""(?:\b(?:src|href)\s*=\s*["']([^"']+)["'])"""
+    r"""|(?:url\(\s*["']?([^"')]+?)["']?\s*\))"""
+    r"""|(?:@import\s+["']([^"']+)["'])""",
+    re.IGNORECASE,
+)
+
+
+# Default SOCIAL_HASH_VERSION; bump it to invalidate every card
+HASH_VERSION = "v1"
+
+
+def make_content_hash(
+    slug: str, tagline: str, version: str, extra: Iterable[str] = ()
+) -> str:
+    """Create a hash for content to detect changes.
+
+    ``extra`` folds further inputs (rendered HTML, asset digests, capture
+    settings) into the hash.
+    """
+    hasher = hashlib.sha256()
+    hasher.update(version.encode("utf-8"))
+    hasher.update(slug.encode("utf-8"))
+    hasher.update(tagline.encode("utf-8"))
+    for value in extra:
+        hasher.update(b"\0")
+        hasher.update(value.encode("utf-8"))
+    return hasher.hexdigest()[:16]
+
+
+def file_digest(path: str) -> str:
+    """Digest of a file's content, or ``"missing"`` if it cannot be read.
+
+    Content rather than mtime, so checkouts and fresh clones agree.
+    """
+    try:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()[:16]
+    except OSError:
+        return "missing"
+
+
+def card_key(tagline: str, html: str, assets: Iterable[str] = ()) -> str:
+    """Content address of a card, shared by cards with identical inputs.
+
+    The tagline is included because backends such as Pillow draw it
+    directly rather than from the HTML. ``assets`` are the digests of
+    what the HTML links to (see :meth:`AssetDigests.card_inputs`), so a
+    changed stylesheet or portrait gives the card a new address.
+    """
+    return make_content_hash("", tagline, "", [html, *assets])
+
+
+def find_asset_urls(text: str) -> List[str]:
+    """Return the asset URLs referenced by HTML or CSS, in order of appearance."""
+    urls = []
+    for match in ASSET_URL_RE.finditer(text):
+        url = next(group for group in match.groups() if group).strip()
+        if url and not url.startswith(("data:", "#", "javascript:", "mailto:")):
+            urls.append(url)
+    return urls
+
+
+class AssetDigests:
+    """Digests of the assets a card references, memoized for one build.
+
+    URLs are resolved under ``output_path`` (with ``siteurl`` stripped), or
+    through ``resolver`` if given, and stylesheets are followed so fonts
+    and images they pull in count as inputs too. Every file is read at
+    most once per instance.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        siteurl: str = "",
+        resolver: Optional[StaticResolver] = None,
+    ) -> None:
+        self.output_path = output_path
+        self.siteurl = siteurl.rstrip("/")
+        self.resolver = resolver or StaticResolver(output_path)
+        self._digests: Dict[str, str] = {}
+
+    def url_path(self, url: str, base: str = "/") -> Optional[str]:
+        """Normalize a URL seen on page ``base`` to a site path, or None if external."""
+        if self.siteurl and url.startswith(self.siteurl):
+            url = url[len(self.siteurl):] or "/"
+        parts = urlsplit(urljoin(base, url))
+        if parts.scheme or parts.netloc:
+            return None  # External asset, tracked by URL only
+        return "/" + posixpath.normpath(parts.path).lstrip("/")
+
+    def resolve(self, url: str, base: str = "/") -> Optional[str]:
+        """Map a URL seen on page ``base`` to the file that serves it."""
+        path = self.url_path(url, base)
+        return None if path is None else self.resolver.locate(path)
+
+    def digest(self, url: str, base: str = "/") -> str:
+        """Return a digest for ``url`` covering everything it references."""
+        return self._digest(url, base, set())
+
+    def _digest(self, url: str, base: str, seen: Set[str]) -> str:
+        site_path = self.url_path(url, base)
+        if site_path is None:
+            return "external:" + url
+        path = self.resolver.locate(site_path)
+        if path in self._digests:
+            return self._digests[path]
+        if path in seen:
+            return "cycle"
+        seen.add(path)
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            self._digests[path] = "missing"
+            return "missing"
+
+        hasher = hashlib.sha256(data)
+        if path.endswith(".css"):
+            for ref in find_asset_urls(data.decode("utf-8", "replace")):
+                hasher.update(self._digest(ref, site_path, seen).encode("utf-8"))
+
+        self._digests[path] = hasher.hexdigest()[:16]
+        return self._digests[path]
+
+    def files(self, html: str, page_url: str) -> Set[str]:
+        """Local files ``html`` depends on, following stylesheets.
+
+        Missing files are included, so watchers notice when they appear.
+        """
+        found: Set[str] = set()
+        pending = [(url, page_url) for url in find_asset_urls(html)]
+        while pending:
+            url, base = pending.pop()
+            site_path = self.url_path(url, base)
+            if site_path is None:
+                continue
+            path = self.resolver.locate(site_path)
+            if path in found:
+                continue
+            found.add(path)
+            if path.endswith(".css"):
+                try:
+                    with open(path, "r", encoding="utf-8", errors="replace") as f:
+                        refs = find_asset_urls(f.read())
+                except OSError:
+                    continue
+                pending.extend((ref, site_path) for ref in refs)
+        return found
+
+    def card_inputs(self, html: str, page_url: str) -> List[str]:
+        """Return ``url=digest`` entries for every asset ``html`` references."""
+        return [f"{url}={self.digest(url, page_url)}" for url in find_asset_urls(html)]
+
+
+def card_hash_inputs(
+    html: str, url_path: str, asset_digests: AssetDigests, fingerprint: str
+) -> List[str]:
+    """Collect the extra hash inputs for one card's rendered HTML."""
+    return [html, fingerprint] + asset_digests.card_inputs(html, url_path)
+
+
+def card_input_hash(
+    key: str,
+    job: CardJob,
+    version: str,
+    asset_digests: AssetDigests,
+    fingerprint: str,
+) -> str:
+    """Input hash of a card job, as recorded under ``key`` in the manifest.
+
+    Shared by the plugin and the CLI so both agree on when a card is fresh.
+    """
+    return make_content_hash(
+        key, job.tagline, version,
+        card_hash_inputs(job.html, job.url_path, asset_digests, fingerprint),
+    )
+
+
+def capture_fingerprint(options: object) -> str:
+    """Serialize the capture settings that affect the rendered pixels."""
+    fields = (
+        "viewport",
+        "device_scale_factor",
+        "wait_until",
+        "wait_selector",
+        "ready_mode",
+        "render_wait_ms",
+    )
+    return json.dumps({name: getattr(options, name, None) for name in fields})
@@ -0,0 +1,103 @@
+"""Embed the portrait and fonts in card pages as data URIs."""
+
+import base64
+import logging
+import mimetypes
+import posixpath
+import re
+from typing import Dict, Optional
+
+from .hashing import AssetDigests
+from .paths import StaticResolver
+
+logger = logging.getLogger(__name__)
+
+# Assets larger than this keep their URL (SOCIAL_INLINE_ASSETS_MAX_KB)
+DEFAULT_MAX_BYTES = 512 * 1024
+
+# Font types missing from older mimetypes tables
+FONT_TYPES = {
+    ".woff2": "font/woff2",
+    ".woff": "font/woff",
+    ".ttf": "font/ttf",
+    ".otf": "font/otf",
+    ".eot": "application/vnd.ms-fontobject",
+}
+
+STYLE_RE = re.compile(r"(<style\b[^>]*>)(.*?)(</style>)", re.IGNORECASE | re.DOTALL)
+CSS_URL_RE = re.compile(r"""url\(\s*(["']?)([^"')]+?)\1\s*\)""")
+
+
+def media_type(path: str) -> Optional[str]:
+    """MIME type of a font or image file, or None for anything else."""
+    extension = posixpath.splitext(path)[1].lower()
+    if extension in FONT_TYPES:
+        return FONT_TYPES[extension]
+    guessed = mimetypes.guess_type(path)[0]
+    return guessed if guessed and guessed.startswith(("image/", "font/")) else None
+
+
+class InlineAssets:
+    """Data URIs for the local fonts and images cards reference.
+
+    Each file is read and encoded once per build; files that are missing,
+    are not fonts or images, or exceed ``max_bytes`` keep their URL.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        siteurl: str = "",
+        resolver: Optional[StaticResolver] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        self.urls = AssetDigests(output_path, siteurl, resolver)
+        self.max_bytes = max_bytes
+        self._uris: Dict[str, Optional[str]] = {}
+
+    def data_uri(self, url: str, base: str = "/") -> Optional[str]:
+        """Return ``url`` (seen on page ``base``) as a data URI, or None."""
+        site_path = self.urls.url_path(url, base)
+        if site_path is None:
+            return None
+        if site_path not in self._uris:
+            self._uris[site_path] = self.encode(self.urls.resolver.locate(site_path))
+        return self._uris[site_path]
+
+    def encode(self, path: str) -> Optional[str]:
+        """Read the font or image at ``path`` and return it as a data URI."""
+        kind = media_type(path)
+        if kind is None:
+            return None
+        try:
+            with open(path, "rb") as f:
+                data = f.read(self.max_bytes + 1)
+        except OSError as e:
+            logger.debug(f"[social_share] Cannot inline {path}: {e}")
+            return None
+        if len(data) > self.max_bytes:
+            logger.debug(
+                f"[social_share] Not inlining {path}: "
+                f"larger than {self.max_bytes} bytes"
+            )
+            return None
+        return f"data:{kind};base64,{base64.b64encode(data).decode('ascii')}"
+
+    def inline_styles(self, html: str, page_url: str) -> str:
+        """Replace local font and image ``url()`` references in ``<style>`` blocks."""
+        def replace_url(match: "re.Match[str]") -> str:
+            uri = self.data_uri(match.group(2), page_url)
+            return f'url("{uri}")' if uri else match.group(0)
+
+        def replace_style(match: "re.Match[str]") -> str:
+            return (
+                match.group(1)
+                + CSS_URL_RE.sub(replace_url, match.group(2))
+                + match.group(3)
+            )
+
+        return STYLE_RE.sub(replace_style, html)
+
+    def __call__(self, html: str, slug: str) -> str:
+        """Post-process hook for :func:`~pelican_social_share.pages.render_cards`."""
+        return self.inline_styles(html, f"/social/{slug}.html")
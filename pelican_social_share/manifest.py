@@ -0,0 +1,188 @@
+"""Capture manifest for Pelican Social Share."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+import time
+from typing import Any, Dict, Iterable, Optional, Set
+
+from .paths import atomic_path
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "social-share-manifest.json"
+MANIFEST_VERSION = 1
+# Cards are saved as <slug>-social-share.png, or social-<key>.png when shared
+IMAGE_SUFFIX = "-social-share"
+SHARED_IMAGE_RE = re.compile(r"^social-([0-9a-f]{16})$")
+SIDECAR_SUFFIX = IMAGE_SUFFIX + ".png.hash"
+
+
+def image_stem(slug: str, image_key: Optional[str] = None) -> str:
+    """File name, without extension, of a card's image."""
+    return f"social-{image_key}" if image_key else f"{slug}{IMAGE_SUFFIX}"
+
+
+def image_manifest_key(png_path: str) -> str:
+    """Manifest key of the card image at ``png_path``.
+
+    The inverse of :func:`image_stem`: the slug for
+    ``<slug>-social-share.png``, the image key for a shared
+    ``social-<key>.png`` and the bare file name for anything else.
+    """
+    stem = os.path.splitext(os.path.basename(png_path))[0]
+    shared = SHARED_IMAGE_RE.match(stem)
+    if shared:
+        return shared.group(1)
+    if stem.endswith(IMAGE_SUFFIX) and stem != IMAGE_SUFFIX:
+        return stem[: -len(IMAGE_SUFFIX)]
+    return stem
+
+
+class CardManifest:
+    """Single JSON record of every captured card, keyed by slug.
+
+    Each entry stores the input hash the PNG was captured from, the PNG's
+    file name, size, mtime and digest, and the capture timestamp. The file
+    is read once per build and replaced atomically by :meth:`save`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        image_dir: str,
+        entries: Optional[Dict[str, Dict[str, Any]]] = None,
+    ) -> None:
+        self.path = path
+        self.image_dir = image_dir
+        self.entries: Dict[str, Dict[str, Any]] = entries or {}
+        self._images: Optional[Set[str]] = None
+        self._dirty = False
+
+    @classmethod
+    def load(cls, path: str, image_dir: str) -> "CardManifest":
+        """Load a manifest, starting empty if it is missing or unreadable."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return cls(path, image_dir, data.get("cards", {}))
+        except FileNotFoundError:
+            return cls(path, image_dir)
+        except (OSError, ValueError) as e:
+            logger.warning(f"[social_share] Ignoring unreadable manifest {path}: {e}")
+            return cls(path, image_dir)
+
+    def is_fresh(self, slug: str, input_hash: str) -> bool:
+        """Check that ``slug`` was captured from ``input_hash`` and its PNG exists."""
+        entry = self.entries.get(slug)
+        if not entry or entry.get("hash") != input_hash:
+            return False
+        return entry.get("png") in self._existing_images()
+
+    def record(self, slug: str, input_hash: str, png_path: str) -> None:
+        """Record a fresh capture of ``slug``."""
+        try:
+            stat = os.stat(png_path)
+            with open(png_path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:16]
+        except OSError as e:
+            logger.debug(f"[social_share] Cannot record {slug} in manifest: {e}")
+            return
+
+        png = os.path.basename(png_path)
+        self.entries[slug] = {
+            "hash": input_hash,
+            "png": png,
+            "size": stat.st_size,
+            "mtime": stat.st_mtime,
+            "digest": digest,
+            "captured_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        if self._images is not None:
+            self._images.add(png)
+        self._dirty = True
+
+    def remove(self, slug: str) -> None:
+        """Forget ``slug``'s entry, if it has one."""
+        if self.entries.pop(slug, None) is not None:
+            self._dirty = True
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """Drop entries for slugs not in ``keep``; returns how many were dropped.
+
+        Called with the build's work list, so deleted and renamed content
+        does not accumulate.
+        """
+        keep = set(keep)
+        stale = [slug for slug in self.entries if slug not in keep]
+        for slug in stale:
+            self.remove(slug)
+        return len(stale)
+
+    def save(self) -> None:
+        """Write the manifest atomically if anything changed."""
+        if not self._dirty:
+            return
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        with atomic_path(self.path) as tmp_path:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(
+                    {"version": MANIFEST_VERSION, "cards": self.entries},
+                    f, indent=1, sort_keys=True,
+                )
+        self._dirty = False
+
+    def migrate_sidecars(self) -> int:
+        """Import legacy ``<slug>-social-share.png.hash`` files and remove them.
+
+        Returns the number of sidecars migrated. The sidecars are only
+        deleted once the manifest holding their hashes has been saved.
+        """
+        image_dir = self.image_dir
+        try:
+            names = os.listdir(image_dir)
+        except OSError:
+            return 0
+
+        sidecars = [name for name in names if name.endswith(SIDECAR_SUFFIX)]
+        self._images = set(names) - set(sidecars)
+        for name in sidecars:
+            slug = name[: -len(SIDECAR_SUFFIX)]
+            if slug in self.entries:
+                continue
+            try:
+                with open(os.path.join(image_dir, name), "r", encoding="utf-8") as f:
+                    stored_hash = f.read().strip()
+            except OSError:
+                continue
+            self.entries[slug] = {"hash": stored_hash, "png": name[: -len(".hash")]}
+            self._dirty = True
+
+        if sidecars:
+            self.save()
+            for name in sidecars:
+                try:
+                    os.remove(os.path.join(image_dir, name))
+                except OSError:
+                    pass
+            logger.info(
+                f"[social_share] Migrated {len(sidecars)} .hash sidecars "
+                f"into {self.path}"
+            )
+        return len(sidecars)
+
+    def image_names(self) -> Set[str]:
+        """Names of the files in the image directory, listed once per build."""
+        return set(self._existing_images())
+
+    def _existing_images(self) -> Set[str]:
+        # One directory listing answers every existence check in the build
+        if self._images is None:
+            try:
+                self._images = set(os.listdir(self.image_dir))
+            except OSError:
+                self._images = set()
+        return self._images
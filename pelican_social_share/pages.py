@@ -0,0 +1,222 @@
+"""Social card HTML rendering, optionally spread over a worker pool."""
+
+import datetime
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from types import SimpleNamespace
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Attributes copied from Article/Page objects when rendering in a pool
+SNAPSHOT_FIELDS = (
+    "slug", "title", "url", "save_as", "date", "locale_date", "modified",
+    "lang", "category", "author", "authors", "tags", "metadata",
+)
+
+# Post-processes a card's rendered HTML, given the HTML and the slug
+PostProcess = Callable[[str, str], str]
+
+# Template and shared context for pool workers; forked children inherit it
+_pool_state: Optional[
+    Tuple[Any, Dict[str, Any], str, Optional[str], Optional[PostProcess]]
+] = None
+
+
+@dataclass
+class CardSource:
+    """Inputs needed to render one card, independent of the generator."""
+
+    slug: str
+    context: Dict[str, Any]
+
+
+@dataclass
+class RenderedCard:
+    """Outcome of rendering and writing one card's HTML."""
+
+    slug: str
+    html: str = ""
+    content_changed: bool = False
+    output_changed: bool = False
+    error: Optional[str] = None
+    render_ms: float = 0.0
+    write_ms: float = 0.0
+
+
+def write_if_changed(path: str, content: str) -> bool:
+    """Write ``content`` to ``path`` unless the file already holds it.
+
+    Leaving identical files alone keeps their mtimes stable for git,
+    rsync and file watchers. Returns True if the file was written.
+    """
+    data = content.encode("utf-8")
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except OSError:
+        pass
+
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def _plain(value: Any) -> Any:
+    """Reduce ``value`` to builtins that pickle cheaply."""
+    if value is None or isinstance(
+        value, (str, int, float, bool, datetime.date, datetime.datetime)
+    ):
+        return value
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {key: _plain(item) for key, item in value.items()}
+    return str(value)
+
+
+def snapshot(
+    content_obj: Any, fields: Iterable[str] = SNAPSHOT_FIELDS
+) -> SimpleNamespace:
+    """Copy the template-facing fields of an Article or Page.
+
+    Categories, authors and tags become their names; anything else that is
+    not a builtin becomes its string form. Missing attributes are skipped.
+    """
+    values = {}
+    for field in fields:
+        if hasattr(content_obj, field):
+            values[field] = _plain(getattr(content_obj, field))
+    return SimpleNamespace(**values)
+
+
+def chain_postprocess(*steps: Optional[PostProcess]) -> Optional[PostProcess]:
+    """Combine post-process steps, skipping None; None if there are none."""
+    active = [step for step in steps if step is not None]
+    if len(active) <= 1:
+        return active[0] if active else None
+
+    def run(html: str, slug: str) -> str:
+        for step in active:
+            html = step(html, slug)
+        return html
+
+    return run
+
+
+def render_card(
+    template: Any,
+    common: Dict[str, Any],
+    source: CardSource,
+    html_dir: str,
+    output_dir: Optional[str],
+    postprocess: Optional[PostProcess] = None,
+) -> RenderedCard:
+    """Render one card and write it to ``html_dir`` (and ``output_dir``)."""
+    started = time.perf_counter()
+    try:
+        html = template.render(**common, **source.context)
+        if postprocess is not None:
+            html = postprocess(html, source.slug)
+    except Exception as e:
+        return RenderedCard(
+            source.slug, error=f"Failed to render template for {source.slug}: {e}"
+        )
+    rendered = time.perf_counter()
+
+    try:
+        content_changed = write_if_changed(
+            os.path.join(html_dir, f"{source.slug}.html"), html
+        )
+    except Exception as e:
+        return RenderedCard(
+            source.slug, error=f"Failed to write HTML for {source.slug}: {e}"
+        )
+
+    output_changed = False
+    if output_dir is not None:
+        try:
+            output_changed = write_if_changed(
+                os.path.join(output_dir, f"{source.slug}.html"), html
+            )
+        except Exception as e:
+            return RenderedCard(
+                source.slug, error=f"Failed to write output HTML for {source.slug}: {e}"
+            )
+
+    return RenderedCard(
+        source.slug, html, content_changed, output_changed,
+        render_ms=(rendered - started) * 1000,
+        write_ms=(time.perf_counter() - rendered) * 1000,
+    )
+
+
+def _render_in_worker(source: CardSource) -> RenderedCard:
+    assert _pool_state is not None
+    template, common, html_dir, output_dir, postprocess = _pool_state
+    return render_card(template, common, source, html_dir, output_dir, postprocess)
+
+
+def _make_pool(kind: str, workers: int) -> Executor:
+    """Create the executor for ``SOCIAL_RENDER_POOL``.
+
+    Process pools rely on ``fork`` so workers inherit the compiled
+    template, which cannot be pickled for ``spawn``. Forking while other
+    threads run (a pipelined capture, a persistent browser or asset
+    server) can deadlock the children, so threads are used instead then,
+    and wherever fork is unavailable.
+    """
+    if kind == "process":
+        if "fork" not in multiprocessing.get_all_start_methods():
+            logger.debug(
+                "[social_share] fork is unavailable, rendering card HTML in threads"
+            )
+        elif threading.active_count() > 1:
+            logger.debug(
+                f"[social_share] {threading.active_count() - 1} other threads running, "
+                f"rendering card HTML in threads rather than forking"
+            )
+        else:
+            return ProcessPoolExecutor(
+                workers, mp_context=multiprocessing.get_context("fork")
+            )
+    return ThreadPoolExecutor(workers)
+
+
+def render_cards(
+    template: Any,
+    common: Dict[str, Any],
+    sources: List[CardSource],
+    html_dir: str,
+    output_dir: Optional[str],
+    workers: int = 1,
+    pool: str = "thread",
+    postprocess: Optional[PostProcess] = None,
+) -> List[RenderedCard]:
+    """Render and write every card, in order, using up to ``workers`` workers.
+
+    ``common`` holds context shared by all cards; each source adds its own.
+    With a process pool the sources must be picklable (see
+    :func:`snapshot`); threads can take the content objects themselves.
+    ``postprocess`` rewrites each card's HTML before it is written.
+    """
+    if workers <= 1 or len(sources) <= 1:
+        return [
+            render_card(template, common, source, html_dir, output_dir, postprocess)
+            for source in sources
+        ]
+
+    global _pool_state
+    _pool_state = (template, common, html_dir, output_dir, postprocess)
+    try:
+        with _make_pool(pool, workers) as executor:
+            chunksize = max(1, len(sources) // (workers * 4))
+            return list(executor.map(_render_in_worker, sources, chunksize=chunksize))
+    finally:
+        _pool_state = None
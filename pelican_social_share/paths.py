@@ -0,0 +1,106 @@
+"""Site paths and file output for Pelican Social Share."""
+
+import os
+import posixpath
+import tempfile
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, Iterable, List, Tuple
+
+
+class StaticResolver:
+    """Map site URL paths to files on disk.
+
+    ``mounts`` are ``(url_prefix, directory)`` pairs checked in order; a
+    prefix naming a single file maps just that URL. Anything they do not
+    provide is looked up under ``output_path``.
+    """
+
+    def __init__(
+        self, output_path: str, mounts: Iterable[Tuple[str, str]] = ()
+    ) -> None:
+        self.output_path = output_path
+        self.mounts: List[Tuple[str, str]] = [
+            (prefix.strip("/"), directory) for prefix, directory in mounts
+        ]
+
+    @classmethod
+    def from_settings(cls, settings: Dict[str, Any]) -> "StaticResolver":
+        """Resolve theme and static files from their Pelican source directories.
+
+        Lets cards be captured before Pelican has copied those files into
+        OUTPUT_PATH.
+        """
+        content = settings.get("PATH", "content")
+        mounts = []
+        for source, metadata in settings.get("EXTRA_PATH_METADATA", {}).items():
+            target = metadata.get("save_as") or metadata.get("path")
+            if target:
+                mounts.append((target, os.path.join(content, source)))
+        theme = settings.get("THEME")
+        if theme:
+            for static in settings.get("THEME_STATIC_PATHS", ["static"]):
+                mounts.append(
+                    (
+                        settings.get("THEME_STATIC_DIR", "theme"),
+                        os.path.join(theme, static),
+                    )
+                )
+        for static in settings.get("STATIC_PATHS", ["images"]):
+            mounts.append((static, os.path.join(content, static)))
+        return cls(settings.get("OUTPUT_PATH", "output"), mounts)
+
+    def locate(self, path: str) -> str:
+        """Return the file serving URL ``path``."""
+        relative = posixpath.normpath("/" + path).lstrip("/")
+        for prefix, directory in self.mounts:
+            if relative == prefix and os.path.isfile(directory):
+                return directory
+            if not prefix or relative.startswith(prefix + "/"):
+                rest = relative[len(prefix):].lstrip("/")
+                candidate = os.path.join(directory, *rest.split("/"))
+                if os.path.isfile(candidate):
+                    return candidate
+        return os.path.join(self.output_path, *relative.split("/"))
+
+
+@contextmanager
+def atomic_path(path: str) -> Generator[str, None, None]:
+    """Yield a temporary path next to ``path``, renamed over it on success.
+
+    Readers, such as Pelican copying static files while a pipelined
+    capture runs, see either the old file or the complete new one. The
+    temporary name keeps the extension so writers can infer the format.
+    The file gets the umask's permissions, as ``open`` would give it,
+    rather than ``mkstemp``'s owner-only mode. A writer that removes the
+    temporary file leaves the target untouched.
+    """
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f".{os.path.basename(path)}.",
+        suffix=os.path.splitext(path)[1],
+        dir=os.path.dirname(path) or ".",
+    )
+    os.close(fd)
+    try:
+        yield tmp_path
+        if os.path.exists(tmp_path):
+            os.chmod(tmp_path, file_mode())
+            os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def file_mode() -> int:
+    """Permissions of a newly written file under the process umask."""
+    return 0o666 & ~_UMASK
+
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it; done once, at import
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+_UMASK = _read_umask()
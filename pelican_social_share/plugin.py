@@ -1,37 +1,110 @@
 """Main plugin implementation for Pelican Social Share."""
 
-import hashlib
-import http.server
+import atexit
 import logging
 import os
-import socketserver
-import threading
+import re
 import time
-from contextlib import contextmanager
-from typing import Any, Dict, Generator, List, Optional, Tuple, Union
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import (
+    Any,
+    ContextManager,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+)
 
 from pelican import signals
 from pelican.contents import Article, Page
 from pelican.generators import ArticlesGenerator, PagesGenerator
 from pelican.writers import Writer
 
-try:
-    from playwright.sync_api import sync_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+from .blocking import RequestFilter, RequestPolicy
+from .cache import CaptureCache, cache_from_settings, cache_names, copy_atomic
+from .capture import (
+    PLAYWRIGHT_AVAILABLE,
+    CaptureOptions,
+    CaptureResult,
+    CaptureSession,
+    CardJob,
+    ResultCallback,
+    run_capture,
+)
+from .critical import CriticalCss, critical_css_stats
+from .encode import (
+    FORMAT_EXTENSIONS,
+    EncodeOptions,
+    ImageEncoder,
+    formats_exist,
+    log_sizes,
+    variant_path,
+)
+from .hashing import (
+    HASH_VERSION,
+    AssetDigests,
+    capture_fingerprint,
+    card_input_hash,
+    card_key,
+    make_content_hash,
+)
+from .inline import DEFAULT_MAX_BYTES, InlineAssets
+from .manifest import MANIFEST_NAME, CardManifest, image_stem
+from .pages import (
+    SNAPSHOT_FIELDS,
+    CardSource,
+    chain_postprocess,
+    render_cards,
+    snapshot,
+    write_if_changed,
+)
+from .paths import StaticResolver
+from .renderers import CardRenderer, PillowRenderer, find_portrait
+from .server import (
+    MEMORY_ORIGIN,
+    AssetCache,
+    MemoryRouter,
+    ServerMetrics,
+    serve_directory,
+)
+from .timing import (
+    REPORT_NAME,
+    BuildTimings,
+    current_timings,
+    take_timings,
+    write_report,
+)
+from .variants import (
+    size_variant_path,
+    variants_fingerprint,
+    variants_from_settings,
+)
 
 # Use Pelican's logger instead of generator.logger
 logger = logging.getLogger(__name__)
 
-# Global storage for taglines (used for hash calculation)
-_taglines = {}
+# Files of a content-addressed card: social-<key>.png, -<variant>.png, .webp, ...
+IMAGE_KEY_RE = re.compile(r"^social-([0-9a-f]{16})[.-]")
+
+# Cards rendered during the generator phase, consumed by capture_social_cards
+_jobs: Dict[str, CardJob] = {}
+
+# Warm browser reused across autoreload rebuilds (SOCIAL_PERSISTENT_BROWSER)
+_session: Optional[CaptureSession] = None
+
+# Background capture started before Pelican writes the site (SOCIAL_PIPELINE)
+_pipeline: Optional["Future[List[CardJob]]"] = None
+_pipeline_executor: Optional[ThreadPoolExecutor] = None
 
 
 def register() -> None:
     """Register plugin with Pelican."""
     signals.article_generator_finalized.connect(build_social_pages_articles)
     signals.page_generator_finalized.connect(build_social_pages_pages)
+    signals.all_generators_finalized.connect(start_pipelined_capture)
     signals.finalized.connect(capture_social_cards)
 
 
@@ -67,6 +140,7 @@ def build_social_pages(
 
     # Setup directories
     html_dir = settings.get("SOCIAL_CARD_HTML_DIR", "content/social")
+    image_dir = settings.get("SOCIAL_IMAGE_DIR", "content/static/images")
     output_path = settings.get("OUTPUT_PATH", "output")
     output_social_dir = os.path.join(output_path, "social")
     
@@ -82,6 +156,29 @@ def build_social_pages(
 
     siteurl = settings.get("SITEURL", "")
     sitename = settings.get("SITENAME", "")
+    serve_from_memory = serves_from_memory(settings)
+
+    # Ready-to-use <img src>: the portrait's full URL, or its data URI when
+    # assets are inlined; portrait_url always stays a site path
+    portrait_src = siteurl + portrait_url if portrait_path else ""
+
+    # Embed the portrait and fonts so cards load nothing over HTTP; files
+    # are read from their source directories and encoded once per build
+    inline_assets = None
+    if settings.get("SOCIAL_INLINE_ASSETS", False):
+        inline_assets = InlineAssets(
+            output_path,
+            siteurl,
+            StaticResolver.from_settings(settings),
+            int(
+                settings.get("SOCIAL_INLINE_ASSETS_MAX_KB", DEFAULT_MAX_BYTES // 1024)
+                * 1024
+            ),
+        )
+        portrait_file = find_portrait(settings)
+        portrait_uri = inline_assets.encode(portrait_file) if portrait_file else None
+        if portrait_uri:
+            portrait_src = portrait_uri
     
     # Manual sample render (for testing)
     sample_tagline = settings.get("SOCIAL_SAMPLE_TAGLINE")
@@ -93,16 +190,32 @@ def build_social_pages(
                 SITENAME=sitename or "Sample Site",
                 SITEURL=siteurl,
                 portrait_url=portrait_url,
+                portrait_src=portrait_src,
             )
-            with open(sample_out, "w", encoding="utf-8") as f:
-                f.write(html)
+            write_if_changed(sample_out, html)
             logger.info(f"[social_share] Sample social card written to: {sample_out}")
             logger.info(f"[social_share] View at: file://{os.path.abspath(sample_out)}?debug")
         except Exception as e:
             logger.warning(f"[social_share] Failed to render sample social card: {e}")
     
-    processed = 0
-    
+    encoding = EncodeOptions.from_settings(settings)
+    variants = variants_from_settings(settings)
+    workers = settings.get("SOCIAL_RENDER_WORKERS", 1) or os.cpu_count() or 1
+    pool = settings.get("SOCIAL_RENDER_POOL", "thread")
+    # Only forked workers need picklable snapshots; threads share the objects
+    use_snapshots = workers > 1 and pool == "process"
+    dedupe = settings.get("SOCIAL_DEDUPE", False)
+    # Shared images are named after their assets too, read from their
+    # source directories since Pelican has not copied them yet
+    key_digests = (
+        AssetDigests(output_path, siteurl, StaticResolver.from_settings(settings))
+        if dedupe
+        else None
+    )
+    fields = SNAPSHOT_FIELDS + tuple(settings.get("SOCIAL_RENDER_FIELDS", ()))
+
+    sources = []
+    content_by_slug = {}
     for content_obj in content_objects:
         tagline = content_obj.metadata.get("tagline")
         if not tagline:
@@ -110,233 +223,759 @@ def build_social_pages(
                 f"[social_share] Skipping {getattr(content_obj, 'slug', '<unknown>')} - no tagline found"
             )
             continue
-        
+
         # Skip if article/page already has an image defined
         existing_image = content_obj.metadata.get("image")
         if existing_image:
             logger.debug(f"[social_share] Skipping {content_obj.slug} - already has image: {existing_image}")
             continue
-            
+
         slug = content_obj.slug
-        
-        # Render template
-        try:
-            html_content = template.render(
-                tagline=tagline,
-                portrait_url=portrait_url,
-                content_obj=content_obj,
-                article=content_obj if isinstance(content_obj, Article) else None,
-                page=content_obj if isinstance(content_obj, Page) else None,
-                SITEURL=siteurl,
-                SITENAME=sitename,
-                SEO=settings.get("SEO", {}),  # Add SEO variable
-            )
-        except Exception as e:
-            logger.warning(
-                f"[social_share] Failed to render template for {slug}: {e}"
-            )
-            continue
 
-        # Write to content directory (for versioning)
-        content_html_path = os.path.join(html_dir, f"{slug}.html")
-        try:
-            with open(content_html_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
-        except Exception as e:
-            logger.warning(
-                f"[social_share] Failed to write HTML for {slug}: {e}"
-            )
+        # Process workers get a picklable snapshot instead of the content object
+        content = snapshot(content_obj, fields) if use_snapshots else content_obj
+        sources.append(CardSource(slug, {
+            "tagline": tagline,
+            "content_obj": content,
+            "article": content if isinstance(content_obj, Article) else None,
+            "page": content if isinstance(content_obj, Page) else None,
+        }))
+        content_by_slug[slug] = content_obj
+
+    # Inline just the stylesheet rules the cards use; theme files are read
+    # from their source directories, as Pelican has not copied them yet
+    critical_css = None
+    if settings.get("SOCIAL_CRITICAL_CSS", False):
+        critical_css = CriticalCss(
+            output_path,
+            siteurl,
+            StaticResolver.from_settings(settings),
+            settings.get("SOCIAL_CRITICAL_CSS_KEEP", ()),
+        )
+
+    # Render and write each card to the content directory (for versioning)
+    # and to the output directory for immediate screenshot availability,
+    # unless the capture phase serves cards straight from memory
+    timings = current_timings()
+    with timings.phase("render_html"):
+        rendered = render_cards(
+            template,
+            {
+                "portrait_url": portrait_url,
+                "portrait_src": portrait_src,
+                "SITEURL": siteurl,
+                "SITENAME": sitename,
+                "SEO": settings.get("SEO", {}),  # Add SEO variable
+            },
+            sources,
+            html_dir,
+            None if serve_from_memory else output_social_dir,
+            workers,
+            pool,
+            chain_postprocess(critical_css, inline_assets),
+        )
+
+    processed = 0
+    written = 0
+    unchanged = 0
+    inlined_bytes = 0
+
+    for card in rendered:
+        if card.error:
+            logger.warning(f"[social_share] {card.error}")
+            timings.add_failure(card.slug, card.error)
             continue
 
-        # Also write to output directory for immediate screenshot availability
-        output_html_path = os.path.join(output_social_dir, f"{slug}.html")
-        try:
-            with open(output_html_path, "w", encoding="utf-8") as f:
-                f.write(html_content)
-        except Exception as e:
-            logger.warning(
-                f"[social_share] Failed to write output HTML for {slug}: {e}"
+        timings.add_card(card.slug, "render", card.render_ms)
+        timings.add_card(card.slug, "write", card.write_ms)
+
+        slug = card.slug
+        content_obj = content_by_slug[slug]
+        tagline = content_obj.metadata["tagline"]
+
+        # Identical cards share one content-addressed image
+        image_key = None
+        if key_digests is not None:
+            image_key = card_key(
+                tagline,
+                card.html,
+                key_digests.card_inputs(card.html, f"/social/{slug}.html"),
             )
-            continue
+        stem = image_stem(slug, image_key)
 
         # Set metadata for template usage
-        image_path = f"/static/images/{slug}-social-share.png"
+        image_paths = {
+            name: f"/static/images/{stem}.{FORMAT_EXTENSIONS[name]}"
+            for name in encoding.formats
+        }
+        image_path = image_paths[encoding.primary]
         content_obj.metadata["social_image"] = image_path
-        
+        if len(image_paths) > 1:
+            content_obj.metadata["social_images"] = image_paths
+        if variants:
+            content_obj.metadata["social_variants"] = {
+                variant.name: size_variant_path(image_path, variant.name)
+                for variant in variants
+            }
+
         # Also set the image attribute in frontmatter for general use
         content_obj.metadata["image"] = image_path
-        
-        # Store tagline globally for screenshot phase
-        _taglines[slug] = tagline
-        
+
+        # Queue the card for the screenshot phase
+        html_path = os.path.join(
+            html_dir if serve_from_memory else output_social_dir, f"{slug}.html"
+        )
+        _jobs[slug] = CardJob(
+            slug=slug,
+            url_path=f"/social/{slug}.html",
+            png_path=os.path.join(image_dir, f"{stem}.png"),
+            html_path=html_path,
+            tagline=tagline,
+            html=card.html,
+            image_key=image_key,
+        )
+
         processed += 1
+        if critical_css is not None:
+            inlined_bytes += critical_css_stats(card.html)[1]
+        written += card.content_changed + card.output_changed
+        unchanged += (not card.content_changed) + (
+            not serve_from_memory and not card.output_changed
+        )
 
     if processed > 0:
-        logger.info(f"[social_share] Generated {processed} social card HTML files")
+        logger.info(
+            f"[social_share] Social card HTML: {processed} rendered, "
+            f"{written} files written, {unchanged} unchanged"
+        )
+    if processed and critical_css is not None:
+        logger.info(
+            f"[social_share] Critical CSS: {inlined_bytes / processed / 1024:.1f} KB "
+            f"inlined per card on average"
+        )
+
+
+def start_pipelined_capture(generators: List[Any]) -> None:
+    """Start capturing in the background once every card has been rendered.
+
+    Enabled by ``SOCIAL_PIPELINE``. Runs while Pelican writes the site,
+    serving theme and static assets from their source directories since
+    they have not been copied to OUTPUT_PATH yet; joined at ``finalized``.
+    """
+    global _pipeline, _pipeline_executor
+    if not generators or not generators[0].settings.get("SOCIAL_PIPELINE", False):
+        return
+
+    jobs = list(_jobs.values())
+    _jobs.clear()
+    if _pipeline_executor is None:
+        # A single long-lived thread, so a persistent browser stays usable
+        _pipeline_executor = ThreadPoolExecutor(1, thread_name_prefix="social_share")
+    _pipeline = _pipeline_executor.submit(
+        run_capture_phase, generators[0].settings, jobs
+    )
+    logger.debug(f"[social_share] Pipelined capture started for {len(jobs)} cards")
 
 
 def capture_social_cards(pelican_obj: Any) -> None:
-    """Capture screenshots of social cards using Playwright."""
-    settings = pelican_obj.settings
-    
+    """Capture screenshots of social cards, or join the pipelined capture."""
+    global _pipeline
+    if _pipeline is not None:
+        pipeline, _pipeline = _pipeline, None
+        started = time.perf_counter()
+        written = pipeline.result()
+        logger.info(
+            f"[social_share] Pipelined capture joined after "
+            f"{time.perf_counter() - started:.1f}s wait"
+        )
+        publish_images(pelican_obj.settings, written)
+        return
+
+    # Take this build's work list; later rebuilds start from scratch
+    jobs = list(_jobs.values())
+    _jobs.clear()
+    run_capture_phase(pelican_obj.settings, jobs)
+
+
+def run_capture_phase(settings: Dict[str, Any], jobs: List[CardJob]) -> List[CardJob]:
+    """Run the screenshot phase and close out the build's timings.
+
+    Returns the cards whose files were written, see :func:`capture_jobs`.
+    """
+    try:
+        with current_timings().phase("capture_phase"):
+            return capture_jobs(settings, jobs)
+    finally:
+        report_timings(settings, take_timings())
+
+
+def report_timings(settings: Dict[str, Any], timings: BuildTimings) -> None:
+    """Write the JSON timing report if ``SOCIAL_TIMING_REPORT`` asks for one.
+
+    ``True`` writes ``social-share-timings.json`` to OUTPUT_PATH; a string
+    names the file, relative to OUTPUT_PATH.
+    """
+    report = settings.get("SOCIAL_TIMING_REPORT", False)
+    if not report:
+        return
+    name = report if isinstance(report, str) else REPORT_NAME
+    write_report(
+        timings,
+        os.path.join(settings.get("OUTPUT_PATH", "output"), name),
+        settings.get("SOCIAL_TIMING_SLOWEST", 10),
+    )
+
+
+def capture_jobs(settings: Dict[str, Any], jobs: List[CardJob]) -> List[CardJob]:
+    """Hash, skip and render the cards in ``jobs``, updating the manifest.
+
+    Returns the cards whose files were written: captured, pulled from the
+    capture cache or re-encoded.
+    """
+    written: List[CardJob] = []
+
     # Check if screenshots are disabled
     if settings.get("SOCIAL_DISABLE_SCREENSHOT", False):
         logger.info("[social_share] Screenshots disabled")
-        return
+        return written
     
-    if not PLAYWRIGHT_AVAILABLE:
+    options = CaptureOptions.from_settings(settings)
+    encoding = EncodeOptions.from_settings(settings)
+    variants = variants_from_settings(settings)
+    renderer = get_renderer(settings, options)
+    if renderer is None:
+        return written
+
+    if not renderer.is_available():
         logger.warning(
-            "[social_share] Playwright not installed. Install with: "
-            "pip install playwright && playwright install chromium"
+            f"[social_share] {type(renderer).__name__} dependencies not installed. "
+            f"Install with: {renderer.install_hint}"
         )
-        return
+        return written
+
+    if not jobs:
+        logger.debug("[social_share] No social pages to process")
+        return written
+
+    jobs = collapse_duplicates(jobs)
+    shared = sum(len(job.aliases) for job in jobs)
 
-    output_path = settings.get("OUTPUT_PATH", "output")
     image_dir = settings.get("SOCIAL_IMAGE_DIR", "content/static/images")
     
     os.makedirs(image_dir, exist_ok=True)
 
-    # Find social HTML files to process
-    social_pages = []
-    social_html_dir = os.path.join(output_path, "social")
-    
-    if not os.path.isdir(social_html_dir):
-        logger.debug("[social_share] No social HTML directory found")
-        return
-        
-    for filename in os.listdir(social_html_dir):
-        if filename.endswith(".html"):
-            slug = filename[:-5]  # Remove .html extension
-            social_pages.append(slug)
-
-    if not social_pages:
-        logger.debug("[social_share] No social pages to process")
-        return
+    hash_skip = settings.get("SOCIAL_HASH_SKIP", True)
 
-    # Collect taglines for hash calculation
-    taglines = _taglines
+    manifest = None
+    if hash_skip:
+        manifest = CardManifest.load(
+            settings.get(
+                "SOCIAL_MANIFEST_PATH", os.path.join(image_dir, MANIFEST_NAME)
+            ),
+            image_dir,
+        )
+        if not manifest.entries:
+            manifest.migrate_sidecars()
+        resolve_jobs(
+            jobs,
+            settings,
+            options,
+            manifest,
+            renderer.fingerprint()
+            + encoding.fingerprint()
+            + variants_fingerprint(variants),
+        )
 
-    # Screenshot settings
-    viewport = settings.get("SOCIAL_VIEWPORT", (1200, 675))
-    device_scale_factor = settings.get("SOCIAL_DEVICE_SCALE_FACTOR", 1)
-    wait_until = settings.get("SOCIAL_WAIT_UNTIL", "networkidle")
-    wait_selector = settings.get("SOCIAL_WAIT_SELECTOR", "body.images-ready")  # Wait for images
-    hash_skip = settings.get("SOCIAL_HASH_SKIP", True)
-    hash_version = settings.get("SOCIAL_HASH_VERSION", "v1")
+    # Size variants are cut from the full capture, so a missing one needs a new capture
+    for job in jobs:
+        if not job.needs_capture and not all(
+            os.path.exists(size_variant_path(job.png_path, variant.name))
+            for variant in variants
+        ):
+            job.needs_capture = True
+
+    # Pull cards other machines already captured from the shared cache
+    cache = cache_from_settings(settings) if manifest is not None else None
+    pulled = 0
+    if cache is not None and manifest is not None:
+        missing = [job for job in jobs if job.needs_capture]
+        pulled = pull_from_cache(cache, jobs, manifest, encoding, variants)
+        written.extend(job for job in missing if not job.needs_capture)
+
+    pending = [job for job in jobs if job.needs_capture]
+    skipped = len(jobs) - len(pending) - pulled
+    generated = 0
+    errors = 0
 
     # Start HTTP server and capture screenshots
     try:
-        with serve_directory(output_path) as port:
-            with sync_playwright() as p:
-                browser = p.chromium.launch(headless=True)
-                page = browser.new_page(
-                    viewport={
-                        "width": viewport[0],
-                        "height": viewport[1],
-                        "deviceScaleFactor": device_scale_factor
-                    }
-                )
-                
-                generated = 0
-                skipped = 0
-                errors = 0
-                
-                for slug in social_pages:
-                    tagline = taglines.get(slug, "")
-                    if not tagline:
-                        logger.debug(f"[social_share] Skipping screenshot for {slug} - no tagline available")
-                        continue
-                    
-                    png_path = os.path.join(image_dir, f"{slug}-social-share.png")
-                    
-                    # Check hash for skip logic
-                    if hash_skip and should_skip_generation(
-                        png_path, slug, tagline, hash_version
-                    ):
-                        skipped += 1
-                        continue
-                    
-                    url = f"http://127.0.0.1:{port}/social/{slug}.html"
-                    
-                    try:
-                        # Navigate and wait for network idle
-                        page.goto(url, wait_until=wait_until, timeout=15000)
-                        
-                        # Wait for images to load (custom selector)
-                        if wait_selector:
-                            try:
-                                page.wait_for_selector(wait_selector, timeout=10000)
-                            except:
-                                logger.warning(f"[social_share] Timeout waiting for selector {wait_selector} on {slug}")
-                        
-                        # Additional wait for images to render
-                        page.wait_for_timeout(1000)  # 1 second additional wait
-                        
-                        # Take screenshot
-                        page.screenshot(path=png_path, full_page=False)
-                        
-                        # Save hash for future skip logic
-                        if hash_skip:
-                            save_content_hash(png_path, slug, tagline, hash_version)
-                        
-                        generated += 1
-                        
-                    except Exception as e:
-                        logger.warning(
-                            f"[social_share] Failed to capture {slug}: {e}"
-                        )
-                        errors += 1
-                        continue
-                
-                browser.close()
-                
-                logger.info(
-                    f"[social_share] Screenshots: {generated} generated, "
-                    f"{skipped} skipped, {errors} errors"
+        encoder = None
+        if encoding.enabled or variants:
+            encoder = ImageEncoder(
+                encoding,
+                variants,
+                options.viewport,
+                settings.get("SOCIAL_DEVICE_SCALE_FACTOR", 1),
+            )
+            # Fresh cards only need encoding if a format's file went missing
+            for job in jobs:
+                pngs = [job.png_path] + [
+                    size_variant_path(job.png_path, variant.name)
+                    for variant in variants
+                ]
+                if not job.needs_capture and not all(
+                    formats_exist(png, encoding) for png in pngs
+                ):
+                    encoder.submit(job.slug, job.png_path, captured=False)
+                    written.append(job)
+
+        jobs_by_slug = {job.slug: job for job in pending}
+
+        def encode_when_captured(result: CaptureResult) -> None:
+            if result.ok and encoder is not None:
+                encoder.submit(result.slug, jobs_by_slug[result.slug].png_path)
+
+        timings = current_timings()
+        results = []
+        if pending:
+            with timings.phase("capture"):
+                results = renderer.render(
+                    pending, encode_when_captured if encoder else None
                 )
-                
+        if encoder is not None:
+            with timings.phase("encode_wait"):
+                log_sizes(encoder.finish())
+            for slug, ms in encoder.timings.items():
+                timings.add_card(slug, "encode", ms)
+
+        for result in results:
+            for step, ms in result.timings.items():
+                timings.add_card(result.slug, step, ms)
+            if not result.ok:
+                timings.add_failure(result.slug, result.error or "unknown error")
+                errors += 1
+                continue
+
+            # Record hash for future skip logic
+            job = jobs_by_slug[result.slug]
+            written.append(job)
+            if manifest is not None and job.input_hash:
+                manifest.record(job.manifest_key, job.input_hash, job.png_path)
+                if cache is not None:
+                    push_to_cache(cache, job, encoding, variants)
+
+            generated += 1
+
+        removed = collect_garbage(image_dir, jobs, manifest)
+
+        if manifest is not None:
+            # Forget deleted and renamed content
+            manifest.prune(job.manifest_key for job in jobs)
+            manifest.save()
+
+        logger.info(
+            f"[social_share] Screenshots: {generated} generated, "
+            f"{skipped} skipped, {errors} errors"
+            + (f", {pulled} from cache" if pulled else "")
+            + (f", {shared} shared" if shared else "")
+            + (f", {removed} stale removed" if removed else "")
+        )
+        if (
+            generated
+            and renderer.name == "playwright"
+            and options.ready_mode != "fixed"
+        ):
+            log_wait_savings(results, options)
+
     except Exception as e:
         logger.error(f"[social_share] Screenshot process failed: {e}")
 
+    return written
+
+
+def publish_images(settings: Dict[str, Any], jobs: List[CardJob]) -> int:
+    """Copy the files of ``jobs`` to where Pelican's static copy puts them.
+
+    A pipelined capture finishes after Pelican has listed and copied its
+    static files, so new cards would be missing from OUTPUT_PATH and
+    changed ones stale. Cards are mirrored from SOCIAL_IMAGE_DIR's place
+    under PATH; a directory outside PATH is left alone. Returns the
+    number of files copied.
+    """
+    image_dir = os.path.abspath(
+        settings.get("SOCIAL_IMAGE_DIR", "content/static/images")
+    )
+    relative = os.path.relpath(
+        image_dir, os.path.abspath(settings.get("PATH", "content"))
+    )
+    if not jobs or relative == os.pardir or relative.startswith(os.pardir + os.sep):
+        return 0
+
+    target = os.path.join(settings.get("OUTPUT_PATH", "output"), relative)
+    encoding = EncodeOptions.from_settings(settings)
+    variants = variants_from_settings(settings)
+    copied = 0
+    for job in jobs:
+        for path in card_files(job, encoding, variants).values():
+            if os.path.exists(path):
+                copy_atomic(path, os.path.join(target, os.path.basename(path)))
+                copied += 1
+    logger.debug(f"[social_share] Published {copied} pipelined card files to {target}")
+    return copied
+
+
+def card_files(
+    job: CardJob, encoding: EncodeOptions, variants: Iterable[Any]
+) -> Dict[str, str]:
+    """Every file written for one card, by cache name."""
+    pngs = [job.png_path] + [size_variant_path(job.png_path, v.name) for v in variants]
+    return cache_names(
+        job.png_path,
+        [variant_path(png, name) for png in pngs for name in encoding.formats],
+    )
+
+
+def pull_from_cache(
+    cache: CaptureCache,
+    jobs: List[CardJob],
+    manifest: CardManifest,
+    encoding: EncodeOptions,
+    variants: Iterable[Any],
+) -> int:
+    """Restore pending cards from ``cache``; returns how many were restored."""
+    pulled = 0
+    with current_timings().phase("cache_fetch"):
+        for job in jobs:
+            if not job.needs_capture or not job.input_hash:
+                continue
+            if cache.fetch(job.input_hash, card_files(job, encoding, variants)):
+                job.needs_capture = False
+                manifest.record(job.manifest_key, job.input_hash, job.png_path)
+                pulled += 1
+    return pulled
+
+
+def push_to_cache(
+    cache: CaptureCache, job: CardJob, encoding: EncodeOptions, variants: Iterable[Any]
+) -> None:
+    """Store a freshly captured card in ``cache`` once all its files exist."""
+    files = card_files(job, encoding, variants)
+    if job.input_hash is None or not all(
+        os.path.exists(path) for path in files.values()
+    ):
+        return
+    with current_timings().phase("cache_store"):
+        try:
+            cache.store(job.input_hash, files)
+        except Exception as e:
+            logger.warning(
+                f"[social_share] Cannot store {job.slug} in capture cache: {e}"
+            )
 
-@contextmanager
-def serve_directory(directory: str, port: int = 0) -> Generator[int, None, None]:
-    """Start a temporary HTTP server for the given directory."""
-    class QuietHandler(http.server.SimpleHTTPRequestHandler):
-        def __init__(self, *args, **kwargs):
-            super().__init__(*args, directory=directory, **kwargs)
-        
-        def log_message(self, format: str, *args: Any) -> None:
-            # Suppress HTTP server logs
-            pass
-    
-    with socketserver.TCPServer(("127.0.0.1", port), QuietHandler) as httpd:
-        assigned_port = httpd.server_address[1]
-        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
-        thread.start()
-        
+
+class PlaywrightRenderer(CardRenderer):
+    """Capture cards by screenshotting the rendered HTML in Chromium."""
+
+    name = "playwright"
+    install_hint = "pip install playwright && playwright install chromium"
+
+    def is_available(self) -> bool:
+        return PLAYWRIGHT_AVAILABLE
+
+    def fingerprint(self) -> str:
+        return RequestPolicy.from_settings(self.settings).fingerprint()
+
+    def render(
+        self, jobs: List[CardJob], on_result: Optional[ResultCallback] = None
+    ) -> List[CaptureResult]:
+        return capture_pending(jobs, self.settings, self.options, on_result)
+
+
+RENDERERS: Dict[str, Type[CardRenderer]] = {
+    "playwright": PlaywrightRenderer,
+    "pillow": PillowRenderer,
+}
+
+
+def get_renderer(
+    settings: Dict[str, Any], options: CaptureOptions
+) -> Optional[CardRenderer]:
+    """Instantiate the backend named (or given) by ``SOCIAL_RENDERER``."""
+    choice = settings.get("SOCIAL_RENDERER", "playwright")
+    if isinstance(choice, type) and issubclass(choice, CardRenderer):
+        return choice(settings, options)
+    if choice in RENDERERS:
+        return RENDERERS[choice](settings, options)
+    logger.warning(
+        f"[social_share] Unknown SOCIAL_RENDERER {choice!r}; "
+        f"expected one of {', '.join(RENDERERS)} or a CardRenderer subclass"
+    )
+    return None
+
+
+def capture_pending(
+    jobs: List[CardJob],
+    settings: Dict[str, Any],
+    options: CaptureOptions,
+    on_result: Optional[ResultCallback] = None,
+) -> List[CaptureResult]:
+    """Run the configured capture engine over the jobs that need it.
+
+    With ``SOCIAL_CAPTURE_SOURCE = "memory"`` (implied by
+    ``SOCIAL_PIPELINE``) Chromium's requests are answered by a
+    :class:`MemoryRouter` (card HTML from the work list, assets from an
+    in-process cache) and no local server is started. Requests rejected
+    by the ``SOCIAL_BLOCK_*`` settings are aborted by a
+    :class:`RequestFilter` in front of it. Over HTTP that filter turns on
+    request interception, which disables Chromium's HTTP cache; the cost
+    is logged. The filter lets the site's own host through, so over HTTP
+    it gets a router too, answering ``SITEURL`` requests from OUTPUT_PATH
+    rather than the live site.
+    """
+    memory = serves_from_memory(settings)
+    policy = RequestPolicy.from_settings(settings)
+    router = None
+    if memory or policy.enabled:
+        router = MemoryRouter(
+            {job.url_path: job.html for job in jobs} if memory else {},
+            settings.get("OUTPUT_PATH", "output"),
+            settings.get("SITEURL", ""),
+            AssetCache(asset_cache_bytes(settings)),
+            static_resolver(settings),
+        )
+
+    request_filter = RequestFilter(policy, router) if policy.enabled else None
+    handler = request_filter or router
+
+    try:
+        if settings.get("SOCIAL_PERSISTENT_BROWSER", False):
+            session = get_capture_session(settings, options)
+            if memory:
+                return session.capture(
+                    jobs, MEMORY_ORIGIN, handler, on_result=on_result
+                )
+            if request_filter is not None:
+                log_interception_cost(len(jobs))
+            return session.capture(jobs, router=handler, on_result=on_result)
+
+        if memory:
+            return run_capture(
+                jobs, MEMORY_ORIGIN, options, handler, on_result=on_result
+            )
+
+        metrics = ServerMetrics()
+        with asset_server(settings, metrics) as port:
+            try:
+                return run_capture(
+                    jobs,
+                    f"http://127.0.0.1:{port}",
+                    options,
+                    router=handler,
+                    on_result=on_result,
+                )
+            finally:
+                if request_filter is not None:
+                    log_interception_cost(len(jobs), metrics)
+    finally:
+        if request_filter is not None:
+            request_filter.log_summary()
+
+
+def serves_from_memory(settings: Dict[str, Any]) -> bool:
+    """Whether cards reach Chromium through request routing."""
+    return bool(
+        settings.get("SOCIAL_CAPTURE_SOURCE", "http") == "memory"
+        or settings.get("SOCIAL_PIPELINE", False)
+    )
+
+
+def static_resolver(settings: Dict[str, Any]) -> StaticResolver:
+    """Resolver for card assets; pipelined captures read source directories."""
+    if settings.get("SOCIAL_PIPELINE", False):
+        return StaticResolver.from_settings(settings)
+    return StaticResolver(settings.get("OUTPUT_PATH", "output"))
+
+
+def asset_cache_bytes(settings: Dict[str, Any]) -> int:
+    """Size of the in-memory asset cache from ``SOCIAL_ASSET_CACHE_MB``."""
+    return int(settings.get("SOCIAL_ASSET_CACHE_MB", 64) * 1024 * 1024)
+
+
+def asset_server(
+    settings: Dict[str, Any], metrics: Optional[ServerMetrics] = None
+) -> ContextManager[int]:
+    """Create the local server that hands cards and theme assets to Chromium."""
+    return serve_directory(
+        settings.get("OUTPUT_PATH", "output"),
+        cache_bytes=asset_cache_bytes(settings),
+        metrics=metrics,
+    )
+
+
+def log_interception_cost(cards: int, metrics: Optional[ServerMetrics] = None) -> None:
+    """Note that request blocking over HTTP defeats Chromium's HTTP cache.
+
+    Playwright disables the cache for any intercepted context, so theme
+    assets are fetched from the local server again for every card.
+    """
+    served = (
+        f" ({metrics.requests} asset requests for {cards} cards)" if metrics else ""
+    )
+    logger.info(
+        f"[social_share] Request blocking intercepts every request, which turns off "
+        f"Chromium's HTTP cache, so theme assets are fetched again for each "
+        f"card{served}. "
+        f'SOCIAL_CAPTURE_SOURCE = "memory" serves them from an in-process cache instead'
+    )
+
+
+def get_capture_session(
+    settings: Dict[str, Any], options: CaptureOptions
+) -> CaptureSession:
+    """Return the warm capture session, (re)starting it when needed."""
+    global _session
+    memory = serves_from_memory(settings)
+    key = (os.path.abspath(settings.get("OUTPUT_PATH", "output")), memory, options)
+    if _session is not None and _session.key == key and _session.is_healthy():
+        return _session
+
+    if _session is not None:
+        logger.info("[social_share] Restarting persistent browser")
+        _session.close()
+        _session = None
+
+    _session = CaptureSession(None if memory else asset_server(settings), options, key)
+    return _session
+
+
+def close_capture_session() -> None:
+    """Shut down the persistent browser, if one is running."""
+    global _session
+    if _session is not None:
+        try:
+            _session.close()
+        except Exception as e:
+            # A session started by the pipeline thread cannot be closed from
+            # another one; Chromium exits with the Playwright driver anyway
+            logger.debug(f"[social_share] Could not close persistent browser: {e}")
+        _session = None
+
+
+atexit.register(close_capture_session)
+
+
+def collapse_duplicates(jobs: List[CardJob]) -> List[CardJob]:
+    """Keep one job per content-addressed image, recording the rest as aliases.
+
+    Jobs without an ``image_key`` (``SOCIAL_DEDUPE`` off) are kept as is.
+    """
+    unique = []
+    by_key: Dict[str, CardJob] = {}
+    for job in jobs:
+        first = by_key.get(job.image_key) if job.image_key else None
+        if first is not None:
+            first.aliases.append(job.slug)
+            continue
+        if job.image_key:
+            by_key[job.image_key] = job
+        unique.append(job)
+    return unique
+
+
+def collect_garbage(
+    image_dir: str, jobs: List[CardJob], manifest: Optional[CardManifest]
+) -> int:
+    """Remove content-addressed images no card in this build refers to.
+
+    Every change to a deduplicated card's tagline, HTML or linked assets
+    gives it a new ``social-<key>`` name; the old PNG, its formats and size
+    variants, and its manifest entry are dropped here so Pelican stops
+    copying them. Returns the number of keys removed.
+    """
+    referenced = {job.image_key for job in jobs if job.image_key}
+    if manifest is not None:
+        names = manifest.image_names()  # Keys added this build are all referenced
+    else:
         try:
-            # Give server a moment to start
-            time.sleep(0.1)
-            yield assigned_port
-        finally:
-            httpd.shutdown()
-            thread.join(timeout=1.0)
+            names = set(os.listdir(image_dir))
+        except OSError:
+            return 0
+
+    stale: Dict[str, List[str]] = {}
+    for name in names:
+        match = IMAGE_KEY_RE.match(name)
+        if match and match.group(1) not in referenced:
+            stale.setdefault(match.group(1), []).append(name)
+    if manifest is not None:
+        for key, entry in list(manifest.entries.items()):
+            if entry.get("png") == f"social-{key}.png" and key not in referenced:
+                stale.setdefault(key, [])
+
+    for key, files in stale.items():
+        for name in files:
+            try:
+                os.remove(os.path.join(image_dir, name))
+            except OSError as e:
+                logger.debug(f"[social_share] Cannot remove stale card {name}: {e}")
+        if manifest is not None:
+            manifest.remove(key)
+    return len(stale)
+
+
+def resolve_jobs(
+    jobs: List[CardJob],
+    settings: Dict[str, Any],
+    options: CaptureOptions,
+    manifest: CardManifest,
+    renderer_fingerprint: str = "",
+) -> None:
+    """Fill in each job's input hash and decide whether it needs capturing.
+
+    Asset digests are taken here rather than while rendering, once Pelican
+    has copied the theme and static files into OUTPUT_PATH (or, when
+    pipelined, from their source directories), and are shared across all
+    cards.
+    """
+    asset_digests = AssetDigests(
+        settings.get("OUTPUT_PATH", "output"),
+        settings.get("SITEURL", ""),
+        static_resolver(settings),
+    )
+    fingerprint = capture_fingerprint(options) + renderer_fingerprint
+    hash_version = settings.get("SOCIAL_HASH_VERSION", HASH_VERSION)
+    timings = current_timings()
+
+    with timings.phase("hash"):
+        for job in jobs:
+            started = time.perf_counter()
+            job.input_hash = card_input_hash(
+                job.manifest_key, job, hash_version, asset_digests, fingerprint
+            )
+            job.needs_capture = not manifest.is_fresh(job.manifest_key, job.input_hash)
+            timings.add_card(job.slug, "hash", (time.perf_counter() - started) * 1000)
 
 
-def make_content_hash(slug: str, tagline: str, version: str) -> str:
-    """Create a hash for content to detect changes."""
-    hasher = hashlib.sha256()
-    hasher.update(version.encode("utf-8"))
-    hasher.update(slug.encode("utf-8"))
-    hasher.update(tagline.encode("utf-8"))
-    return hasher.hexdigest()[:16]
+def log_wait_savings(results: List[CaptureResult], options: CaptureOptions) -> None:
+    """Report readiness wait time against the legacy fixed sleep."""
+    waits = [r.wait_ms for r in results if r.ok]
+    waited = sum(waits) / 1000
+    fixed = len(waits) * options.render_wait_ms / 1000
+    logger.info(
+        f"[social_share] Render waits: {waited:.1f}s total, "
+        f"{waited * 1000 / len(waits):.0f} ms/card avg; a fixed "
+        f"{options.render_wait_ms} ms sleep would have cost {fixed:.1f}s "
+        f"({max(fixed - waited, 0):.1f}s saved)"
+    )
 
 
 def should_skip_generation(
-    png_path: str, slug: str, tagline: str, version: str
+    png_path: str, slug: str, tagline: str, version: str, extra: Iterable[str] = ()
 ) -> bool:
-    """Check if PNG generation should be skipped based on hash."""
+    """Check if PNG generation should be skipped based on a ``.hash`` sidecar.
+
+    The plugin now keeps hashes in a :class:`CardManifest`; sidecars are
+    only read to migrate existing sites.
+    """
     if not os.path.exists(png_path):
         return False
     
@@ -348,17 +987,19 @@ def should_skip_generation(
         with open(hash_file, "r", encoding="utf-8") as f:
             stored_hash = f.read().strip()
         
-        current_hash = make_content_hash(slug, tagline, version)
+        current_hash = make_content_hash(slug, tagline, version, extra)
         return stored_hash == current_hash
         
     except Exception:
         return False
 
 
-def save_content_hash(png_path: str, slug: str, tagline: str, version: str) -> None:
-    """Save content hash for future skip logic."""
+def save_content_hash(
+    png_path: str, slug: str, tagline: str, version: str, extra: Iterable[str] = ()
+) -> None:
+    """Save content hash to a legacy ``.hash`` sidecar."""
     hash_file = png_path + ".hash"
-    content_hash = make_content_hash(slug, tagline, version)
+    content_hash = make_content_hash(slug, tagline, version, extra)
     
     try:
         with open(hash_file, "w", encoding="utf-8") as f:
@@ -0,0 +1,274 @@
+"""Card renderer backends for Pelican Social Share."""
+
+import json
+import logging
+import os
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+from .capture import CaptureOptions, CaptureResult, CardJob, ResultCallback
+from .hashing import file_digest
+from .paths import atomic_path
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Fonts tried, in order, when a layout does not name one
+DEFAULT_FONTS = ("DejaVuSans-Bold.ttf", "Arial Bold.ttf", "arialbd.ttf")
+
+
+class CardRenderer(ABC):
+    """Backend that turns a work list of cards into image files.
+
+    Subclasses implement :meth:`render`; ``SOCIAL_RENDERER`` may name a
+    built-in backend or be a subclass of this class.
+    """
+
+    name = ""
+    install_hint = ""
+
+    def __init__(self, settings: Dict[str, Any], options: CaptureOptions) -> None:
+        self.settings = settings
+        self.options = options
+
+    def is_available(self) -> bool:
+        """Whether the backend's dependencies are installed."""
+        return True
+
+    def fingerprint(self) -> str:
+        """Backend-specific settings that change the produced pixels."""
+        return ""
+
+    @abstractmethod
+    def render(
+        self, jobs: List[CardJob], on_result: Optional[ResultCallback] = None
+    ) -> List[CaptureResult]:
+        """Produce ``job.png_path`` for every job.
+
+        ``on_result`` is called with each result as soon as its card is done.
+        """
+
+
+def find_portrait(settings: Dict[str, Any]) -> Optional[str]:
+    """Locate the ``SOCIAL_PORTRAIT_PATH`` file in the source or output tree."""
+    portrait_path: str = settings.get("SOCIAL_PORTRAIT_PATH") or ""
+    if not portrait_path:
+        return None
+    relative = portrait_path.lstrip("/")
+    if relative.startswith("content/"):
+        relative = relative[len("content/"):]
+    for candidate in (
+        portrait_path,
+        os.path.join(settings.get("PATH", "content"), relative),
+        os.path.join(settings.get("OUTPUT_PATH", "output"), relative),
+    ):
+        if os.path.isfile(candidate):
+            return candidate
+    return None
+
+
+def default_layout(viewport: Tuple[int, int]) -> Dict[str, Any]:
+    """Layout matching ``examples/social_card.html`` for the given viewport.
+
+    Text sits in a centered square safe zone with the portrait anchored to
+    its bottom-right corner at natural size.
+    """
+    width, height = viewport
+    safe = min(width, height)
+    left = (width - safe) // 2
+    top = (height - safe) // 2
+    return {
+        "background": "#ffffff",
+        "tagline": {
+            "x": left + 64,
+            "y": top + 72,
+            "width": safe - 128,
+            "font": None,
+            "size": 72,
+            "line_height": 1.05,
+            "color": "#111111",
+        },
+        "sitename": {
+            "margin_top": 18,
+            "font": None,
+            "size": 28,
+            "color": "#111111",
+            "opacity": 0.75,
+        },
+        "portrait": {"right": left, "bottom": top},
+    }
+
+
+class PillowRenderer(CardRenderer):
+    """Pure-Python renderer drawing cards from a declarative layout.
+
+    Draws the tagline, site name and portrait described by
+    ``SOCIAL_PILLOW_LAYOUT`` (merged over :func:`default_layout`) without a
+    browser. Suited to simple text-plus-portrait templates.
+    """
+
+    name = "pillow"
+    install_hint = "pip install Pillow"
+
+    def __init__(self, settings: Dict[str, Any], options: CaptureOptions) -> None:
+        super().__init__(settings, options)
+        self.layout = default_layout(options.viewport)
+        for key, value in settings.get("SOCIAL_PILLOW_LAYOUT", {}).items():
+            if isinstance(value, dict) and isinstance(self.layout.get(key), dict):
+                self.layout[key] = {**self.layout[key], **value}
+            else:
+                self.layout[key] = value
+        self._fonts: Dict[Tuple[Optional[str], int], Any] = {}
+        self._portrait: Any = None
+
+    def is_available(self) -> bool:
+        return PILLOW_AVAILABLE
+
+    def fingerprint(self) -> str:
+        # The configured (project-relative) path and the file's content, so
+        # the fingerprint is the same on every machine and checkout
+        portrait = self._portrait_path()
+        return json.dumps(
+            {
+                "renderer": self.name,
+                "layout": self.layout,
+                "portrait": [
+                    self.settings.get("SOCIAL_PORTRAIT_PATH", ""),
+                    file_digest(portrait) if portrait else None,
+                ],
+            },
+            sort_keys=True,
+        )
+
+    def render(
+        self, jobs: List[CardJob], on_result: Optional[ResultCallback] = None
+    ) -> List[CaptureResult]:
+        sitename = self.settings.get("SITENAME", "")
+        results = []
+        for job in jobs:
+            started = time.perf_counter()
+            try:
+                with atomic_path(job.png_path) as tmp_path:
+                    self.render_card(job.tagline, sitename).save(tmp_path, "PNG")
+                draw_ms = (time.perf_counter() - started) * 1000
+                results.append(CaptureResult(job.slug, True, timings={"draw": draw_ms}))
+            except Exception as e:
+                logger.warning(f"[social_share] Failed to render {job.slug}: {e}")
+                results.append(CaptureResult(job.slug, False, str(e)))
+            if on_result is not None:
+                on_result(results[-1])
+        return results
+
+    def render_card(self, tagline: str, sitename: str) -> Any:
+        """Draw a single card and return it as a PIL image."""
+        scale = self.options.device_scale_factor
+        width, height = self.options.viewport
+        image = Image.new(
+            "RGB",
+            (round(width * scale), round(height * scale)),
+            self.layout["background"],
+        )
+        draw = ImageDraw.Draw(image, "RGBA")
+
+        spec = self.layout["tagline"]
+        y = self._draw_text(
+            draw,
+            tagline,
+            spec,
+            spec["x"] * scale,
+            spec["y"] * scale,
+            spec["width"] * scale,
+        )
+
+        spec = self.layout["sitename"]
+        if sitename and spec:
+            self._draw_text(
+                draw, sitename, spec, self.layout["tagline"]["x"] * scale,
+                y + spec.get("margin_top", 0) * scale,
+                self.layout["tagline"]["width"] * scale,
+            )
+
+        portrait = self._load_portrait()
+        if portrait is not None:
+            spec = self.layout["portrait"]
+            if scale != 1:
+                portrait = portrait.resize(
+                    (round(portrait.width * scale), round(portrait.height * scale))
+                )
+            x = image.width - round(spec.get("right", 0) * scale) - portrait.width
+            y = image.height - round(spec.get("bottom", 0) * scale) - portrait.height
+            image.paste(portrait, (x, y), portrait)
+
+        return image
+
+    def _draw_text(
+        self,
+        draw: Any,
+        text: str,
+        spec: Dict[str, Any],
+        x: float,
+        y: float,
+        width: float,
+    ) -> float:
+        """Draw word-wrapped text and return the y coordinate below it."""
+        size = round(spec["size"] * self.options.device_scale_factor)
+        font = self._font(spec.get("font"), size)
+        line_height = size * spec.get("line_height", 1.2)
+        swatch = Image.new("RGB", (1, 1), spec.get("color", "#000000"))
+        color = cast(Tuple[int, int, int], swatch.getpixel((0, 0)))
+        fill = color + (round(255 * spec.get("opacity", 1)),)
+
+        line = ""
+        for word in text.split():
+            candidate = f"{line} {word}".strip()
+            if line and draw.textlength(candidate, font=font) > width:
+                draw.text((x, y), line, font=font, fill=fill)
+                y += line_height
+                line = word
+            else:
+                line = candidate
+        if line:
+            draw.text((x, y), line, font=font, fill=fill)
+            y += line_height
+        return y
+
+    def _font(self, path: Optional[str], size: int) -> Any:
+        key = (path, size)
+        if key not in self._fonts:
+            for candidate in ([path] if path else list(DEFAULT_FONTS)):
+                try:
+                    self._fonts[key] = ImageFont.truetype(candidate, size)
+                    break
+                except OSError:
+                    continue
+            else:
+                if path:
+                    logger.warning(
+                        f"[social_share] Font {path} not found, using default"
+                    )
+                try:
+                    self._fonts[key] = ImageFont.load_default(size=size)
+                except TypeError:
+                    self._fonts[key] = ImageFont.load_default()
+        return self._fonts[key]
+
+    def _portrait_path(self) -> Optional[str]:
+        return find_portrait(self.settings)
+
+    def _load_portrait(self) -> Any:
+        if self._portrait is None:
+            self._portrait = False
+            path = self._portrait_path()
+            if path:
+                try:
+                    with Image.open(path) as image:
+                        self._portrait = image.convert("RGBA")
+                except Exception as e:
+                    logger.warning(f"[social_share] Cannot draw portrait {path}: {e}")
+        return self._portrait if self._portrait is not False else None
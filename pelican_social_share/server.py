@@ -0,0 +1,288 @@
+"""Local asset server used while capturing social cards."""
+
+import http.client
+import http.server
+import io
+import logging
+import mimetypes
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Dict, Generator, Optional, Tuple
+from urllib.parse import unquote, urlsplit
+
+from .paths import StaticResolver
+from .timing import current_timings
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_BYTES = 64 * 1024 * 1024
+
+# Origin Chromium is pointed at when cards are served from memory
+MEMORY_ORIGIN = "http://social-share.invalid"
+
+
+@dataclass
+class ServerMetrics:
+    """Request counters for one asset server."""
+
+    requests: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+    not_modified: int = 0
+    bytes_sent: int = 0
+
+
+class AssetCache:
+    """Thread-safe LRU cache of file contents.
+
+    Entries are validated against the file's size and mtime on every
+    lookup, so edits between autoreload rebuilds are picked up.
+    """
+
+    def __init__(self, max_bytes: int = DEFAULT_CACHE_BYTES) -> None:
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[int, int, bytes, str]]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> Optional[Tuple[bytes, str, bool]]:
+        """Return ``(data, etag, hit)`` for ``path``, or None if it is missing."""
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                return entry[2], entry[3], True
+
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        if len(data) <= self.max_bytes:
+            with self._lock:
+                old = self._entries.pop(path, None)
+                if old:
+                    self._size -= len(old[2])
+                self._entries[path] = (stat.st_mtime_ns, stat.st_size, data, etag)
+                self._size += len(data)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted[2])
+        return data, etag, False
+
+
+class _AssetHandler(http.server.SimpleHTTPRequestHandler):
+    """Keep-alive handler serving files from an :class:`AssetCache`."""
+
+    protocol_version = "HTTP/1.1"
+    cache: AssetCache
+    metrics: ServerMetrics
+    metrics_lock: threading.Lock
+
+    def log_message(self, format: str, *args: Any) -> None:
+        # Suppress HTTP server logs
+        pass
+
+    def send_head(self) -> Optional[BinaryIO]:
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            return super().send_head()
+
+        entry = self.cache.get(path)
+        if entry is None:
+            self.send_error(404, "File not found")
+            return None
+        data, etag, hit = entry
+
+        with self.metrics_lock:
+            self.metrics.requests += 1
+            if hit:
+                self.metrics.cache_hits += 1
+            else:
+                self.metrics.cache_misses += 1
+
+        if self.headers.get("If-None-Match") == etag:
+            with self.metrics_lock:
+                self.metrics.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        self.send_response(200)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("ETag", etag)
+        # Cards are unique per page; theme assets are shared by every card.
+        # Each capture run uses a fresh browser context, so nothing outlives it.
+        if path.endswith(".html"):
+            self.send_header("Cache-Control", "no-cache")
+        else:
+            self.send_header("Cache-Control", "max-age=3600")
+        self.end_headers()
+
+        if self.command != "HEAD":
+            with self.metrics_lock:
+                self.metrics.bytes_sent += len(data)
+        return io.BytesIO(data)
+
+
+class _ThreadingServer(http.server.ThreadingHTTPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+def wait_until_serving(port: int, timeout: float = 5.0) -> None:
+    """Block until the server on ``port`` answers an HTTP request."""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            connection = http.client.HTTPConnection("127.0.0.1", port, timeout=1)
+            try:
+                connection.request("HEAD", "/")
+                connection.getresponse().read()
+                return
+            finally:
+                connection.close()
+        except OSError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.01)
+
+
+@contextmanager
+def serve_directory(
+    directory: str,
+    port: int = 0,
+    cache_bytes: int = DEFAULT_CACHE_BYTES,
+    metrics: Optional[ServerMetrics] = None,
+) -> Generator[int, None, None]:
+    """Start a temporary threaded HTTP server for the given directory.
+
+    Connections are kept alive, files are cached in memory up to
+    ``cache_bytes`` and served with ETags. Request counters are collected
+    into ``metrics`` if one is passed.
+    """
+    metrics = metrics if metrics is not None else ServerMetrics()
+    cache = AssetCache(cache_bytes)
+    lock = threading.Lock()
+
+    class Handler(_AssetHandler):
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            super().__init__(*args, directory=directory, **kwargs)
+
+    Handler.cache = cache
+    Handler.metrics = metrics
+    Handler.metrics_lock = lock
+
+    started = time.perf_counter()
+    with _ThreadingServer(("127.0.0.1", port), Handler) as httpd:
+        assigned_port = httpd.server_address[1]
+        thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+        thread.start()
+
+        try:
+            wait_until_serving(assigned_port)
+            current_timings().add_phase("server_start", time.perf_counter() - started)
+            yield assigned_port
+        finally:
+            httpd.shutdown()
+            thread.join(timeout=1.0)
+            logger.debug(
+                f"[social_share] Asset server: {metrics.requests} requests, "
+                f"{metrics.cache_hits} cache hits, "
+                f"{metrics.not_modified} not modified, "
+                f"{metrics.bytes_sent} bytes sent"
+            )
+
+
+class MemoryRouter:
+    """Answer Chromium's requests from memory instead of a local server.
+
+    Installed with ``context.route("**/*", ...)``. Card HTML comes from
+    ``pages`` (keyed by URL path) and every other same-origin path, or a
+    path on ``siteurl``, is read from ``output_path`` (or wherever
+    ``resolver`` points) through an :class:`AssetCache`. Requests to other
+    hosts pass through untouched.
+    """
+
+    def __init__(
+        self,
+        pages: Dict[str, str],
+        output_path: str,
+        siteurl: str = "",
+        cache: Optional[AssetCache] = None,
+        resolver: Optional[StaticResolver] = None,
+    ) -> None:
+        self.pages = pages
+        self.output_path = output_path
+        self.siteurl = siteurl.rstrip("/")
+        self.cache = cache or AssetCache()
+        self.resolver = resolver or StaticResolver(output_path)
+        self.metrics = ServerMetrics()
+        self._lock = threading.Lock()
+
+    def resolve(self, url: str) -> Optional[Tuple[int, bytes, str]]:
+        """Return ``(status, body, content_type)`` for a local URL, else None."""
+        if url.startswith(MEMORY_ORIGIN + "/"):
+            path = url[len(MEMORY_ORIGIN):]
+        elif self.siteurl and url.startswith(self.siteurl + "/"):
+            path = url[len(self.siteurl):]
+        else:
+            return None
+
+        path = unquote(urlsplit(path).path)
+        with self._lock:
+            self.metrics.requests += 1
+
+        if path in self.pages:
+            body = self.pages[path].encode("utf-8")
+            self._count(len(body), hit=True)
+            return 200, body, "text/html; charset=utf-8"
+
+        file_path = self.resolver.locate(path)
+        entry = self.cache.get(file_path)
+        if entry is None:
+            return 404, b"", "text/plain"
+        data, _, hit = entry
+        self._count(len(data), hit)
+        content_type = mimetypes.guess_type(file_path)[0] or "application/octet-stream"
+        return 200, data, content_type
+
+    def handle(self, route: Any) -> None:
+        """Sync Playwright route handler."""
+        response = self.resolve(route.request.url)
+        if response is None:
+            route.continue_()
+        else:
+            status, body, content_type = response
+            route.fulfill(status=status, body=body, content_type=content_type)
+
+    async def handle_async(self, route: Any) -> None:
+        """Async Playwright route handler."""
+        response = self.resolve(route.request.url)
+        if response is None:
+            await route.continue_()
+        else:
+            status, body, content_type = response
+            await route.fulfill(status=status, body=body, content_type=content_type)
+
+    def _count(self, size: int, hit: bool) -> None:
+        with self._lock:
+            self.metrics.bytes_sent += size
+            if hit:
+                self.metrics.cache_hits += 1
+            else:
+                self.metrics.cache_misses += 1
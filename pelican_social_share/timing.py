@@ -0,0 +1,142 @@
+"""Build-time instrumentation for Pelican Social Share."""
+
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Generator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+REPORT_NAME = "social-share-timings.json"
+REPORT_VERSION = 1
+
+# Per-card steps, in pipeline order
+CARD_STEPS = ("render", "write", "hash", "goto", "wait", "screenshot", "draw", "encode")
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of ``values`` (which must not be empty)."""
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(fraction * len(ordered)) - 1)]
+
+
+class BuildTimings:
+    """Phase totals and per-card step timings for one build.
+
+    Safe to update from capture and encoder worker threads. Phases that
+    run in parallel workers (such as browser launches) are summed.
+    """
+
+    def __init__(self) -> None:
+        self.phases: Dict[str, float] = {}
+        self.cards: Dict[str, Dict[str, float]] = {}
+        self.failures: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None, None, None]:
+        """Add the time spent in the block to phase ``name``."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase(name, time.perf_counter() - started)
+
+    def add_phase(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def add_card(self, slug: str, step: str, ms: float) -> None:
+        with self._lock:
+            steps = self.cards.setdefault(slug, {})
+            steps[step] = steps.get(step, 0.0) + ms
+
+    def add_failure(self, slug: str, error: str) -> None:
+        with self._lock:
+            self.failures[slug] = error
+
+    def report(self, slowest: int = 10) -> Dict[str, Any]:
+        """Summarize the build as a JSON-serializable dict."""
+        steps = {}
+        for step in CARD_STEPS:
+            values = [card[step] for card in self.cards.values() if step in card]
+            if values:
+                steps[step] = {
+                    "count": len(values),
+                    "total_ms": round(sum(values), 1),
+                    "p50_ms": round(percentile(values, 0.5), 1),
+                    "p95_ms": round(percentile(values, 0.95), 1),
+                    "max_ms": round(max(values), 1),
+                }
+
+        totals = {slug: sum(card.values()) for slug, card in self.cards.items()}
+        ranked = sorted(totals, key=totals.__getitem__, reverse=True)[:slowest]
+        return {
+            "version": REPORT_VERSION,
+            "generated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "cards": len(self.cards),
+            "phases_s": {name: round(value, 3) for name, value in self.phases.items()},
+            "steps": steps,
+            "slowest": [
+                {
+                    "slug": slug,
+                    "total_ms": round(totals[slug], 1),
+                    **{step: round(ms, 1) for step, ms in self.cards[slug].items()},
+                }
+                for slug in ranked
+            ],
+            "failures": [
+                {"slug": slug, "error": error}
+                for slug, error in sorted(self.failures.items())
+            ],
+        }
+
+
+# Timings of the build in progress; replaced by take_timings() at the end
+_current = BuildTimings()
+
+
+def current_timings() -> BuildTimings:
+    """Timings of the build in progress."""
+    return _current
+
+
+def take_timings() -> BuildTimings:
+    """Return the finished build's timings and start afresh for the next one."""
+    global _current
+    finished, _current = _current, BuildTimings()
+    return finished
+
+
+def write_report(timings: BuildTimings, path: str, slowest: int = 10) -> Optional[str]:
+    """Write the JSON report and log a short summary. Returns the path written."""
+    report = timings.report(slowest)
+    try:
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    except OSError as e:
+        logger.warning(f"[social_share] Cannot write timing report {path}: {e}")
+        return None
+
+    phases = ", ".join(
+        f"{name} {value:.2f}s" for name, value in report["phases_s"].items()
+    )
+    logger.info(f"[social_share] Timings: {phases}")
+    for step, stats in report["steps"].items():
+        logger.info(
+            f"[social_share]   {step:<10} p50 {stats['p50_ms']:.0f} ms, "
+            f"p95 {stats['p95_ms']:.0f} ms, max {stats['max_ms']:.0f} ms"
+        )
+    if report["slowest"]:
+        slowest_cards = ", ".join(
+            f"{card['slug']} ({card['total_ms']:.0f} ms)"
+            for card in report["slowest"][:3]
+        )
+        logger.info(f"[social_share] Slowest cards: {slowest_cards}")
+    logger.info(f"[social_share] Timing report written to {path}")
+    return path
@@ -0,0 +1,123 @@
+"""Size variants derived from a single card capture."""
+
+import json
+import logging
+import os
+from dataclasses import dataclass
+from typing import Any, Dict, List, Sequence, Tuple
+
+from .paths import atomic_path
+
+try:
+    from PIL import Image
+    PILLOW_AVAILABLE = True
+except ImportError:
+    PILLOW_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Variant:
+    """One extra size written for every card."""
+
+    name: str
+    size: Tuple[int, int]
+
+
+def variants_from_settings(settings: Dict[str, Any]) -> Tuple[Variant, ...]:
+    """Read ``SOCIAL_VARIANTS`` (a mapping of name to ``(width, height)``)."""
+    configured = settings.get("SOCIAL_VARIANTS", {})
+    if not configured:
+        return ()
+    if not PILLOW_AVAILABLE:
+        logger.warning(
+            "[social_share] SOCIAL_VARIANTS needs Pillow; "
+            "install with: pip install Pillow"
+        )
+        return ()
+    return tuple(
+        Variant(name, (int(size[0]), int(size[1]))) for name, size in configured.items()
+    )
+
+
+def capture_scale(
+    viewport: Sequence[int], variants: Sequence[Variant], scale: float = 1
+) -> float:
+    """Device scale factor at which every variant is cut without upscaling.
+
+    The card keeps its viewport, so its layout is unchanged, but is
+    rendered with enough pixels that the centered region each variant is
+    cut from holds at least the variant's own size times ``scale``.
+    """
+    width, height = viewport
+    needed = scale
+    for variant in variants:
+        # CSS pixels of the viewport per variant pixel in its crop region
+        region = min(width / variant.size[0], height / variant.size[1])
+        needed = max(needed, scale / region)
+    return needed
+
+
+def variants_fingerprint(variants: Sequence[Variant]) -> str:
+    """Serialize the variant sizes for the card hash."""
+    if not variants:
+        return ""
+    return json.dumps(
+        {variant.name: variant.size for variant in variants}, sort_keys=True
+    )
+
+
+def size_variant_path(png_path: str, name: str) -> str:
+    """Path of the ``name`` size variant of the card captured to ``png_path``."""
+    base, ext = os.path.splitext(png_path)
+    return f"{base}-{name}{ext}"
+
+
+def crop_to(image: Any, size: Sequence[int], scale: float = 1) -> Any:
+    """Cut the largest centered region with the aspect of ``size`` and scale it.
+
+    The result is ``size`` times ``scale`` pixels, matching what a capture
+    at that viewport and device scale factor would produce.
+    """
+    target = (round(size[0] * scale), round(size[1] * scale))
+    width, height = image.size
+    if width * target[1] > height * target[0]:
+        crop_width, crop_height = round(height * target[0] / target[1]), height
+    else:
+        crop_width, crop_height = width, round(width * target[1] / target[0])
+    left = (width - crop_width) // 2
+    top = (height - crop_height) // 2
+    cropped = image.crop((left, top, left + crop_width, top + crop_height))
+    if cropped.size != target:
+        cropped = cropped.resize(target, Image.Resampling.LANCZOS)
+    return cropped
+
+
+def derive_variants(
+    png_path: str,
+    viewport: Sequence[int],
+    variants: Sequence[Variant],
+    scale: float = 1,
+) -> List[str]:
+    """Write every size variant, cut from the card captured to ``png_path``.
+
+    The capture is taken at :func:`capture_scale`, so variants are only
+    ever scaled down; the card is then scaled down to ``viewport`` times
+    ``scale`` in place. Returns the variant paths.
+    """
+    with Image.open(png_path) as image:
+        image.load()
+
+    paths = []
+    for variant in variants:
+        path = size_variant_path(png_path, variant.name)
+        with atomic_path(path) as tmp_path:
+            crop_to(image, variant.size, scale).save(tmp_path, "PNG")
+        paths.append(path)
+
+    card = crop_to(image, viewport, scale)
+    if card.size != image.size:
+        with atomic_path(png_path) as tmp_path:
+            card.save(tmp_path, "PNG")
+    return paths
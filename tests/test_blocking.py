@@ -0,0 +1,83 @@
+"""Tests for pelican_social_share.blocking."""
+
+from unittest.mock import MagicMock
+
+from pelican_social_share.blocking import RequestFilter, RequestPolicy
+from pelican_social_share.server import MEMORY_ORIGIN
+
+
+def make_route(url, resource_type="stylesheet"):
+    route = MagicMock()
+    route.request.url = url
+    route.request.resource_type = resource_type
+    return route
+
+
+class TestRequestPolicy:
+    """Test allow and deny decisions."""
+
+    def test_hermetic_policy(self):
+        """Test that only local and allowed hosts load, without media or scripts."""
+        policy = RequestPolicy.from_settings({
+            "SOCIAL_BLOCK_REQUESTS": True,
+            "SOCIAL_ALLOW_HOSTS": ["*.gstatic.com"],
+            "SITEURL": "https://example.com",
+        })
+
+        assert policy.blocks("http://127.0.0.1:8000/theme/css/pico.min.css", "stylesheet") is None
+        assert policy.blocks(f"{MEMORY_ORIGIN}/social/post.html", "document") is None
+        assert policy.blocks("https://example.com/images/me.jpg", "image") is None
+        assert policy.blocks("https://fonts.gstatic.com/s/inter.woff2", "font") is None
+        assert policy.blocks("data:image/png;base64,AAAA", "image") is None
+        assert policy.blocks("https://www.google-analytics.com/a.js", "stylesheet") == "external host"
+        assert policy.blocks("http://127.0.0.1:8000/theme/js/app.js", "script") == "script"
+        assert policy.blocks("http://127.0.0.1:8000/intro.mp4", "media") == "media"
+
+    def test_deny_list_without_hermetic_mode(self):
+        """Test that denied hosts are blocked while everything else loads."""
+        policy = RequestPolicy.from_settings({"SOCIAL_BLOCK_HOSTS": ["*.doubleclick.net"]})
+
+        assert policy.enabled
+        assert policy.blocks("https://ad.doubleclick.net/x", "image") == "denied host"
+        assert policy.blocks("https://fonts.googleapis.com/css2", "stylesheet") is None
+        assert policy.blocks("http://127.0.0.1:8000/app.js", "script") is None
+
+    def test_fingerprint(self):
+        """Test that only active policies change input hashes."""
+        assert RequestPolicy.from_settings({}).fingerprint() == ""
+        assert not RequestPolicy.from_settings({}).enabled
+        assert RequestPolicy.from_settings({"SOCIAL_BLOCK_REQUESTS": True}).fingerprint() != (
+            RequestPolicy.from_settings({
+                "SOCIAL_BLOCK_REQUESTS": True, "SOCIAL_ALLOW_HOSTS": ["fonts.gstatic.com"],
+            }).fingerprint()
+        )
+
+
+class TestRequestFilter:
+    """Test the route handler and its statistics."""
+
+    def test_blocked_requests_are_aborted_and_counted(self):
+        """Test abort, hand-off to the router and per-host counts."""
+        router = MagicMock()
+        request_filter = RequestFilter(RequestPolicy(hermetic=True), router)
+        blocked = make_route("https://www.googletagmanager.com/gtag.js", "script")
+        local = make_route(f"{MEMORY_ORIGIN}/theme/css/card.css")
+
+        request_filter.handle(blocked)
+        request_filter.handle(make_route("https://www.googletagmanager.com/ping", "fetch"))
+        request_filter.handle(local)
+
+        blocked.abort.assert_called_once_with("blockedbyclient")
+        router.handle.assert_called_once_with(local)
+        assert request_filter.allowed == 1
+        assert request_filter.blocked == 2
+        assert request_filter.blocked_hosts == {"www.googletagmanager.com": 2}
+        assert request_filter.blocked_reasons == {"script": 1, "external host": 1}
+
+    def test_without_router_requests_continue(self):
+        """Test that allowed requests go to the network when nothing routes them."""
+        route = make_route("http://127.0.0.1:8000/social/post.html", "document")
+
+        RequestFilter(RequestPolicy(hermetic=True)).handle(route)
+
+        route.continue_.assert_called_once()
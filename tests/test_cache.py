@@ -0,0 +1,96 @@
+"""Tests for pelican_social_share.cache."""
+
+import os
+import stat
+
+import pytest
+
+from pelican_social_share.cache import (
+    CaptureCache,
+    DirectoryCache,
+    cache_from_settings,
+    cache_names,
+)
+
+
+class TestDirectoryCache:
+    """Test the directory-backed capture cache."""
+
+    def test_store_and_fetch(self, tmp_path):
+        """Test that a stored card is restored byte for byte elsewhere."""
+        cache = DirectoryCache({}, str(tmp_path / "cache"))
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "post-social-share.png").write_bytes(b"png")
+        (tmp_path / "a" / "post-social-share.webp").write_bytes(b"webp")
+
+        cache.store("abcdef", cache_names(
+            str(tmp_path / "a" / "post-social-share.png"),
+            [str(tmp_path / "a" / "post-social-share.png"),
+             str(tmp_path / "a" / "post-social-share.webp")],
+        ))
+        restored = {
+            "card.png": str(tmp_path / "b" / "post-social-share.png"),
+            "card.webp": str(tmp_path / "b" / "post-social-share.webp"),
+        }
+
+        assert cache.fetch("abcdef", restored)
+        assert (tmp_path / "b" / "post-social-share.webp").read_bytes() == b"webp"
+        assert (tmp_path / "cache" / "ab" / "abcdef" / "card.png").exists()
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+    def test_entries_are_shared(self, tmp_path, monkeypatch):
+        """Test that entries are readable by other users under the default umask."""
+        monkeypatch.setattr("pelican_social_share.paths._UMASK", 0o022)
+        cache = DirectoryCache({}, str(tmp_path / "cache"))
+        png = tmp_path / "post-social-share.png"
+        png.write_bytes(b"png")
+        png.chmod(0o600)
+
+        cache.store("abcdef", {"card.png": str(png)})
+        restored = tmp_path / "b" / "post-social-share.png"
+        assert cache.fetch("abcdef", {"card.png": str(restored)})
+
+        entry = tmp_path / "cache" / "ab" / "abcdef" / "card.png"
+        assert stat.S_IMODE(entry.stat().st_mode) == 0o644
+        assert stat.S_IMODE(restored.stat().st_mode) == 0o644
+
+    def test_incomplete_entry_is_a_miss(self, tmp_path):
+        """Test that a card is only restored when every file is cached."""
+        cache = DirectoryCache({}, str(tmp_path / "cache"))
+        entry = tmp_path / "cache" / "ab" / "abcdef"
+        entry.mkdir(parents=True)
+        (entry / "card.png").write_bytes(b"png")
+
+        files = {"card.png": str(tmp_path / "p.png"), "card-og.png": str(tmp_path / "p-og.png")}
+        assert not cache.fetch("abcdef", files)
+        assert not (tmp_path / "p.png").exists()
+        assert not cache.fetch("missing", {"card.png": str(tmp_path / "p.png")})
+
+
+class TestCacheSettings:
+    """Test choosing the cache backend."""
+
+    def test_cache_names(self):
+        """Test that cache names drop the slug-specific stem."""
+        assert cache_names("/img/post-social-share.png", [
+            "/img/post-social-share.png", "/img/post-social-share-og.webp",
+        ]) == {
+            "card.png": "/img/post-social-share.png",
+            "card-og.webp": "/img/post-social-share-og.webp",
+        }
+
+    def test_cache_from_settings(self, tmp_path):
+        """Test directory paths, custom backends and the default."""
+        class RemoteCache(CaptureCache):
+            name = "remote"
+
+            def fetch(self, input_hash, files):
+                return False
+
+            def store(self, input_hash, files):
+                pass
+
+        assert cache_from_settings({}) is None
+        assert cache_from_settings({"SOCIAL_CACHE": str(tmp_path)}).path == str(tmp_path)
+        assert isinstance(cache_from_settings({"SOCIAL_CACHE": RemoteCache}), RemoteCache)
+        assert cache_from_settings({"SOCIAL_CACHE": 42}) is None
@@ -0,0 +1,187 @@
+"""Tests for pelican_social_share.cli batch mode."""
+
+import io
+import json
+import os
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from pelican_social_share.capture import CaptureResult
+from pelican_social_share.cli import duplicate_outputs, expand_patterns, main, read_job_lines
+from pelican_social_share.manifest import MANIFEST_NAME
+
+
+def fake_capture(jobs, base_url, options, router=None, on_result=None):
+    results = []
+    for job in jobs:
+        Path(job.png_path).write_bytes(b"png")
+        results.append(CaptureResult(job.slug, True, timings={"goto": 5.0}))
+        on_result(results[-1])
+    return results
+
+
+@pytest.fixture
+def site(tmp_path):
+    (tmp_path / "css").mkdir()
+    (tmp_path / "css" / "card.css").write_text("h1 { color: red; }")
+    social = tmp_path / "social"
+    social.mkdir()
+    for slug in ("one", "two"):
+        (social / f"{slug}.html").write_text(
+            f'<link rel="stylesheet" href="/css/card.css"><h1>{slug}</h1>'
+        )
+    return tmp_path
+
+
+def run_cli(*argv):
+    with patch.object(sys, "argv", ["cli", *argv]):
+        return main()
+
+
+class TestBatchInputs:
+    """Test collecting batch jobs."""
+
+    def test_expand_patterns(self, site):
+        """Test globs and directories, with and without an output directory."""
+        pairs = expand_patterns([str(site / "social")], None)
+        assert pairs == [
+            (str(site / "social" / "one.html"), str(site / "social" / "one.png")),
+            (str(site / "social" / "two.html"), str(site / "social" / "two.png")),
+        ]
+        pairs = expand_patterns([str(site / "**" / "t*.html")], "img")
+        assert pairs == [(str(site / "social" / "two.html"), "img/two.png")]
+
+    def test_duplicate_outputs(self, site):
+        """Test that same-named inputs from different directories are caught."""
+        (site / "drafts").mkdir()
+        (site / "drafts" / "one.html").write_text("<h1>draft</h1>")
+
+        pairs = expand_patterns([str(site / "social"), str(site / "drafts")], str(site / "img"))
+
+        assert duplicate_outputs(pairs) == {
+            str(site / "img" / "one.png"): [
+                str(site / "social" / "one.html"), str(site / "drafts" / "one.html")
+            ]
+        }
+        assert duplicate_outputs(expand_patterns([str(site / "social")], None)) == {}
+
+    def test_read_job_lines(self):
+        """Test JSONL parsing, blank lines and errors."""
+        stream = io.StringIO('{"html": "a.html", "output": "a.png"}\n\n{"html": "b.html", "output": "b.png"}\n')
+        assert read_job_lines(stream) == [("a.html", "a.png"), ("b.html", "b.png")]
+        with pytest.raises(ValueError, match="line 1"):
+            read_job_lines(io.StringIO('{"html": "a.html"}\n'))
+
+
+@patch('pelican_social_share.cli.PLAYWRIGHT_AVAILABLE', True)
+@patch('pelican_social_share.cli.serve_directory')
+@patch('pelican_social_share.cli.run_capture')
+class TestRunBatch:
+    """Test batch capture with a stubbed engine."""
+
+    def test_one_session_and_hash_skip(self, mock_run_capture, mock_serve, site, capsys):
+        """Test that all cards share one capture call and unchanged ones are skipped."""
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = fake_capture
+        argv = ["--batch", str(site / "social"), "--output-dir", str(site / "img"),
+                "--root", str(site), "--concurrency", "2", "--json"]
+
+        assert run_cli(*argv) == 0
+        (jobs, base_url, options), _ = mock_run_capture.call_args
+        assert [job.url_path for job in jobs] == ["/social/one.html", "/social/two.html"]
+        assert base_url == "http://127.0.0.1:8000"
+        assert options.concurrency == 2
+        mock_serve.assert_called_once_with(str(site))
+
+        # Only the card whose stylesheet or HTML changed is captured again
+        (site / "social" / "two.html").write_text("<h1>changed</h1>")
+        capsys.readouterr()
+        assert run_cli(*argv) == 0
+        lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+        assert {line["output"]: line["status"] for line in lines} == {
+            str(site / "img" / "one.png"): "skipped",
+            str(site / "img" / "two.png"): "captured",
+        }
+        assert mock_run_capture.call_count == 2
+
+    def test_colliding_outputs_fail(self, mock_run_capture, mock_serve, site, capsys):
+        """Test that a batch refuses to overwrite one card with another."""
+        (site / "drafts").mkdir()
+        (site / "drafts" / "one.html").write_text("<h1>draft</h1>")
+
+        assert run_cli(
+            "--batch", str(site / "social"), "--batch", str(site / "drafts"),
+            "--output-dir", str(site / "img"),
+        ) == 1
+        assert "would all be written to" in capsys.readouterr().err
+        mock_run_capture.assert_not_called()
+
+    def test_manifest_keys_match_the_plugin(
+        self, mock_run_capture, mock_serve, site, monkeypatch
+    ):
+        """Test that cards named like the plugin's are keyed by slug."""
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = fake_capture
+        monkeypatch.setattr(sys, "stdin", io.StringIO(json.dumps({
+            "html": str(site / "social" / "one.html"),
+            "output": str(site / "img" / "one-social-share.png"),
+        })))
+
+        assert run_cli("--jobs", "-", "--root", str(site)) == 0
+
+        manifest = json.loads((site / "img" / MANIFEST_NAME).read_text())
+        assert list(manifest["cards"]) == ["one"]
+
+    def test_jobs_from_stdin(self, mock_run_capture, mock_serve, site, capsys, monkeypatch):
+        """Test JSONL jobs, failures in the stream and the summary."""
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = lambda jobs, *args, **kwargs: [
+            CaptureResult(jobs[0].slug, False, "Timeout 15000ms exceeded")
+        ]
+        out = site / "out" / "one.png"
+        monkeypatch.setattr(sys, "stdin", io.StringIO(
+            json.dumps({"html": str(site / "social" / "one.html"), "output": str(out)})
+        ))
+
+        assert run_cli("--jobs", "-") == 1
+        captured = capsys.readouterr()
+        assert captured.out.startswith("failed")
+        assert "Timeout 15000ms exceeded" in captured.out
+        assert "1 cards: 0 captured, 0 skipped, 1 failed" in captured.err
+
+
+@patch('pelican_social_share.cli.PLAYWRIGHT_AVAILABLE', True)
+@patch('pelican_social_share.cli.serve_directory')
+@patch('pelican_social_share.cli.CaptureSession')
+class TestWatch:
+    """Test watch mode with a stubbed browser session."""
+
+    def test_recaptures_affected_cards(self, mock_session_cls, mock_serve, site):
+        """Test that an edit recaptures only the cards depending on the changed file."""
+        session = mock_session_cls.return_value
+        captured = []
+        session.capture.side_effect = lambda jobs, on_result=None: captured.append(
+            sorted(os.path.basename(job.png_path) for job in jobs)
+        )
+        (site / "social" / "two.html").write_text("<h1>two, unstyled</h1>")
+
+        edits = [
+            (site / "css" / "card.css", "h1 { color: blue; }"),
+            (site / "social" / "two.html", "<h1>two, edited</h1>"),
+        ]
+
+        def sleep(seconds):
+            if not edits:
+                raise KeyboardInterrupt
+            path, text = edits.pop(0)
+            path.write_text(text)
+            os.utime(path, ns=(1, 10 ** 18 + len(edits)))
+
+        with patch('pelican_social_share.cli.time.sleep', side_effect=sleep):
+            assert run_cli("--batch", str(site / "social"), "--root", str(site), "--watch") == 0
+
+        assert captured == [["one.png", "two.png"], ["one.png"], ["two.png"]]
+        session.close.assert_called_once()
@@ -0,0 +1,113 @@
+"""Tests for pelican_social_share.critical."""
+
+from jinja2 import Environment
+
+from pelican_social_share.critical import (
+    COMMENT_RE,
+    CriticalCss,
+    page_tokens,
+    parse_rules,
+    rebase_urls,
+    selector_tokens,
+)
+from pelican_social_share.pages import CardSource, render_cards
+from pelican_social_share.paths import StaticResolver
+
+THEME_CSS = """
+/* Theme */
+@charset "utf-8";
+:root { --accent: #09c; }
+body, .unused { margin: 0; }
+.card h1 { font-size: 72px; }
+.card .missing, nav a:hover { color: red; }
+.images-ready aside { opacity: 1; }
+.md\\:flex { display: flex; }
+@media (min-width: 900px) { .card { padding: 64px; } footer { display: none; } }
+@font-face { font-family: Inter; src: url("../fonts/inter.woff2"); }
+.quote::before { content: "}"; }
+"""
+
+CARD = (
+    '<link rel="stylesheet" href="/theme/css/style.css">'
+    '<link rel="stylesheet" href="https://fonts.googleapis.com/css2?family=Inter">'
+    '<body class="card"><h1 class="md:flex">Tagline</h1><aside></aside>'
+    "<script>document.body.classList.add('images-ready')</script></body>"
+)
+
+
+class TestSelectors:
+    """Test which rules a card keeps."""
+
+    def test_selector_tokens(self):
+        """Test that pseudo-classes and attributes are ignored."""
+        assert selector_tokens(".card > h1:first-child") == {".card", "h1"}
+        assert selector_tokens("a[href^=http]:not(.x)::after") == {"a"}
+        assert selector_tokens("#hero.md\\:flex") == {"#hero", ".md:flex"}
+        assert selector_tokens(":root") == frozenset()
+
+    def test_page_tokens(self):
+        """Test tags, classes, ids, script-added classes and kept names."""
+        tokens = page_tokens(CARD, keep=["debug", "#extra"])
+
+        assert {"h1", "aside", ".card", ".md:flex", ".images-ready", ".debug", "#extra"} <= tokens
+        assert ".unused" not in tokens
+
+    def test_subset(self):
+        """Test that unmatched rules, and @media blocks left empty, are dropped."""
+        rules = parse_rules(rebase_urls(COMMENT_RE.sub("", THEME_CSS), "/theme/css/style.css"))
+        css = "".join(rule.render(page_tokens(CARD)) for rule in rules)
+
+        assert '@charset "utf-8";' in css
+        assert ":root{--accent: #09c;}" in css
+        assert "body, .unused{margin: 0;}" in css
+        assert ".card h1{" in css
+        assert ".images-ready aside{" in css
+        assert ".md\\:flex{" in css
+        assert "@media (min-width: 900px){.card{padding: 64px;}}" in css
+        assert 'url("/theme/fonts/inter.woff2")' in css
+        assert "missing" not in css
+        assert "quote" not in css
+
+
+class TestCriticalCss:
+    """Test inlining stylesheets into card HTML."""
+
+    def make_theme(self, tmp_path):
+        css_dir = tmp_path / "theme" / "static" / "css"
+        css_dir.mkdir(parents=True)
+        (css_dir / "style.css").write_text(THEME_CSS)
+        return StaticResolver(str(tmp_path / "output"), [("/theme", str(tmp_path / "theme" / "static"))])
+
+    def test_local_links_are_inlined(self, tmp_path):
+        """Test that local stylesheets become <style> subsets and others stay linked."""
+        critical = CriticalCss(str(tmp_path / "output"), "", self.make_theme(tmp_path))
+
+        html = critical(CARD, "post")
+
+        assert '<style data-critical="/theme/css/style.css">' in html
+        assert 'href="/theme/css/style.css"' not in html
+        assert 'href="https://fonts.googleapis.com/css2?family=Inter"' in html
+        assert "missing" not in html
+
+    def test_missing_stylesheet_keeps_link(self, tmp_path):
+        """Test that stylesheets that cannot be read are left alone."""
+        critical = CriticalCss(str(tmp_path))
+        html = '<link rel="stylesheet" href="/theme/css/gone.css" media="print">'
+
+        assert critical(html, "post") == html
+
+    def test_render_cards_postprocess(self, tmp_path):
+        """Test that pooled rendering writes the inlined HTML."""
+        critical = CriticalCss(str(tmp_path / "output"), "", self.make_theme(tmp_path))
+        template = Environment().from_string(
+            '<link rel="stylesheet" href="../theme/css/style.css" media="screen">'
+            '<body class="card"><h1>{{ tagline }}</h1></body>'
+        )
+        sources = [CardSource(f"card-{i}", {"tagline": str(i)}) for i in range(3)]
+
+        rendered = render_cards(template, {}, sources, str(tmp_path), None, 2, "process", critical)
+
+        assert rendered[2].html.startswith(
+            '<style data-critical="/theme/css/style.css">@media screen{'
+        )
+        assert (tmp_path / "card-2.html").read_text() == rendered[2].html
@@ -0,0 +1,119 @@
+"""Tests for pelican_social_share.encode."""
+
+import json
+import os
+import stat
+
+import pytest
+
+from pelican_social_share.encode import (
+    EncodeOptions,
+    ImageEncoder,
+    encode_card,
+    formats_exist,
+    replace_if_smaller,
+    variant_path,
+)
+
+Image = pytest.importorskip("PIL.Image")
+
+
+def make_png(path):
+    image = Image.new("RGB", (120, 60), (255, 255, 255))
+    for x in range(120):
+        image.putpixel((x, x // 2), (x * 2, 10, 200))
+    image.save(path, "PNG", compress_level=0)
+    return path
+
+
+class TestEncodeOptions:
+    """Test encode settings."""
+
+    def test_defaults_are_disabled(self):
+        """Test that a plain build keeps only Chromium's PNG."""
+        options = EncodeOptions.from_settings({})
+
+        assert options.formats == ("png",)
+        assert not options.enabled
+        assert options.fingerprint() == ""
+
+    def test_from_settings(self):
+        """Test that PNG is always kept and the primary format is included."""
+        options = EncodeOptions.from_settings({
+            "SOCIAL_IMAGE_FORMAT": "WebP",
+            "SOCIAL_IMAGE_FORMATS": ["jpg", "bmp-ish"],
+            "SOCIAL_IMAGE_QUALITY": {"webp": 70},
+        })
+
+        assert options.formats == ("png", "jpeg", "webp")
+        assert options.primary == "webp"
+        assert options.quality["webp"] == 70
+        assert json.loads(options.fingerprint())["quality"] == {"png": None, "jpeg": 85, "webp": 70}
+
+
+class TestEncodeCard:
+    """Test per-card encoding."""
+
+    def test_optimize_and_variants(self, tmp_path):
+        """Test that the PNG shrinks in place and variants are written."""
+        png = make_png(tmp_path / "card-social-share.png")
+        options = EncodeOptions(formats=("png", "webp", "jpeg"), primary="webp", png_colors=64)
+
+        result = encode_card("card", str(png), options)
+
+        assert result.error is None
+        assert result.sizes["png"] < result.captured
+        assert result.sizes["png"] == png.stat().st_size
+        assert (tmp_path / "card-social-share.webp").stat().st_size == result.sizes["webp"]
+        assert (tmp_path / "card-social-share.jpg").exists()
+        assert formats_exist(str(png), options)
+        with Image.open(png) as image:
+            assert image.size == (120, 60)
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+    def test_written_files_follow_umask(self, tmp_path):
+        """Test that optimized and encoded files are not left owner-only."""
+        umask = os.umask(0o022)
+        os.umask(umask)
+        png = make_png(tmp_path / "card-social-share.png")
+        options = EncodeOptions(formats=("png", "webp"), png_colors=64)
+
+        encode_card("card", str(png), options)
+
+        for name in ("card-social-share.png", "card-social-share.webp"):
+            assert stat.S_IMODE((tmp_path / name).stat().st_mode) == 0o666 & ~umask
+
+    def test_larger_result_is_discarded(self, tmp_path):
+        """Test that an optimization that grows the file leaves it alone."""
+        png = tmp_path / "card.png"
+        Image.new("RGB", (8, 8), "white").save(png, "PNG", optimize=True)
+        before = png.read_bytes()
+        noisy = Image.effect_noise((64, 64), 100)
+
+        replace_if_smaller(str(png), noisy, "PNG")
+
+        assert png.read_bytes() == before
+        assert [p.name for p in tmp_path.iterdir()] == ["card.png"]
+
+    def test_missing_png_is_reported(self, tmp_path):
+        """Test that a failed encode carries the error instead of raising."""
+        options = EncodeOptions(formats=("png", "webp"))
+
+        result = encode_card("card", str(tmp_path / "missing.png"), options)
+
+        assert result.error
+        assert not formats_exist(str(tmp_path / "missing.png"), options)
+
+    def test_encoder_pool(self, tmp_path):
+        """Test that the pool returns one result per submitted card."""
+        options = EncodeOptions(formats=("png", "webp"), workers=2)
+        encoder = ImageEncoder(options)
+        for slug in ("a", "b", "c"):
+            encoder.submit(slug, str(make_png(tmp_path / f"{slug}.png")))
+
+        results = encoder.finish()
+
+        assert [r.slug for r in results] == ["a", "b", "c"]
+        assert all(r.error is None for r in results)
+        assert (tmp_path / "b.webp").exists()
+        assert variant_path(str(tmp_path / "b.png"), "jpeg") == str(tmp_path / "b.jpg")
@@ -0,0 +1,103 @@
+"""Tests for pelican_social_share.hashing."""
+
+from unittest.mock import patch
+
+from pelican_social_share.capture import CaptureOptions
+from pelican_social_share.hashing import (
+    AssetDigests,
+    capture_fingerprint,
+    find_asset_urls,
+    make_content_hash,
+)
+
+
+class TestFindAssetUrls:
+    """Test asset reference discovery."""
+
+    def test_html_and_css_references(self):
+        """Test that src, href, url() and @import are all found."""
+        html = """
+        <link rel="stylesheet" href="/theme/css/style.css">
+        <style>@import "fonts.css"; body { background: url('/img/bg.png'); }</style>
+        <img src="{{ portrait }}"><img src="data:image/png;base64,AAAA">
+        <a href="#top">top</a>
+        """
+        assert find_asset_urls(html) == [
+            "/theme/css/style.css",
+            "fonts.css",
+            "/img/bg.png",
+            "{{ portrait }}",
+        ]
+
+
+class TestAssetDigests:
+    """Test memoized asset digests."""
+
+    def test_digest_follows_stylesheets(self, tmp_path):
+        """Test that fonts referenced from CSS change the stylesheet digest."""
+        (tmp_path / "theme" / "fonts").mkdir(parents=True)
+        (tmp_path / "theme" / "style.css").write_text("@font-face { src: url(fonts/a.woff2); }")
+        font = tmp_path / "theme" / "fonts" / "a.woff2"
+        font.write_bytes(b"one")
+
+        before = AssetDigests(str(tmp_path)).digest("/theme/style.css")
+        font.write_bytes(b"two")
+        after = AssetDigests(str(tmp_path)).digest("/theme/style.css")
+
+        assert before != after
+
+    def test_digest_is_memoized(self, tmp_path):
+        """Test that each asset is read once per build."""
+        (tmp_path / "portrait.jpg").write_bytes(b"jpeg")
+        digests = AssetDigests(str(tmp_path), "https://example.com")
+
+        with patch("builtins.open", wraps=open) as mock_open:
+            first = digests.digest("https://example.com/portrait.jpg")
+            second = digests.digest("../portrait.jpg", "/social/card.html")
+
+        assert first == second
+        assert mock_open.call_count == 1
+
+    def test_files_follow_stylesheets(self, tmp_path):
+        """Test that a card's local dependencies include fonts pulled in by CSS."""
+        (tmp_path / "theme" / "fonts").mkdir(parents=True)
+        (tmp_path / "theme" / "style.css").write_text("@font-face { src: url(fonts/a.woff2); }")
+        html = (
+            '<link rel="stylesheet" href="/theme/style.css">'
+            '<img src="../portrait.jpg"><img src="https://cdn.example.com/x.png">'
+        )
+
+        files = AssetDigests(str(tmp_path)).files(html, "/social/card.html")
+
+        assert files == {
+            str(tmp_path / "theme" / "style.css"),
+            str(tmp_path / "theme" / "fonts" / "a.woff2"),
+            str(tmp_path / "portrait.jpg"),
+        }
+
+    def test_missing_and_external_assets(self, tmp_path):
+        """Test that unresolvable assets still contribute a stable value."""
+        digests = AssetDigests(str(tmp_path))
+
+        assert digests.digest("/nope.png") == "missing"
+        assert digests.digest("https://cdn.example.net/x.css") == (
+            "external:https://cdn.example.net/x.css"
+        )
+
+
+class TestContentHash:
+    """Test the full-fidelity content hash."""
+
+    def test_extra_inputs_change_hash(self):
+        """Test that rendered HTML and capture settings are part of the hash."""
+        base = make_content_hash("slug", "tagline", "v1")
+
+        assert make_content_hash("slug", "tagline", "v1", []) == base
+        assert make_content_hash("slug", "tagline", "v1", ["<html>"]) != base
+
+    def test_fingerprint_tracks_render_settings(self):
+        """Test that viewport and scale factor changes alter the fingerprint."""
+        default = capture_fingerprint(CaptureOptions())
+
+        assert capture_fingerprint(CaptureOptions(viewport=(1200, 630))) != default
+        assert capture_fingerprint(CaptureOptions(device_scale_factor=2)) != default
@@ -0,0 +1,134 @@
+"""Tests for pelican_social_share.inline."""
+
+import base64
+from unittest.mock import MagicMock
+
+from jinja2 import Environment
+
+from pelican_social_share.critical import CriticalCss
+from pelican_social_share.inline import InlineAssets, media_type
+from pelican_social_share.pages import CardSource, chain_postprocess, render_cards
+from pelican_social_share.plugin import _jobs, build_social_pages
+from pelican_social_share.paths import StaticResolver
+
+FONT = b"wOF2 font bytes"
+
+CARD = (
+    "<style>@font-face { font-family: Inter; src: url('../theme/fonts/inter.woff2'); }"
+    " body { background: url(/theme/css/style.css); }"
+    " h1 { background: url(https://example.com/bg.png); }</style>"
+    '<img src="/images/portrait.png">'
+)
+
+
+def make_theme(tmp_path):
+    fonts = tmp_path / "theme" / "static" / "fonts"
+    fonts.mkdir(parents=True)
+    (fonts / "inter.woff2").write_bytes(FONT)
+    css = tmp_path / "theme" / "static" / "css"
+    css.mkdir()
+    (css / "style.css").write_text("@font-face { font-family: Inter; src: url(../fonts/inter.woff2); }")
+    return StaticResolver(str(tmp_path / "output"), [("/theme", str(tmp_path / "theme" / "static"))])
+
+
+class TestInlineAssets:
+    """Test embedding fonts and images as data URIs."""
+
+    def test_media_type(self):
+        """Test that only fonts and images are inlined."""
+        assert media_type("/theme/fonts/inter.woff2") == "font/woff2"
+        assert media_type("portrait.JPG") == "image/jpeg"
+        assert media_type("/theme/css/style.css") is None
+
+    def test_style_urls_become_data_uris(self, tmp_path):
+        """Test that local fonts in <style> blocks are embedded and others left alone."""
+        inline = InlineAssets(str(tmp_path / "output"), "", make_theme(tmp_path))
+
+        html = inline(CARD, "post")
+
+        uri = "data:font/woff2;base64," + base64.b64encode(FONT).decode("ascii")
+        assert f'src: url("{uri}")' in html
+        assert "url(/theme/css/style.css)" in html
+        assert "url(https://example.com/bg.png)" in html
+        assert '<img src="/images/portrait.png">' in html
+
+    def test_files_are_read_once(self, tmp_path):
+        """Test that each asset is encoded once per build."""
+        inline = InlineAssets(str(tmp_path / "output"), "", make_theme(tmp_path))
+        inline.encode = MagicMock(wraps=inline.encode)
+
+        for slug in ("one", "two", "three"):
+            inline(CARD, slug)
+
+        assert inline.encode.call_count == 2  # The font and the stylesheet
+
+    def test_large_files_keep_their_url(self, tmp_path):
+        """Test that assets over the size limit are not embedded."""
+        inline = InlineAssets(str(tmp_path / "output"), "", make_theme(tmp_path), max_bytes=4)
+
+        assert inline(CARD, "post") == CARD
+
+    def test_after_critical_css(self, tmp_path):
+        """Test that fonts pulled in by critical CSS are embedded too."""
+        resolver = make_theme(tmp_path)
+        postprocess = chain_postprocess(
+            CriticalCss(str(tmp_path / "output"), "", resolver),
+            None,
+            InlineAssets(str(tmp_path / "output"), "", resolver),
+        )
+        template = Environment().from_string(
+            '<link rel="stylesheet" href="/theme/css/style.css"><h1>{{ tagline }}</h1>'
+        )
+        sources = [CardSource("post", {"tagline": "Hi"})]
+
+        rendered = render_cards(template, {}, sources, str(tmp_path), None, postprocess=postprocess)
+
+        assert 'src: url("data:font/woff2;base64,' in rendered[0].html
+        assert "/theme/fonts/inter.woff2" not in rendered[0].html
+
+
+class TestInlinePortrait:
+    """Test the portrait in the render context."""
+
+    def render_portrait(self, settings, tmp_path, inline):
+        images = tmp_path / "content" / "images"
+        images.mkdir(parents=True, exist_ok=True)
+        (images / "portrait.png").write_bytes(b"\x89PNG portrait")
+        settings = {
+            **settings,
+            "PATH": str(tmp_path / "content"),
+            "OUTPUT_PATH": str(tmp_path / "output"),
+            "SITEURL": "https://example.com",
+            "SOCIAL_CARD_HTML_DIR": str(tmp_path / "social"),
+            "SOCIAL_IMAGE_DIR": str(tmp_path / "images"),
+            "SOCIAL_PORTRAIT_PATH": "content/images/portrait.png",
+            "SOCIAL_INLINE_ASSETS": inline,
+        }
+        generator = MagicMock(settings=settings)
+        generator.env.get_template.return_value = Environment().from_string(
+            '<img src="{{ portrait_src }}" data-path="{{ portrait_url }}">'
+        )
+        article = MagicMock(slug="post", metadata={"tagline": "Hello"})
+
+        try:
+            build_social_pages(generator, [article])
+            return _jobs["post"].html
+        finally:
+            _jobs.clear()
+
+    def test_portrait_src_is_a_data_uri(self, mock_pelican_settings, tmp_path):
+        """Test that SOCIAL_INLINE_ASSETS embeds portrait_src and keeps portrait_url."""
+        html = self.render_portrait(mock_pelican_settings, tmp_path, inline=True)
+
+        encoded = base64.b64encode(b"\x89PNG portrait").decode("ascii")
+        assert html == (
+            f'<img src="data:image/png;base64,{encoded}" data-path="/images/portrait.png">'
+        )
+
+    def test_portrait_src_without_inlining(self, mock_pelican_settings, tmp_path):
+        """Test that portrait_src is the portrait's full URL by default."""
+        html = self.render_portrait(mock_pelican_settings, tmp_path, inline=False)
+
+        assert html == (
+            '<img src="https://example.com/images/portrait.png" data-path="/images/portrait.png">'
+        )
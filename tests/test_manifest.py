@@ -0,0 +1,99 @@
+"""Tests for pelican_social_share.manifest."""
+
+import json
+import os
+import stat
+
+from pelican_social_share.manifest import (
+    MANIFEST_NAME,
+    CardManifest,
+    image_manifest_key,
+    image_stem,
+)
+
+
+class TestCardManifest:
+    """Test the capture manifest."""
+
+    def test_record_and_is_fresh(self, tmp_path):
+        """Test that a recorded capture is fresh only for the same hash."""
+        png = tmp_path / "slug-social-share.png"
+        png.write_bytes(b"png")
+        manifest = CardManifest.load(str(tmp_path / MANIFEST_NAME), str(tmp_path))
+
+        assert not manifest.is_fresh("slug", "abc")
+        manifest.record("slug", "abc", str(png))
+
+        assert manifest.is_fresh("slug", "abc")
+        assert not manifest.is_fresh("slug", "def")
+        entry = manifest.entries["slug"]
+        assert entry["png"] == png.name
+        assert entry["size"] == 3
+        assert {"mtime", "digest", "captured_at"} <= set(entry)
+
+    def test_save_round_trip(self, tmp_path):
+        """Test that saving replaces the file, readable, with no temp files."""
+        png = tmp_path / "slug-social-share.png"
+        png.write_bytes(b"png")
+        path = tmp_path / MANIFEST_NAME
+
+        manifest = CardManifest.load(str(path), str(tmp_path))
+        manifest.record("slug", "abc", str(png))
+        manifest.save()
+
+        assert json.loads(path.read_text())["cards"]["slug"]["hash"] == "abc"
+        assert sorted(p.name for p in tmp_path.iterdir()) == sorted([MANIFEST_NAME, png.name])
+        assert CardManifest.load(str(path), str(tmp_path)).is_fresh("slug", "abc")
+        if os.name != "nt":
+            umask = os.umask(0o022)
+            os.umask(umask)
+            assert stat.S_IMODE(path.stat().st_mode) == 0o666 & ~umask
+
+    def test_prune_drops_removed_slugs(self, tmp_path):
+        """Test that slugs missing from the work list are dropped on save."""
+        path = tmp_path / MANIFEST_NAME
+        manifest = CardManifest(str(path), str(tmp_path), {
+            "kept": {"hash": "abc", "png": "kept-social-share.png"},
+            "renamed": {"hash": "def", "png": "renamed-social-share.png"},
+        })
+
+        assert manifest.prune(["kept", "new"]) == 1
+        manifest.save()
+
+        assert list(json.loads(path.read_text())["cards"]) == ["kept"]
+        assert manifest.prune(["kept"]) == 0
+
+    def test_image_names_round_trip(self):
+        """Test that an image's manifest key is recovered from its file name."""
+        key = "0123456789abcdef"
+        assert image_manifest_key(f"/img/{image_stem('post')}.png") == "post"
+        assert image_manifest_key(f"/img/{image_stem('post', key)}.webp") == key
+        assert image_manifest_key("/img/custom.png") == "custom"
+
+    def test_missing_png_is_not_fresh(self, tmp_path):
+        """Test that a deleted PNG forces a re-capture."""
+        manifest = CardManifest(
+            str(tmp_path / MANIFEST_NAME), str(tmp_path),
+            {"slug": {"hash": "abc", "png": "slug-social-share.png"}},
+        )
+        assert not manifest.is_fresh("slug", "abc")
+
+    def test_unreadable_manifest_starts_empty(self, tmp_path):
+        """Test that a corrupt manifest does not fail the build."""
+        path = tmp_path / MANIFEST_NAME
+        path.write_text("{not json")
+
+        assert CardManifest.load(str(path), str(tmp_path)).entries == {}
+
+    def test_migrate_sidecars(self, tmp_path):
+        """Test that legacy .hash sidecars are imported and removed."""
+        (tmp_path / "slug-social-share.png").write_bytes(b"png")
+        (tmp_path / "slug-social-share.png.hash").write_text("abc")
+        path = tmp_path / MANIFEST_NAME
+
+        manifest = CardManifest.load(str(path), str(tmp_path))
+
+        assert manifest.migrate_sidecars() == 1
+        assert manifest.is_fresh("slug", "abc")
+        assert not (tmp_path / "slug-social-share.png.hash").exists()
+        assert path.exists()
@@ -0,0 +1,123 @@
+"""Tests for pelican_social_share.pages."""
+
+import datetime
+import pickle
+
+import pytest
+from jinja2 import Environment
+
+from pelican_social_share.pages import CardSource, render_cards, snapshot
+
+TEMPLATE = "<h1>{{ tagline }}</h1><p>{{ article.title }} / {{ article.category }} / {{ SITENAME }}</p>"
+
+
+class Category:
+    def __init__(self, name):
+        self.name = name
+
+    def __str__(self):
+        return self.name
+
+
+class Article:
+    def __init__(self, slug):
+        self.slug = slug
+        self.title = f"Title {slug}"
+        self.date = datetime.datetime(2024, 1, 2)
+        self.category = Category("notes")
+        self.tags = [Category("a"), Category("b")]
+        self.metadata = {"tagline": f"Tagline {slug}", "category": self.category}
+
+
+class TestSnapshot:
+    """Test the lightweight content snapshot."""
+
+    def test_snapshot_is_plain_and_picklable(self):
+        """Test that objects are reduced to builtins that survive pickling."""
+        content = snapshot(Article("one"))
+
+        assert content.title == "Title one"
+        assert content.category == "notes"
+        assert content.tags == ["a", "b"]
+        assert content.metadata["category"] == "notes"
+        assert content.date == datetime.datetime(2024, 1, 2)
+        assert not hasattr(content, "url")
+        assert pickle.loads(pickle.dumps(content)) == content
+
+    def test_snapshot_extra_fields(self):
+        """Test that only the requested fields are copied."""
+        assert vars(snapshot(Article("one"), ("slug",))) == {"slug": "one"}
+
+
+class TestRenderCards:
+    """Test rendering card HTML serially and in pools."""
+
+    @pytest.mark.parametrize("workers,pool", [(1, "process"), (3, "thread"), (3, "process")])
+    def test_render_cards(self, tmp_path, workers, pool):
+        """Test that every pool renders the same files in source order."""
+        template = Environment().from_string(TEMPLATE)
+        html_dir = tmp_path / "social"
+        output_dir = tmp_path / "output"
+        html_dir.mkdir()
+        output_dir.mkdir()
+        sources = [
+            CardSource(f"card-{i}", {"tagline": f"Tagline {i}", "article": snapshot(Article(f"card-{i}"))})
+            for i in range(10)
+        ]
+
+        rendered = render_cards(
+            template, {"SITENAME": "Site"}, sources, str(html_dir), str(output_dir), workers, pool
+        )
+
+        assert [card.slug for card in rendered] == [source.slug for source in sources]
+        assert all(card.content_changed and card.output_changed for card in rendered)
+        assert rendered[3].html == "<h1>Tagline 3</h1><p>Title card-3 / notes / Site</p>"
+        assert (html_dir / "card-3.html").read_text() == rendered[3].html
+        assert (output_dir / "card-3.html").read_text() == rendered[3].html
+
+    def test_render_errors_are_reported(self, tmp_path):
+        """Test that a failing card is reported without stopping the others."""
+        template = Environment().from_string("{{ tagline.upper() }}")
+        sources = [CardSource("bad", {"tagline": None}), CardSource("good", {"tagline": "ok"})]
+
+        rendered = render_cards(template, {}, sources, str(tmp_path), None, 2, "thread")
+
+        assert rendered[0].error.startswith("Failed to render template for bad")
+        assert rendered[1].html == "OK"
+        assert not rendered[1].output_changed
+
+    def test_no_fork_while_threads_run(self):
+        """Test that a process pool is not forked while other threads are alive."""
+        import threading
+        from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+        from pelican_social_share.pages import _make_pool
+
+        release = threading.Event()
+        worker = threading.Thread(target=release.wait)
+        worker.start()
+        try:
+            with _make_pool("process", 2) as pool:
+                assert isinstance(pool, ThreadPoolExecutor)
+        finally:
+            release.set()
+            worker.join()
+
+        with _make_pool("process", 2) as pool:
+            assert isinstance(pool, (ProcessPoolExecutor, ThreadPoolExecutor))
+        with _make_pool("thread", 2) as pool:
+            assert isinstance(pool, ThreadPoolExecutor)
+
+    def test_threads_render_real_objects(self, tmp_path):
+        """Test that thread workers see the content objects, not snapshots."""
+        template = Environment().from_string("{{ article.summary() }}")
+
+        class Rich(Article):
+            def summary(self):
+                return f"Summary of {self.slug}"
+
+        sources = [CardSource(f"card-{i}", {"article": Rich(f"card-{i}")}) for i in range(3)]
+
+        rendered = render_cards(template, {}, sources, str(tmp_path), None, 3)
+
+        assert rendered[2].html == "Summary of card-2"
@@ -0,0 +1,102 @@
+"""Tests for pelican_social_share.paths."""
+
+import os
+import stat
+
+import pytest
+
+from pelican_social_share.paths import StaticResolver
+
+
+class TestStaticResolver:
+    """Test mapping site paths to source files."""
+
+    def test_from_settings(self, tmp_path):
+        """Test that theme, static and extra paths resolve to their sources."""
+        (tmp_path / "theme" / "static" / "css").mkdir(parents=True)
+        (tmp_path / "theme" / "static" / "css" / "main.css").write_text("body {}")
+        (tmp_path / "content" / "images").mkdir(parents=True)
+        (tmp_path / "content" / "images" / "me.jpg").write_bytes(b"jpeg")
+        (tmp_path / "content" / "extra").mkdir()
+        (tmp_path / "content" / "extra" / "favicon.ico").write_bytes(b"ico")
+
+        resolver = StaticResolver.from_settings({
+            "PATH": str(tmp_path / "content"),
+            "OUTPUT_PATH": str(tmp_path / "output"),
+            "THEME": str(tmp_path / "theme"),
+            "EXTRA_PATH_METADATA": {"extra/favicon.ico": {"path": "favicon.ico"}},
+        })
+
+        assert resolver.locate("/theme/css/main.css") == str(
+            tmp_path / "theme" / "static" / "css" / "main.css"
+        )
+        assert resolver.locate("/images/me.jpg") == str(tmp_path / "content" / "images" / "me.jpg")
+        assert resolver.locate("/favicon.ico") == str(tmp_path / "content" / "extra" / "favicon.ico")
+        # Anything else, including missing source files, falls back to the output
+        assert resolver.locate("/theme/css/gone.css") == str(
+            tmp_path / "output" / "theme" / "css" / "gone.css"
+        )
+        assert resolver.locate("/../etc/passwd") == str(tmp_path / "output" / "etc" / "passwd")
+
+
+class TestAtomicPath:
+    """Test writing files through a temporary path."""
+
+    def test_replaces_on_success(self, tmp_path):
+        """Test that the file only appears, complete, once writing succeeds."""
+        from pelican_social_share.paths import atomic_path
+
+        target = tmp_path / "card.png"
+        target.write_bytes(b"old")
+
+        with atomic_path(str(target)) as tmp:
+            assert tmp.endswith(".png")
+            with open(tmp, "wb") as f:
+                f.write(b"new")
+            assert target.read_bytes() == b"old"
+
+        assert target.read_bytes() == b"new"
+        assert [p.name for p in tmp_path.iterdir()] == ["card.png"]
+
+    def test_keeps_old_file_on_failure(self, tmp_path):
+        """Test that a failed write leaves the previous file and no temp file."""
+        from pelican_social_share.paths import atomic_path
+
+        target = tmp_path / "card.png"
+        target.write_bytes(b"old")
+
+        with pytest.raises(RuntimeError):
+            with atomic_path(str(target)):
+                raise RuntimeError("capture failed")
+
+        assert [p.name for p in tmp_path.iterdir()] == ["card.png"]
+        assert target.read_bytes() == b"old"
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+    def test_permissions(self, tmp_path):
+        """Test that files follow the umask, even over an owner-only file."""
+        from pelican_social_share.paths import atomic_path
+
+        umask = os.umask(0o022)
+        os.umask(umask)
+        card = tmp_path / "card.png"
+        with atomic_path(str(card)) as tmp:
+            open(tmp, "wb").close()
+        assert stat.S_IMODE(card.stat().st_mode) == 0o666 & ~umask
+
+        # Cards written before permissions were fixed are repaired
+        card.chmod(0o600)
+        with atomic_path(str(card)) as tmp:
+            open(tmp, "wb").close()
+        assert stat.S_IMODE(card.stat().st_mode) == 0o666 & ~umask
+
+    def test_writer_can_discard(self, tmp_path):
+        """Test that removing the temporary file keeps the target as it was."""
+        from pelican_social_share.paths import atomic_path
+
+        target = tmp_path / "card.png"
+        target.write_bytes(b"old")
+        with atomic_path(str(target)) as tmp:
+            os.remove(tmp)
+
+        assert target.read_bytes() == b"old"
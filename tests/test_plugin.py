@@ -1,5 +1,6 @@
 """Tests for the pelican_social_share plugin."""
 
+import logging
 import os
 import tempfile
 from pathlib import Path
@@ -174,6 +175,35 @@ class TestBuildSocialPages:
         assert content.metadata["social_image"] == expected_path
         assert content.metadata["image"] == expected_path
 
+    def test_build_social_pages_leaves_unchanged_html(self, mock_pelican_settings, sample_template_content, tmp_path):
+        """Test that identical HTML is not rewritten on the next build."""
+        social_dir = tmp_path / "social"
+        mock_pelican_settings["SOCIAL_CARD_HTML_DIR"] = str(social_dir)
+        mock_pelican_settings["OUTPUT_PATH"] = str(tmp_path / "output")
+
+        generator = MockGenerator(mock_pelican_settings)
+        mock_template = MagicMock()
+        mock_template.render.return_value = sample_template_content
+        generator.env.get_template.return_value = mock_template
+
+        from pelican_social_share.plugin import build_social_pages
+
+        build_social_pages(generator, [MockContent("test-slug", {"tagline": "Test tagline"})])
+        html_file = social_dir / "test-slug.html"
+        os.utime(html_file, (0, 0))
+
+        with patch('pelican_social_share.plugin.logger') as mock_logger:
+            build_social_pages(generator, [MockContent("test-slug", {"tagline": "Test tagline"})])
+
+        assert html_file.stat().st_mtime == 0
+        mock_logger.info.assert_called_with(
+            "[social_share] Social card HTML: 1 rendered, 0 files written, 2 unchanged"
+        )
+
+        mock_template.render.return_value = "<html>changed</html>"
+        build_social_pages(generator, [MockContent("test-slug", {"tagline": "Test tagline"})])
+        assert html_file.read_text() == "<html>changed</html>"
+
     def test_build_social_pages_skip_existing_image(self, mock_pelican_settings, sample_template_content, tmp_path):
         """Test that content with existing image metadata is skipped."""
         # Setup directories
@@ -216,6 +246,681 @@ class TestBuildSocialPages:
         assert content.metadata["image"] == "/existing/image.jpg"
 
 
+class TestCaptureSocialCards:
+    """Test the screenshot phase with a stubbed capture engine."""
+
+    @staticmethod
+    def fake_capture(jobs, base_url, options, router=None, on_result=None):
+        from pelican_social_share.capture import CaptureResult
+
+        results = []
+        for job in jobs:
+            Path(job.png_path).write_bytes(b"png")
+            results.append(CaptureResult(job.slug, True))
+            if on_result is not None:
+                on_result(results[-1])
+        return results
+
+    @staticmethod
+    def build(settings, html):
+        from pelican_social_share.plugin import build_social_pages
+
+        generator = MockGenerator(settings)
+        generator.env.get_template.return_value.render.return_value = html
+        build_social_pages(generator, [MockContent("test-slug", {"tagline": "Test tagline"})])
+
+    @pytest.fixture
+    def settings(self, mock_pelican_settings, tmp_path):
+        mock_pelican_settings["SOCIAL_CARD_HTML_DIR"] = str(tmp_path / "social")
+        mock_pelican_settings["OUTPUT_PATH"] = str(tmp_path / "output")
+        mock_pelican_settings["SOCIAL_IMAGE_DIR"] = str(tmp_path / "images")
+        return mock_pelican_settings
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_unchanged_cards_are_skipped(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that the manifest skips cards whose inputs did not change."""
+        from pelican_social_share.plugin import capture_social_cards
+
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = self.fake_capture
+        pelican_obj = MagicMock(settings=settings)
+
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(pelican_obj)
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(pelican_obj)
+        assert mock_run_capture.call_count == 1
+
+        # Changing the rendered HTML invalidates the card
+        self.build(settings, "<h1>Changed</h1>")
+        capture_social_cards(pelican_obj)
+        assert mock_run_capture.call_count == 2
+
+        assert (tmp_path / "images" / "social-share-manifest.json").exists()
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_work_list_ignores_stale_html(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that only cards rendered in this build are captured."""
+        from pelican_social_share.plugin import capture_social_cards
+
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = self.fake_capture
+        stale = tmp_path / "output" / "social"
+        stale.mkdir(parents=True)
+        (stale / "old-post.html").write_text("<h1>old</h1>")
+        (stale / "_sample.html").write_text("<h1>sample</h1>")
+
+        self.build(settings, "<h1>Test tagline</h1>")
+        with patch('pelican_social_share.plugin.os.listdir') as mock_listdir:
+            capture_social_cards(MagicMock(settings=settings))
+            # Only the manifest's single image directory listing
+            assert mock_listdir.call_count <= 1
+
+        (jobs, base_url, options), _ = mock_run_capture.call_args
+        assert [job.slug for job in jobs] == ["test-slug"]
+        assert jobs[0].png_path == str(tmp_path / "images" / "test-slug-social-share.png")
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_memory_source_skips_output_html(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that memory capture neither writes output HTML nor starts a server."""
+        from pelican_social_share.plugin import capture_social_cards
+        from pelican_social_share.server import MEMORY_ORIGIN
+
+        settings["SOCIAL_CAPTURE_SOURCE"] = "memory"
+        mock_run_capture.side_effect = self.fake_capture
+
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+
+        assert not (tmp_path / "output" / "social" / "test-slug.html").exists()
+        assert (tmp_path / "social" / "test-slug.html").exists()
+        assert (tmp_path / "images" / "test-slug-social-share.png").exists()
+        mock_serve.assert_not_called()
+        (jobs, base_url, options, router), _ = mock_run_capture.call_args
+        assert base_url == MEMORY_ORIGIN
+        assert router.pages == {"/social/test-slug.html": "<h1>Test tagline</h1>"}
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_request_blocking(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that blocking filters in front of the memory router and re-hashes cards."""
+        from pelican_social_share.blocking import RequestFilter
+        from pelican_social_share.plugin import capture_social_cards
+
+        settings["SOCIAL_CAPTURE_SOURCE"] = "memory"
+        mock_run_capture.side_effect = self.fake_capture
+
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+        settings["SOCIAL_BLOCK_REQUESTS"] = True
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+
+        assert mock_run_capture.call_count == 2
+        (jobs, base_url, options, handler), _ = mock_run_capture.call_args
+        assert isinstance(handler, RequestFilter)
+        assert handler.router.pages == {"/social/test-slug.html": "<h1>Test tagline</h1>"}
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_request_blocking_over_http_logs_cost(
+        self, mock_run_capture, mock_serve, settings, caplog
+    ):
+        """Test that blocking over the HTTP server notes the lost browser cache."""
+        from pelican_social_share.plugin import capture_social_cards
+
+        settings["SOCIAL_BLOCK_REQUESTS"] = True
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = self.fake_capture
+
+        self.build(settings, "<h1>Test tagline</h1>")
+        with caplog.at_level(logging.INFO, logger="pelican_social_share.plugin"):
+            capture_social_cards(MagicMock(settings=settings))
+
+        assert "turns off Chromium's HTTP cache" in caplog.text
+        assert "for 1 cards" in caplog.text
+        assert mock_serve.call_args.kwargs["metrics"] is not None
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_blocking_over_http_keeps_site_local(
+        self, mock_run_capture, mock_serve, settings, tmp_path
+    ):
+        """Test that SITEURL assets come from OUTPUT_PATH, not the live site."""
+        from pelican_social_share.plugin import capture_social_cards
+
+        settings["SOCIAL_BLOCK_REQUESTS"] = True
+        settings["SITEURL"] = "https://example.com"
+        (tmp_path / "output" / "theme").mkdir(parents=True)
+        (tmp_path / "output" / "theme" / "card.css").write_text("body {}")
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = self.fake_capture
+
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+
+        (jobs, base_url, options), kwargs = mock_run_capture.call_args
+        route = MagicMock()
+        route.request.url = "https://example.com/theme/card.css"
+        route.request.resource_type = "stylesheet"
+        kwargs["router"].handle(route)
+        route.fulfill.assert_called_once_with(
+            status=200, body=b"body {}", content_type="text/css"
+        )
+        route.continue_.assert_not_called()
+
+        # The local server's own URLs still go to it
+        route = MagicMock()
+        route.request.url = "http://127.0.0.1:8000/social/test-slug.html"
+        route.request.resource_type = "document"
+        kwargs["router"].handle(route)
+        route.continue_.assert_called_once_with()
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_pipelined_capture(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that capture starts after rendering and is joined at finalized."""
+        from pelican_social_share import plugin
+
+        settings["SOCIAL_PIPELINE"] = True
+        settings["THEME"] = str(tmp_path / "theme")
+        (tmp_path / "theme" / "static" / "css").mkdir(parents=True)
+        (tmp_path / "theme" / "static" / "css" / "card.css").write_text("body {}")
+        mock_run_capture.side_effect = self.fake_capture
+
+        self.build(settings, '<link href="/theme/css/card.css">')
+        plugin.start_pipelined_capture([MockGenerator(settings)])
+        assert plugin._pipeline is not None
+        plugin._pipeline.result()
+        plugin.capture_social_cards(MagicMock(settings=settings))
+
+        assert plugin._pipeline is None
+        assert (tmp_path / "images" / "test-slug-social-share.png").exists()
+        mock_serve.assert_not_called()
+        (jobs, base_url, options, router), _ = mock_run_capture.call_args
+        # Theme assets are read from the theme before Pelican copies them
+        assert router.resolve(base_url + "/theme/css/card.css")[:2] == (200, b"body {}")
+
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_pipelined_cards_reach_the_output(self, mock_run_capture, settings, tmp_path):
+        """Test that cards captured after Pelican's static copy are published."""
+        from pelican_social_share import plugin
+
+        settings["SOCIAL_PIPELINE"] = True
+        settings["PATH"] = str(tmp_path / "content")
+        settings["SOCIAL_IMAGE_DIR"] = str(tmp_path / "content" / "static" / "images")
+        mock_run_capture.side_effect = self.fake_capture
+
+        self.build(settings, "<h1>Test tagline</h1>")
+        plugin.start_pipelined_capture([MockGenerator(settings)])
+        plugin.capture_social_cards(MagicMock(settings=settings))
+
+        published = tmp_path / "output" / "static" / "images" / "test-slug-social-share.png"
+        assert published.read_bytes() == b"png"
+        assert not [p for p in published.parent.iterdir() if p.name.startswith(".")]
+
+        # Unchanged cards were copied by Pelican and are not published again
+        published.unlink()
+        self.build(settings, "<h1>Test tagline</h1>")
+        plugin.start_pipelined_capture([MockGenerator(settings)])
+        plugin.capture_social_cards(MagicMock(settings=settings))
+        assert not published.exists()
+
+    def test_pipeline_disabled_leaves_jobs(self, settings):
+        """Test that without SOCIAL_PIPELINE capture waits for finalized."""
+        from pelican_social_share import plugin
+
+        self.build(settings, "<h1>Test tagline</h1>")
+        plugin.start_pipelined_capture([MockGenerator(settings)])
+
+        assert plugin._pipeline is None
+        assert list(plugin._jobs) == ["test-slug"]
+        plugin._jobs.clear()
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_alternate_image_format(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that captured PNGs are encoded and metadata points at the chosen format."""
+        from pelican_social_share.capture import CaptureResult
+        from pelican_social_share.plugin import build_social_pages, capture_social_cards
+
+        Image = pytest.importorskip("PIL.Image")
+        settings["SOCIAL_IMAGE_FORMAT"] = "webp"
+
+        def capture(jobs, base_url, options, router=None, on_result=None):
+            for job in jobs:
+                Image.new("RGB", (40, 20), "white").save(job.png_path)
+                on_result(CaptureResult(job.slug, True))
+            return [CaptureResult(job.slug, True) for job in jobs]
+
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = capture
+        generator = MockGenerator(settings)
+        generator.env.get_template.return_value.render.return_value = "<h1>Test tagline</h1>"
+        content = MockContent("test-slug", {"tagline": "Test tagline"})
+
+        build_social_pages(generator, [content])
+        capture_social_cards(MagicMock(settings=settings))
+
+        assert content.metadata["social_image"] == "/static/images/test-slug-social-share.webp"
+        assert content.metadata["social_images"]["png"] == "/static/images/test-slug-social-share.png"
+        assert (tmp_path / "images" / "test-slug-social-share.webp").exists()
+
+        # A deleted variant is re-encoded without capturing again
+        (tmp_path / "images" / "test-slug-social-share.webp").unlink()
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+        assert mock_run_capture.call_count == 1
+        assert (tmp_path / "images" / "test-slug-social-share.webp").exists()
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_size_variants(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that one capture yields every variant and the card itself."""
+        from pelican_social_share.capture import CaptureResult
+        from pelican_social_share.plugin import build_social_pages, capture_social_cards
+
+        Image = pytest.importorskip("PIL.Image")
+        settings["SOCIAL_VARIANTS"] = {"square": (1080, 1080)}
+
+        def capture(jobs, base_url, options, router=None, on_result=None):
+            scale = options.device_scale_factor
+            size = tuple(round(side * scale) for side in options.viewport)
+            for job in jobs:
+                Image.new("RGB", size, "white").save(job.png_path)
+                on_result(CaptureResult(job.slug, True))
+            return [CaptureResult(job.slug, True) for job in jobs]
+
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = capture
+        generator = MockGenerator(settings)
+        generator.env.get_template.return_value.render.return_value = "<h1>Test tagline</h1>"
+        content = MockContent("test-slug", {"tagline": "Test tagline"})
+
+        build_social_pages(generator, [content])
+        capture_social_cards(MagicMock(settings=settings))
+
+        # The card keeps its viewport, with pixels enough for the square
+        (jobs, base_url, options), _ = mock_run_capture.call_args
+        assert options.viewport == (1200, 675)
+        assert options.device_scale_factor == 1.6
+        assert content.metadata["social_variants"] == {
+            "square": "/static/images/test-slug-social-share-square.png"
+        }
+        images = tmp_path / "images"
+        with Image.open(images / "test-slug-social-share-square.png") as square:
+            assert square.size == (1080, 1080)
+        with Image.open(images / "test-slug-social-share.png") as card:
+            assert card.size == (1200, 675)
+
+        # A deleted variant can only be recovered by capturing again
+        (images / "test-slug-social-share-square.png").unlink()
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+        assert mock_run_capture.call_count == 2
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_timing_report(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that the opt-in report covers the render, hash and capture steps."""
+        import json
+
+        from pelican_social_share.capture import CaptureResult
+        from pelican_social_share.plugin import build_social_pages, capture_social_cards
+
+        settings["SOCIAL_TIMING_REPORT"] = True
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.return_value = [
+            CaptureResult("ok", True, timings={"goto": 120.0, "wait": 30.0, "screenshot": 40.0}),
+            CaptureResult("slow", False, "Timeout 15000ms exceeded", timings={"goto": 15000.0}),
+        ]
+        generator = MockGenerator(settings)
+        generator.env.get_template.return_value.render.return_value = "<h1>card</h1>"
+
+        build_social_pages(generator, [
+            MockContent("ok", {"tagline": "One"}), MockContent("slow", {"tagline": "Two"}),
+        ])
+        capture_social_cards(MagicMock(settings=settings))
+
+        report = json.loads((tmp_path / "output" / "social-share-timings.json").read_text())
+        assert {"render", "write", "hash", "goto", "wait", "screenshot"} <= set(report["steps"])
+        assert {"render_html", "hash", "capture", "capture_phase"} <= set(report["phases_s"])
+        assert report["slowest"][0]["slug"] == "slow"
+        assert report["failures"] == [{"slug": "slow", "error": "Timeout 15000ms exceeded"}]
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_capture_cache_skips_chromium(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that a fresh checkout pulls cards another build pushed to the cache."""
+        from pelican_social_share.plugin import capture_social_cards
+
+        settings["SOCIAL_CACHE"] = str(tmp_path / "cache")
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = self.fake_capture
+
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+        assert mock_run_capture.call_count == 1
+
+        # A clean clone: no images, no manifest
+        settings["SOCIAL_IMAGE_DIR"] = str(tmp_path / "clone")
+        self.build(settings, "<h1>Test tagline</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+
+        assert mock_run_capture.call_count == 1
+        assert (tmp_path / "clone" / "test-slug-social-share.png").read_bytes() == b"png"
+        assert (tmp_path / "clone" / "social-share-manifest.json").exists()
+
+    def test_capture_cache_ignores_mtimes(self, settings, tmp_path):
+        """Test that another checkout of the same files, with new mtimes, hits the cache."""
+        pytest.importorskip("PIL")
+        from pelican_social_share.plugin import capture_social_cards
+
+        settings["SOCIAL_CACHE"] = str(tmp_path / "cache")
+        settings["SOCIAL_RENDERER"] = "pillow"
+        settings["SOCIAL_PORTRAIT_PATH"] = "images/portrait.png"
+        html = '<link rel="stylesheet" href="/theme/style.css"><h1>Test tagline</h1>'
+
+        drawn = []
+        for checkout, mtime in (("first", 1_000_000), ("second", 2_000_000)):
+            root = tmp_path / checkout
+            (root / "content" / "images").mkdir(parents=True)
+            (root / "output" / "theme").mkdir(parents=True)
+            portrait = root / "content" / "images" / "portrait.png"
+            stylesheet = root / "output" / "theme" / "style.css"
+            portrait.write_bytes(b"portrait")
+            stylesheet.write_text("h1 { color: red; }")
+            for path in (portrait, stylesheet):
+                os.utime(path, (mtime, mtime))
+            settings.update({
+                "PATH": str(root / "content"),
+                "OUTPUT_PATH": str(root / "output"),
+                "SOCIAL_CARD_HTML_DIR": str(root / "social"),
+                "SOCIAL_IMAGE_DIR": str(root / "images"),
+            })
+            self.build(settings, html)
+            with patch("pelican_social_share.renderers.PillowRenderer.render_card") as draw:
+                draw.return_value.save.side_effect = lambda path, fmt: Path(path).write_bytes(b"png")
+                capture_social_cards(MagicMock(settings=settings))
+            drawn.append(draw.call_count)
+
+        # Only the first checkout drew the card; the second restored it
+        assert drawn == [1, 0]
+        assert (tmp_path / "second" / "images" / "test-slug-social-share.png").read_bytes() == b"png"
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_identical_cards_share_one_image(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that cards with identical inputs are captured once and share a path."""
+        from pelican_social_share.hashing import card_key
+        from pelican_social_share.plugin import build_social_pages, capture_social_cards
+
+        settings["SOCIAL_DEDUPE"] = True
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = self.fake_capture
+        generator = MockGenerator(settings)
+        generator.env.get_template.return_value.render.side_effect = (
+            lambda tagline, **context: f"<h1>{tagline}</h1>"
+        )
+        contents = [
+            MockContent("part-1", {"tagline": "A series"}),
+            MockContent("part-2", {"tagline": "A series"}),
+            MockContent("other", {"tagline": "Something else"}),
+        ]
+
+        build_social_pages(generator, contents)
+        capture_social_cards(MagicMock(settings=settings))
+
+        shared = f"social-{card_key('A series', '<h1>A series</h1>')}"
+        assert contents[0].metadata["social_image"] == f"/static/images/{shared}.png"
+        assert contents[1].metadata["social_image"] == contents[0].metadata["social_image"]
+        assert contents[2].metadata["social_image"] != contents[0].metadata["social_image"]
+        (jobs, base_url, options), _ = mock_run_capture.call_args
+        assert [job.slug for job in jobs] == ["part-1", "other"]
+        assert jobs[0].aliases == ["part-2"]
+        assert (tmp_path / "images" / f"{shared}.png").exists()
+
+        # The shared image stays fresh whichever slug comes first
+        build_social_pages(generator, contents[::-1])
+        capture_social_cards(MagicMock(settings=settings))
+        assert mock_run_capture.call_count == 1
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_manifest_forgets_removed_content(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that a renamed slug's manifest entry is dropped."""
+        import json
+
+        from pelican_social_share.plugin import build_social_pages, capture_social_cards
+
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = self.fake_capture
+        generator = MockGenerator(settings)
+        generator.env.get_template.return_value.render.return_value = "<h1>Card</h1>"
+
+        for slug in ("old-slug", "new-slug"):
+            build_social_pages(generator, [MockContent(slug, {"tagline": "Tagline"})])
+            capture_social_cards(MagicMock(settings=settings))
+
+        manifest = json.loads((tmp_path / "images" / "social-share-manifest.json").read_text())
+        assert list(manifest["cards"]) == ["new-slug"]
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_stale_shared_images_are_removed(self, mock_run_capture, mock_serve, settings, tmp_path):
+        """Test that a changed card's old content-addressed files and entry are dropped."""
+        import json
+
+        from pelican_social_share.hashing import card_key
+        from pelican_social_share.plugin import capture_social_cards
+
+        settings["SOCIAL_DEDUPE"] = True
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = self.fake_capture
+        images = tmp_path / "images"
+
+        self.build(settings, "<h1>Old</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+        old = f"social-{card_key('Test tagline', '<h1>Old</h1>')}"
+        (images / f"{old}.webp").write_bytes(b"webp")
+        (images / f"{old}-square.png").write_bytes(b"png")
+        (images / "portrait.png").write_bytes(b"png")
+        (images / "post-social-share.png").write_bytes(b"png")
+
+        self.build(settings, "<h1>New</h1>")
+        capture_social_cards(MagicMock(settings=settings))
+
+        new = f"social-{card_key('Test tagline', '<h1>New</h1>')}"
+        assert sorted(os.listdir(images)) == sorted([
+            f"{new}.png", "portrait.png", "post-social-share.png", "social-share-manifest.json",
+        ])
+        manifest = json.loads((images / "social-share-manifest.json").read_text())
+        assert list(manifest["cards"]) == [new[len("social-"):]]
+
+    @patch('pelican_social_share.plugin.serve_directory')
+    @patch('pelican_social_share.plugin.run_capture')
+    def test_stylesheet_change_renames_shared_card(
+        self, mock_run_capture, mock_serve, settings, tmp_path
+    ):
+        """Test that a shared card's name covers the assets it links to."""
+        from pelican_social_share.plugin import build_social_pages, capture_social_cards
+
+        settings["SOCIAL_DEDUPE"] = True
+        mock_serve.return_value.__enter__.return_value = 8000
+        mock_run_capture.side_effect = self.fake_capture
+        css = tmp_path / "output" / "theme" / "card.css"
+        css.parent.mkdir(parents=True)
+        html = '<link rel="stylesheet" href="/theme/card.css"><h1>Card</h1>'
+
+        names = []
+        for rules in ("h1 { color: red; }", "h1 { color: blue; }"):
+            css.write_text(rules)
+            content = MockContent("test-slug", {"tagline": "Test tagline"})
+            generator = MockGenerator(settings)
+            generator.env.get_template.return_value.render.return_value = html
+            build_social_pages(generator, [content])
+            capture_social_cards(MagicMock(settings=settings))
+            names.append(content.metadata["social_image"])
+
+        assert names[0] != names[1]
+        assert os.listdir(tmp_path / "images").count(os.path.basename(names[0])) == 0
+
+    @patch('pelican_social_share.plugin.CaptureSession')
+    def test_persistent_browser_is_reused(self, mock_session_cls, settings):
+        """Test that the warm session survives rebuilds while healthy."""
+        from pelican_social_share import plugin
+
+        settings["SOCIAL_PERSISTENT_BROWSER"] = True
+        session = mock_session_cls.return_value
+        session.key = (os.path.abspath(settings["OUTPUT_PATH"]), False,
+                       plugin.CaptureOptions.from_settings(settings))
+        session.capture.side_effect = lambda jobs, on_result: self.fake_capture(
+            jobs, None, None, on_result=on_result
+        )
+
+        try:
+            for html in ("<h1>one</h1>", "<h1>two</h1>"):
+                self.build(settings, html)
+                plugin.capture_social_cards(MagicMock(settings=settings))
+            assert mock_session_cls.call_count == 1
+            assert session.capture.call_count == 2
+
+            # A dead browser is replaced on the next rebuild
+            session.is_healthy.return_value = False
+            self.build(settings, "<h1>three</h1>")
+            plugin.capture_social_cards(MagicMock(settings=settings))
+            assert mock_session_cls.call_count == 2
+            session.close.assert_called_once()
+        finally:
+            plugin._session = None
+
+
+class TestCaptureEngines:
+    """Test the capture engines with a mocked Playwright."""
+
+    def test_capture_options_from_settings(self, mock_pelican_settings):
+        """Test that capture options follow Pelican settings."""
+        from pelican_social_share.capture import CaptureOptions
+
+        mock_pelican_settings["SOCIAL_CONCURRENCY"] = 4
+        options = CaptureOptions.from_settings(mock_pelican_settings)
+
+        assert options.viewport == (1200, 675)
+        assert options.wait_selector is None
+        assert options.concurrency == 4
+
+        # Inlined cards have nothing to wait out unless a wait is configured
+        del mock_pelican_settings["SOCIAL_WAIT_UNTIL"]
+        mock_pelican_settings["SOCIAL_INLINE_ASSETS"] = True
+        assert CaptureOptions.from_settings(mock_pelican_settings).wait_until == "load"
+
+    def test_capture_card_ready_modes(self, tmp_path):
+        """Test that the fixed sleep only runs when explicitly requested."""
+        from pelican_social_share.capture import READY_SCRIPT, CaptureOptions, capture_card
+
+        page = MagicMock()
+        png = str(tmp_path / "a.png")
+        capture_card(page, "http://x/a.html", png, CaptureOptions(wait_selector=None))
+        page.evaluate.assert_called_once_with(READY_SCRIPT, 10000)
+        page.wait_for_function.assert_called_once()
+        page.wait_for_timeout.assert_not_called()
+
+        page = MagicMock()
+        options = CaptureOptions(wait_selector=None, ready_mode="fixed", render_wait_ms=250)
+        capture_card(page, "http://x/a.html", png, options)
+        page.wait_for_timeout.assert_called_once_with(250)
+        page.evaluate.assert_not_called()
+
+    def test_capture_batch_uses_one_document(self, tmp_path):
+        """Test that a batch is loaded once and shot per card frame."""
+        from pelican_social_share.capture import CaptureOptions, CardJob, capture_batch
+
+        page = MagicMock()
+        page.frame.side_effect = lambda name: None if name == "card-1" else MagicMock()
+        jobs = [
+            CardJob(slug, f"/social/{slug}.html", str(tmp_path / f"{slug}.png")) for slug in "abc"
+        ]
+        options = CaptureOptions(wait_selector=None, batch_size=3)
+
+        results = capture_batch(page, jobs, "http://127.0.0.1:8000", options)
+
+        page.set_content.assert_called_once()
+        document = page.set_content.call_args[0][0]
+        assert document.count("<iframe") == 3
+        assert 'src="http://127.0.0.1:8000/social/b.html"' in document
+        assert "width: 1200px; height: 675px" in document
+        assert [r.ok for r in results] == [True, False, True]
+        page.locator.assert_any_call("#card-2")
+        page.goto.assert_not_called()
+
+    @patch('pelican_social_share.capture.sync_playwright', create=True)
+    def test_run_parallel_captures_every_job(self, mock_sync_playwright, tmp_path):
+        """Test that parallel workers drain the queue and report failures."""
+        from pelican_social_share.capture import (
+            CaptureOptions,
+            CardJob,
+            run_parallel,
+        )
+
+        def screenshot(path, full_page):
+            # Screenshots go to a temporary file named after the card
+            if os.path.basename(path).startswith(".bad.png."):
+                raise RuntimeError("boom")
+
+        page = MagicMock()
+        page.screenshot.side_effect = screenshot
+        p = mock_sync_playwright.return_value.__enter__.return_value
+        p.chromium.launch.return_value.new_context.return_value.new_page.return_value = page
+
+        jobs = [
+            CardJob(f"slug-{i}", f"/social/slug-{i}.html", str(tmp_path / f"{i}.png"))
+            for i in range(6)
+        ]
+        jobs.append(CardJob("bad", "/social/bad.html", str(tmp_path / "bad.png")))
+        options = CaptureOptions(wait_selector=None, render_wait_ms=0, concurrency=3)
+
+        results = run_parallel(jobs, "http://127.0.0.1:8000", options)
+
+        assert sorted(r.slug for r in results) == sorted(job.slug for job in jobs)
+        assert [r.slug for r in results if not r.ok] == ["bad"]
+        assert p.chromium.launch.call_count == 3
+
+    @patch('pelican_social_share.capture.async_playwright', create=True)
+    def test_run_async_bounds_each_card(self, mock_async_playwright, tmp_path):
+        """Test that the async engine reports per-card timeouts as errors."""
+        import asyncio
+        from unittest.mock import AsyncMock
+
+        from pelican_social_share.capture import CaptureOptions, CardJob, run_async
+
+        async def goto(url, **kwargs):
+            if url.endswith("/slow.html"):
+                await asyncio.sleep(1)
+
+        browser = AsyncMock()
+        page = browser.new_context.return_value.new_page.return_value
+        page.goto.side_effect = goto
+        p = mock_async_playwright.return_value.__aenter__.return_value
+        p.chromium.launch = AsyncMock(return_value=browser)
+
+        jobs = [
+            CardJob(slug, f"/{slug}.html", str(tmp_path / f"{slug}.png"))
+            for slug in ("a", "slow", "b")
+        ]
+        options = CaptureOptions(
+            wait_selector=None, render_wait_ms=0, concurrency=2,
+            card_timeout_ms=50, engine="async",
+        )
+
+        results = run_async(jobs, "http://127.0.0.1:8000", options)
+
+        assert {r.slug: r.ok for r in results} == {"a": True, "slow": False, "b": True}
+        browser.close.assert_awaited_once()
+
+
 # Integration test that requires manual verification
 @pytest.mark.skip(reason="Requires Playwright and manual verification")
 class TestScreenshotGeneration:
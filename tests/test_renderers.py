@@ -0,0 +1,135 @@
+"""Tests for pelican_social_share.renderers."""
+
+import os
+import stat
+from unittest.mock import MagicMock
+
+import pytest
+
+from pelican_social_share.capture import CaptureOptions, CardJob
+
+Image = pytest.importorskip("PIL.Image")
+
+
+class TestPillowRenderer:
+    """Test the browser-free Pillow backend."""
+
+    def test_render_card_with_portrait(self, tmp_path):
+        """Test that cards match the viewport and carry the portrait."""
+        from pelican_social_share.renderers import PillowRenderer
+
+        portrait = tmp_path / "portrait.png"
+        Image.new("RGBA", (100, 120), (255, 0, 0, 255)).save(portrait)
+        settings = {"SOCIAL_PORTRAIT_PATH": str(portrait), "SITENAME": "Site"}
+        renderer = PillowRenderer(settings, CaptureOptions(viewport=(1200, 630)))
+
+        image = renderer.render_card("A tagline long enough to wrap onto a second line", "Site")
+
+        assert image.size == (1200, 630)
+        # Portrait is anchored to the bottom-right of the 630px safe zone
+        assert image.getpixel((1200 - 285 - 1, 629)) == (255, 0, 0)
+        assert image.getpixel((5, 5)) == (255, 255, 255)
+
+    def test_fingerprint_follows_portrait_content(self, tmp_path, monkeypatch):
+        """Test that touching or cloning the portrait keeps the fingerprint."""
+        from pelican_social_share.renderers import PillowRenderer
+
+        monkeypatch.chdir(tmp_path)
+        (tmp_path / "content" / "images").mkdir(parents=True)
+        portrait = tmp_path / "content" / "images" / "portrait.png"
+        portrait.write_bytes(b"portrait")
+        settings = {"PATH": "content", "SOCIAL_PORTRAIT_PATH": "images/portrait.png"}
+        before = PillowRenderer(settings, CaptureOptions()).fingerprint()
+
+        os.utime(portrait, (1, 1))
+        assert PillowRenderer(settings, CaptureOptions()).fingerprint() == before
+
+        portrait.write_bytes(b"new portrait")
+        assert PillowRenderer(settings, CaptureOptions()).fingerprint() != before
+
+    def test_device_scale_factor_and_layout_override(self, tmp_path):
+        """Test that the declarative layout and scale factor are honored."""
+        from pelican_social_share.renderers import PillowRenderer
+
+        settings = {"SOCIAL_PILLOW_LAYOUT": {"background": "#000000", "tagline": {"size": 40}}}
+        renderer = PillowRenderer(settings, CaptureOptions(viewport=(600, 300), device_scale_factor=2))
+
+        image = renderer.render_card("Hello", "")
+
+        assert image.size == (1200, 600)
+        assert image.getpixel((0, 0)) == (0, 0, 0)
+        assert renderer.layout["tagline"]["size"] == 40
+        assert renderer.layout["tagline"]["color"] == "#111111"
+
+    @pytest.mark.skipif(os.name == "nt", reason="POSIX permissions")
+    def test_cards_are_world_readable(self, tmp_path):
+        """Test that cards get the umask's mode, not a temporary file's."""
+        from pelican_social_share.renderers import PillowRenderer
+
+        umask = os.umask(0o022)
+        os.umask(umask)
+        png = tmp_path / "card.png"
+
+        PillowRenderer({}, CaptureOptions()).render(
+            [CardJob("card", "/social/card.html", str(png), tagline="Hi")]
+        )
+
+        assert stat.S_IMODE(png.stat().st_mode) == 0o666 & ~umask
+
+    def test_render_reports_per_card_errors(self, tmp_path):
+        """Test that one unwritable card does not fail the others."""
+        from pelican_social_share.renderers import PillowRenderer
+
+        renderer = PillowRenderer({}, CaptureOptions())
+        jobs = [
+            CardJob("ok", "/social/ok.html", str(tmp_path / "ok.png"), tagline="Hi"),
+            CardJob("bad", "/social/bad.html", str(tmp_path / "missing" / "bad.png"), tagline="Hi"),
+        ]
+
+        results = renderer.render(jobs)
+
+        assert [r.ok for r in results] == [True, False]
+        with Image.open(tmp_path / "ok.png") as card:
+            assert card.size == (1200, 675)
+
+
+class TestRendererSelection:
+    """Test SOCIAL_RENDERER handling in the plugin."""
+
+    def test_pillow_backend_end_to_end(self, mock_pelican_settings, tmp_path):
+        """Test that cards are produced without a browser."""
+        from pelican_social_share.plugin import build_social_pages, capture_social_cards
+
+        mock_pelican_settings.update({
+            "SOCIAL_RENDERER": "pillow",
+            "SOCIAL_CARD_HTML_DIR": str(tmp_path / "social"),
+            "OUTPUT_PATH": str(tmp_path / "output"),
+            "SOCIAL_IMAGE_DIR": str(tmp_path / "images"),
+        })
+        generator = MagicMock(settings=mock_pelican_settings)
+        generator.env.get_template.return_value.render.return_value = "<h1>Hi</h1>"
+        content = MagicMock(slug="post", metadata={"tagline": "Hi"})
+
+        build_social_pages(generator, [content])
+        capture_social_cards(MagicMock(settings=mock_pelican_settings))
+
+        with Image.open(tmp_path / "images" / "post-social-share.png") as card:
+            assert card.size == (1200, 675)
+
+    def test_custom_renderer_class(self, mock_pelican_settings):
+        """Test that a CardRenderer subclass can be plugged in directly."""
+        from pelican_social_share.plugin import get_renderer
+        from pelican_social_share.renderers import CardRenderer
+
+        class MyRenderer(CardRenderer):
+            def render(self, jobs, on_result=None):
+                return []
+
+        mock_pelican_settings["SOCIAL_RENDERER"] = MyRenderer
+        assert isinstance(get_renderer(mock_pelican_settings, CaptureOptions()), MyRenderer)
+
+        with pytest.raises(TypeError):
+            type("Incomplete", (CardRenderer,), {})(mock_pelican_settings, CaptureOptions())
+
+        mock_pelican_settings["SOCIAL_RENDERER"] = "nope"
+        assert get_renderer(mock_pelican_settings, CaptureOptions()) is None
@@ -0,0 +1,115 @@
+"""Tests for pelican_social_share.server."""
+
+import http.client
+
+from pelican_social_share.server import AssetCache, ServerMetrics, serve_directory
+
+
+class TestAssetCache:
+    """Test the in-memory asset cache."""
+
+    def test_hits_and_invalidation(self, tmp_path):
+        """Test that files are cached until they change on disk."""
+        css = tmp_path / "style.css"
+        css.write_text("body {}")
+        cache = AssetCache()
+
+        data, etag, hit = cache.get(str(css))
+        assert (data, hit) == (b"body {}", False)
+        assert cache.get(str(css)) == (data, etag, True)
+
+        css.write_text("body { color: red; }")
+        data, new_etag, hit = cache.get(str(css))
+        assert (data, hit) == (b"body { color: red; }", False)
+        assert new_etag != etag
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the cache stays within its byte budget."""
+        for name in "abc":
+            (tmp_path / name).write_bytes(b"x" * 10)
+        cache = AssetCache(max_bytes=20)
+
+        for name in "abc":
+            cache.get(str(tmp_path / name))
+
+        assert cache.get(str(tmp_path / "a"))[2] is False
+        assert cache.get(str(tmp_path / "c"))[2] is True
+        assert cache.get(str(tmp_path / "missing")) is None
+
+
+class TestServeDirectory:
+    """Test the threaded asset server."""
+
+    def test_keep_alive_etag_and_metrics(self, tmp_path):
+        """Test that one connection serves several requests with revalidation."""
+        (tmp_path / "style.css").write_text("body {}")
+        metrics = ServerMetrics()
+
+        with serve_directory(str(tmp_path), metrics=metrics) as port:
+            connection = http.client.HTTPConnection("127.0.0.1", port)
+            connection.request("GET", "/style.css")
+            response = connection.getresponse()
+            assert response.read() == b"body {}"
+            assert response.getheader("Cache-Control") == "max-age=3600"
+            etag = response.getheader("ETag")
+
+            # Same socket, conditional request
+            connection.request("GET", "/style.css", headers={"If-None-Match": etag})
+            response = connection.getresponse()
+            response.read()
+            assert response.status == 304
+
+            connection.request("GET", "/missing.css")
+            response = connection.getresponse()
+            response.read()
+            assert response.status == 404
+            connection.close()
+
+        assert metrics.requests == 2
+        assert metrics.cache_hits == 1
+        assert metrics.not_modified == 1
+        assert metrics.bytes_sent == len(b"body {}")
+
+
+class TestMemoryRouter:
+    """Test in-memory request routing."""
+
+    def test_resolve(self, tmp_path):
+        """Test that cards come from memory and assets from the output path."""
+        from pelican_social_share.server import MEMORY_ORIGIN, MemoryRouter
+
+        (tmp_path / "theme").mkdir()
+        (tmp_path / "theme" / "style.css").write_text("body {}")
+        router = MemoryRouter(
+            {"/social/post.html": "<h1>Hi</h1>"}, str(tmp_path), "https://example.com/"
+        )
+
+        assert router.resolve(MEMORY_ORIGIN + "/social/post.html?debug") == (
+            200, b"<h1>Hi</h1>", "text/html; charset=utf-8"
+        )
+        assert router.resolve("https://example.com/theme/style.css") == (
+            200, b"body {}", "text/css"
+        )
+        assert router.resolve(MEMORY_ORIGIN + "/nope.png")[0] == 404
+        assert router.resolve("https://fonts.example.net/a.woff2") is None
+        assert router.metrics.requests == 3
+
+    def test_handle_fulfills_or_continues(self, tmp_path):
+        """Test the sync route handler."""
+        from unittest.mock import MagicMock
+
+        from pelican_social_share.server import MEMORY_ORIGIN, MemoryRouter
+
+        router = MemoryRouter({"/a.html": "a"}, str(tmp_path))
+
+        route = MagicMock()
+        route.request.url = MEMORY_ORIGIN + "/a.html"
+        router.handle(route)
+        route.fulfill.assert_called_once_with(
+            status=200, body=b"a", content_type="text/html; charset=utf-8"
+        )
+
+        route = MagicMock()
+        route.request.url = "https://elsewhere.example/x.js"
+        router.handle(route)
+        route.continue_.assert_called_once_with()
@@ -0,0 +1,51 @@
+"""Tests for pelican_social_share.timing."""
+
+import json
+
+from pelican_social_share.timing import BuildTimings, percentile, write_report
+
+
+class TestBuildTimings:
+    """Test per-phase and per-card instrumentation."""
+
+    def test_percentile(self):
+        """Test nearest-rank percentiles."""
+        values = [float(v) for v in range(1, 101)]
+
+        assert percentile(values, 0.5) == 50
+        assert percentile(values, 0.95) == 95
+        assert percentile([7.0], 0.95) == 7
+
+    def test_report(self):
+        """Test step statistics, slowest cards and failures."""
+        timings = BuildTimings()
+        for i in range(20):
+            timings.add_card(f"card-{i}", "goto", float(i))
+            timings.add_card(f"card-{i}", "screenshot", 10.0)
+        timings.add_card("card-3", "goto", 1000.0)
+        timings.add_phase("browser_launch", 0.5)
+        timings.add_phase("browser_launch", 0.25)
+        timings.add_failure("broken", "Timeout 15000ms exceeded")
+
+        report = timings.report(slowest=2)
+
+        assert report["cards"] == 20
+        assert report["phases_s"] == {"browser_launch": 0.75}
+        assert report["steps"]["goto"]["max_ms"] == 1003.0
+        assert report["steps"]["screenshot"]["p95_ms"] == 10.0
+        assert [card["slug"] for card in report["slowest"]] == ["card-3", "card-19"]
+        assert report["slowest"][0]["goto"] == 1003.0
+        assert report["failures"] == [{"slug": "broken", "error": "Timeout 15000ms exceeded"}]
+
+    def test_write_report(self, tmp_path):
+        """Test that the report is valid JSON at the requested path."""
+        timings = BuildTimings()
+        with timings.phase("render_html"):
+            timings.add_card("post", "render", 2.0)
+
+        path = write_report(timings, str(tmp_path / "out" / "timings.json"))
+
+        report = json.loads((tmp_path / "out" / "timings.json").read_text())
+        assert path.endswith("timings.json")
+        assert report["steps"]["render"]["count"] == 1
+        assert report["phases_s"]["render_html"] >= 0
@@ -0,0 +1,83 @@
+"""Tests for pelican_social_share.variants."""
+
+import pytest
+
+from pelican_social_share.capture import CaptureOptions
+from pelican_social_share.variants import (
+    Variant,
+    capture_scale,
+    derive_variants,
+    size_variant_path,
+    variants_from_settings,
+)
+
+Image = pytest.importorskip("PIL.Image")
+
+VARIANTS = {"og": (1200, 630), "square": (1080, 1080), "small": (600, 315)}
+
+
+def size_of(path):
+    with Image.open(path) as image:
+        return image.size
+
+
+class TestVariantSettings:
+    """Test reading SOCIAL_VARIANTS."""
+
+    def test_capture_covers_every_variant(self):
+        """Test that the card keeps its viewport but gains pixels for variants."""
+        settings = {"SOCIAL_VIEWPORT": (1200, 675), "SOCIAL_VARIANTS": VARIANTS}
+        variants = variants_from_settings(settings)
+
+        assert variants[1] == Variant("square", (1080, 1080))
+        options = CaptureOptions.from_settings(settings)
+        assert options.viewport == (1200, 675)
+        # The square is cut from a 675px region, which needs 1080 pixels
+        assert options.device_scale_factor == 1.6
+        assert capture_scale((1200, 675), variants[::2]) == 1
+        assert capture_scale((1200, 675), variants, 2) == 3.2
+        assert CaptureOptions.from_settings({}).device_scale_factor == 1
+
+    def test_size_variant_path(self):
+        """Test that variant files sit next to the card."""
+        assert size_variant_path("/img/post-social-share.png", "og") == (
+            "/img/post-social-share-og.png"
+        )
+
+
+class TestDeriveVariants:
+    """Test cutting variants from one capture."""
+
+    def test_derive_variants(self, tmp_path):
+        """Test that variants are centered crops, scaled down to their size."""
+        png = tmp_path / "card.png"
+        card = Image.new("RGB", (1920, 1080), (255, 0, 0))
+        card.paste((0, 0, 255), (0, 0, 320, 1080))  # Band outside the centered square
+        card.save(png)
+
+        paths = derive_variants(
+            str(png), (1200, 675), variants_from_settings({"SOCIAL_VARIANTS": VARIANTS})
+        )
+
+        sizes = {path.rsplit("-", 1)[1]: size_of(path) for path in paths}
+        assert sizes == {
+            "og.png": (1200, 630), "square.png": (1080, 1080), "small.png": (600, 315)
+        }
+        with Image.open(tmp_path / "card-og.png") as og:
+            assert og.getpixel((100, 300)) == (0, 0, 255)
+        with Image.open(tmp_path / "card-square.png") as square:
+            assert square.getpixel((0, 540)) == (255, 0, 0)
+        # The card is the whole capture, scaled down to its viewport
+        with Image.open(png) as card:
+            assert card.size == (1200, 675)
+            assert card.getpixel((100, 300)) == (0, 0, 255)
+
+    def test_device_scale_factor(self, tmp_path):
+        """Test that variants and the card keep the configured pixel density."""
+        png = tmp_path / "card.png"
+        Image.new("RGB", (2400, 1350), "white").save(png)
+
+        (path,) = derive_variants(str(png), (1200, 675), [Variant("og", (1200, 630))], 2)
+
+        assert size_of(path) == (2400, 1260)
+        assert size_of(png) == (2400, 1350)